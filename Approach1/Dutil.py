@@ -1,89 +1,155 @@
-import pandas as pd
-import json
-import argparse
-import xml.etree.ElementTree as ET
-
-
-def extract_csv(file_path, delimiter):
-    return pd.read_csv(file_path, delimiter=delimiter)
-
-
-def extract_txt(file_path, delimiter):
-    with open(file_path, 'r') as file:
-        data = [line.strip().split(delimiter) for line in file.readlines()]
-    headers = data[0]
-    rows = data[1:]
-    return pd.DataFrame(rows, columns=headers)
-
-
-def parse_xml_to_dict(xml_file):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    data = []
-    for book in root.findall('book'):
-        book_data = {
-            'id': book.get('id'),
-            'author': book.find('author').text,
-            'title': book.find('title').text,
-            'genre': book.find('genre').text,
-            'price': float(book.find('price').text),
-            'publish_date': book.find('publish_date').text,
-            'description': book.find('description').text,
-        }
-        data.append(book_data)
-    return data
-
-
-def extract_xml(file_path):
-    books_data = parse_xml_to_dict(file_path)
-    return pd.DataFrame(books_data)
-
-
-def transform_data(data_frame):
-    # Adjust the columns dynamically based on the input data
-    required_columns = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
-    columns_to_keep = [col for col in data_frame.columns if col in required_columns]
-    return data_frame[columns_to_keep]
-
-
-def load_data(data_frame, output_path, output_format, delimiter=None):
-    if output_format == 'csv':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-    elif output_format == 'txt':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-    elif output_format == 'json':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-    else:
-        raise ValueError(f"Unsupported output format: {output_format}")
-
-
-def process_file(file_type, config):
-    input_path = config[file_type]['input_path']
-    output_path = config[file_type]['output_path']
-    delimiter = config[file_type].get('delimiter', ',')
-
-    if file_type == 'csv':
-        data = extract_csv(input_path, delimiter)
-    elif file_type == 'txt':
-        data = extract_txt(input_path, delimiter)
-    elif file_type == 'xml':
-        data = extract_xml(input_path)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
-
-    transformed_data = transform_data(data)
-    output_format = output_path.split('.')[-1]
-    load_data(transformed_data, output_path, output_format, delimiter)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='ETL Utility')
-    parser.add_argument('file_type', type=str, help='Type of the file to process (csv, txt, xml)')
-    parser.add_argument('config_path', type=str, help='Path to the configuration JSON file')
-
-    args = parser.parse_args()
-
-    with open(args.config_path, 'r') as config_file:
-        config = json.load(config_file)
-
-    process_file(args.file_type, config)
+import pandas as pd
+import json
+import argparse
+import os
+import sys
+
+# Shared streaming readers live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_metrics import add_metrics_arguments, instrumented_run, metrics_options  # noqa: E402
+from output_writers import write_chunks  # noqa: E402
+from read_plan import ReadPlan, csv_header  # noqa: E402
+from text_engine import DEFAULT_BLOCK_SIZE, header_names, iter_delimited  # noqa: E402
+
+
+REQUIRED_COLUMNS = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
+
+
+def extract_csv(file_path, delimiter, plan=None, chunk_size=None):
+    options = plan.csv_options(csv_header(file_path, delimiter)) if plan else {}
+    return pd.read_csv(file_path, delimiter=delimiter, chunksize=chunk_size, **options)
+
+
+def extract_txt(file_path, delimiter, plan=None, chunk_size=None, block_size=DEFAULT_BLOCK_SIZE):
+    # Plain split-on-delimiter lines: no quoting, every undeclared column stays a string
+    plan = plan or ReadPlan()
+    options = plan.text_options(header_names(file_path, delimiter)[0])
+    chunks = iter_delimited(file_path, delimiter, block_size, chunk_size, **options)
+    if chunk_size is not None:
+        return chunks
+    frames = list(chunks)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=options['usecols'])
+
+
+def iter_xml_batches(file_path, layout, batch_size=1000, plan=None):
+    from xml_stream import iter_records
+
+    # layout is the xml config entry: "record_path" plus a "fields" column mapping
+    fields = plan.xml_fields(layout['fields']) if plan else layout['fields']
+    return iter_records(file_path, layout['record_path'], fields, batch_size)
+
+
+def extract_xml(file_path, layout, plan=None):
+    batches = list(iter_xml_batches(file_path, layout, plan=plan))
+    if not batches:
+        fields = plan.xml_fields(layout['fields']) if plan else layout['fields']
+        return pd.DataFrame(columns=list(fields))
+    return pd.concat(batches, ignore_index=True)
+
+
+def transform_data(data_frame):
+    # Adjust the columns dynamically based on the input data
+    columns_to_keep = [col for col in data_frame.columns if col in REQUIRED_COLUMNS]
+    return data_frame[columns_to_keep]
+
+
+def build_plan(file_config):
+    # Projection matches transform_data; "dtypes" in the config entry declares column types
+    return ReadPlan(REQUIRED_COLUMNS, file_config.get('dtypes'))
+
+
+def explain_plan(file_type, file_config, plan):
+    input_path = file_config['input_path']
+    delimiter = file_config.get('delimiter', ',')
+    if file_type == 'csv':
+        header = csv_header(input_path, delimiter)
+        return plan.explain(input_path, header, plan.csv_options(header))
+    elif file_type == 'txt':
+        header = header_names(input_path, delimiter)[0]
+        return plan.explain(input_path, header, plan.text_options(header))
+    elif file_type == 'xml':
+        return plan.explain(input_path, list(file_config['fields']),
+                            {'fields': list(plan.xml_fields(file_config['fields']))})
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def extract_chunks(file_type, file_config, chunk_size=10000, plan=None):
+    input_path = file_config['input_path']
+    delimiter = file_config.get('delimiter', ',')
+
+    if file_type == 'csv':
+        return extract_csv(input_path, delimiter, plan, chunk_size)
+    elif file_type == 'txt':
+        block_size = file_config.get('block_size_mb', DEFAULT_BLOCK_SIZE // (1024 * 1024)) * 1024 * 1024
+        return extract_txt(input_path, delimiter, plan, chunk_size, block_size)
+    elif file_type == 'xml':
+        return iter_xml_batches(input_path, file_config, chunk_size, plan)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def load_data(data, output_path, output_format, delimiter=None, compression=None, use_dictionary=True,
+              metrics=None):
+    # data is a DataFrame or an iterable of DataFrame chunks, written as they arrive
+    chunks = [data] if isinstance(data, pd.DataFrame) else data
+    write_chunks(chunks, output_path, output_format, metrics=metrics, delimiter=delimiter,
+                 compression=compression, use_dictionary=use_dictionary)
+
+
+def _timed_transform(chunks, metrics, path):
+    for chunk in chunks:
+        with metrics.stage('transform', path) as stage:
+            chunk = transform_data(chunk)
+            stage.rows = len(chunk)
+        yield chunk
+
+
+def process_file(file_type, config, metrics=None, optimize_dtypes=False):
+    file_config = config[file_type]
+    input_path = file_config['input_path']
+    output_path = file_config['output_path']
+    delimiter = file_config.get('delimiter', ',')
+
+    chunks = extract_chunks(file_type, file_config, plan=build_plan(file_config))
+    optimizer = None
+    if optimize_dtypes or file_config.get('optimize_dtypes'):
+        from dtype_optimizer import DtypeOptimizer
+
+        optimizer = DtypeOptimizer()
+        chunks = optimizer.optimize(chunks)
+    if metrics is None:
+        transformed_data = (transform_data(chunk) for chunk in chunks)
+    else:
+        # Reading includes parsing: every reader here hands out parsed DataFrames
+        metrics.add_file(input_path, os.path.getsize(input_path))
+        transformed_data = _timed_transform(metrics.timed_iter('read', chunks, input_path), metrics, input_path)
+    output_format = file_config.get('output_format', output_path.split('.')[-1])
+    load_data(transformed_data, output_path, output_format, delimiter,
+              compression=file_config.get('compression'), use_dictionary=file_config.get('use_dictionary', True),
+              metrics=metrics)
+    if optimizer is not None:
+        print('\n'.join(optimizer.report_lines()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='ETL Utility')
+    parser.add_argument('file_type', type=str, help='Type of the file to process (csv, txt, xml)')
+    parser.add_argument('config_path', type=str, help='Path to the configuration JSON file')
+    parser.add_argument('--explain', action='store_true', help='Print the column read plan before processing')
+    parser.add_argument('--optimize-dtypes', action='store_true',
+                        help='Convert chunks to compact dtypes (also enabled by "optimize_dtypes" in the config)')
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+
+    with open(args.config_path, 'r') as config_file:
+        config = json.load(config_file)
+
+    if args.explain:
+        file_config = config[args.file_type]
+        print('\n'.join(explain_plan(args.file_type, file_config, build_plan(file_config))))
+
+    with instrumented_run(f"dutil_{args.file_type}", **metrics_options(args)) as metrics:
+        process_file(args.file_type, config, metrics, args.optimize_dtypes)
@@ -1,115 +1,165 @@
-import pandas as pd
-import json
-import argparse
-import xml.etree.ElementTree as ET
-from sqlalchemy import create_engine
-
-
-def db_connect_insert(df):
-    # Load the configuration file
-    with open('db_config.json', 'r') as f:
-        config = json.load(f)
-
-    # Extract database configuration
-    db_config = config['databases']['postgres_db']
-    user = db_config['user']
-    password = db_config['password']
-    host = db_config['host']
-    port = db_config['port']
-    database = db_config['database']
-
-    # Create the database engine using the configuration
-    engine = create_engine(f'postgresql://{user}:{password}@{host}:{port}/{database}')
-    df.to_sql('db_table', con=engine, if_exists='replace', index=False)
-    print("\nData loaded into the database successfully.")
-
-    # Verify the data in the database
-    df_sql = pd.read_sql('select * from db_table', engine)
-    print("Data Extracted from Database:")
-    print(df_sql)
-
-
-def extract_csv(file_path, delimiter):
-    return pd.read_csv(file_path, delimiter=delimiter)
-
-
-def extract_txt(file_path, delimiter):
-    with open(file_path, 'r') as file:
-        data = [line.strip().split(delimiter) for line in file.readlines()]
-    headers = data[0]
-    rows = data[1:]
-    return pd.DataFrame(rows, columns=headers)
-
-
-def parse_xml_to_dict(xml_file):
-    tree = ET.parse(xml_file)
-    root = tree.getroot()
-    data = []
-    for book in root.findall('book'):
-        book_data = {
-            'id': book.get('id'),
-            'author': book.find('author').text,
-            'title': book.find('title').text,
-            'genre': book.find('genre').text,
-            'price': float(book.find('price').text),
-            'publish_date': book.find('publish_date').text,
-            'description': book.find('description').text,
-        }
-        data.append(book_data)
-    return data
-
-
-def extract_xml(file_path):
-    books_data = parse_xml_to_dict(file_path)
-    return pd.DataFrame(books_data)
-
-
-def transform_data(data_frame):
-    # Adjust the columns dynamically based on the input data
-    required_columns = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
-    columns_to_keep = [col for col in data_frame.columns if col in required_columns]
-    return data_frame[columns_to_keep]
-
-
-def load_data(data_frame, output_path, output_format, delimiter=None):
-    if output_format == 'csv':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-        db_connect_insert(data_frame)
-    elif output_format == 'txt':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-    elif output_format == 'json':
-        data_frame.to_csv(output_path, index=False, sep=delimiter)
-    else:
-        raise ValueError(f"Unsupported output format: {output_format}")
-
-
-def process_file(file_type, config):
-    input_path = config[file_type]['input_path']
-    output_path = config[file_type]['output_path']
-    delimiter = config[file_type].get('delimiter', ',')
-
-    if file_type == 'csv':
-        data = extract_csv(input_path, delimiter)
-    elif file_type == 'txt':
-        data = extract_txt(input_path, delimiter)
-    elif file_type == 'xml':
-        data = extract_xml(input_path)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
-
-    transformed_data = transform_data(data)
-    output_format = output_path.split('.')[-1]
-    load_data(transformed_data, output_path, output_format, delimiter)
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='ETL Utility')
-    parser.add_argument('file_type', type=str, help='Type of the file to process (csv, txt, xml)')
-    parser.add_argument('config_path', type=str, help='Path to the configuration JSON file')
-
-    args = parser.parse_args()
-
-    with open(args.config_path, 'r') as config_file:
-        config = json.load(config_file)
-
-    process_file(args.file_type, config)
+import pandas as pd
+import json
+import argparse
+import os
+import time
+import xml.etree.ElementTree as ET
+from multiprocessing import cpu_count
+
+# Engines are built once per process and database, then reused for every load
+_ENGINES = {}
+
+POOL_METRICS = {
+    'checkouts': 0,
+    'wait_seconds': 0.0,
+    'checkout_seconds': 0.0,
+}
+
+
+def _track_checkouts(engine):
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checkout_start'] = time.perf_counter()
+        POOL_METRICS['checkouts'] += 1
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        start = connection_record.info.pop('checkout_start', None)
+        if start is not None:
+            POOL_METRICS['checkout_seconds'] += time.perf_counter() - start
+
+
+def get_engine(db_name='postgres_db', config_path='db_config.json'):
+    key = (os.getpid(), config_path, db_name)
+    if key not in _ENGINES:
+        # SQLAlchemy is only needed by routes that load into the database
+        from sqlalchemy import create_engine
+
+        # Load the configuration file
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+
+        # Extract database configuration
+        db_config = config['databases'][db_name]
+        user = db_config['user']
+        password = db_config['password']
+        host = db_config['host']
+        port = db_config['port']
+        database = db_config['database']
+        pool_config = db_config.get('pool', {})
+
+        # Create the database engine using the configuration
+        engine = create_engine(
+            f'postgresql://{user}:{password}@{host}:{port}/{database}',
+            pool_size=pool_config.get('pool_size') or cpu_count(),
+            max_overflow=pool_config.get('max_overflow', 0),
+            pool_recycle=pool_config.get('pool_recycle', 1800),
+            pool_pre_ping=pool_config.get('pre_ping', True)
+        )
+        _track_checkouts(engine)
+        _ENGINES[key] = engine
+    return _ENGINES[key]
+
+
+def db_connect_insert(df):
+    engine = get_engine()
+    wait_start = time.perf_counter()
+    with engine.begin() as conn:
+        POOL_METRICS['wait_seconds'] += time.perf_counter() - wait_start
+        df.to_sql('db_table', con=conn, if_exists='replace', index=False)
+    print("\nData loaded into the database successfully.")
+
+    # Verify the data in the database
+    with engine.connect() as conn:
+        df_sql = pd.read_sql('select * from db_table', conn)
+    print("Data Extracted from Database:")
+    print(df_sql)
+    print("Connection pool metrics:", POOL_METRICS)
+
+
+def extract_csv(file_path, delimiter):
+    return pd.read_csv(file_path, delimiter=delimiter)
+
+
+def extract_txt(file_path, delimiter):
+    with open(file_path, 'r') as file:
+        data = [line.strip().split(delimiter) for line in file.readlines()]
+    headers = data[0]
+    rows = data[1:]
+    return pd.DataFrame(rows, columns=headers)
+
+
+def parse_xml_to_dict(xml_file):
+    tree = ET.parse(xml_file)
+    root = tree.getroot()
+    data = []
+    for book in root.findall('book'):
+        book_data = {
+            'id': book.get('id'),
+            'author': book.find('author').text,
+            'title': book.find('title').text,
+            'genre': book.find('genre').text,
+            'price': float(book.find('price').text),
+            'publish_date': book.find('publish_date').text,
+            'description': book.find('description').text,
+        }
+        data.append(book_data)
+    return data
+
+
+def extract_xml(file_path):
+    books_data = parse_xml_to_dict(file_path)
+    return pd.DataFrame(books_data)
+
+
+def transform_data(data_frame):
+    # Adjust the columns dynamically based on the input data
+    required_columns = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
+    columns_to_keep = [col for col in data_frame.columns if col in required_columns]
+    return data_frame[columns_to_keep]
+
+
+def load_data(data_frame, output_path, output_format, delimiter=None):
+    if output_format == 'csv':
+        data_frame.to_csv(output_path, index=False, sep=delimiter)
+        db_connect_insert(data_frame)
+    elif output_format == 'txt':
+        data_frame.to_csv(output_path, index=False, sep=delimiter)
+    elif output_format == 'json':
+        data_frame.to_csv(output_path, index=False, sep=delimiter)
+    else:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+
+def process_file(file_type, config):
+    input_path = config[file_type]['input_path']
+    output_path = config[file_type]['output_path']
+    delimiter = config[file_type].get('delimiter', ',')
+
+    if file_type == 'csv':
+        data = extract_csv(input_path, delimiter)
+    elif file_type == 'txt':
+        data = extract_txt(input_path, delimiter)
+    elif file_type == 'xml':
+        data = extract_xml(input_path)
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    transformed_data = transform_data(data)
+    output_format = output_path.split('.')[-1]
+    load_data(transformed_data, output_path, output_format, delimiter)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='ETL Utility')
+    parser.add_argument('file_type', type=str, help='Type of the file to process (csv, txt, xml)')
+    parser.add_argument('config_path', type=str, help='Path to the configuration JSON file')
+
+    args = parser.parse_args()
+
+    with open(args.config_path, 'r') as config_file:
+        config = json.load(config_file)
+
+    process_file(args.file_type, config)
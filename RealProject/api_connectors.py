@@ -0,0 +1,411 @@
+# api_connectors.py
+
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 60
+
+# Responses worth another attempt: throttling and transient server errors
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class ApiError(Exception):
+    """A request that failed for good, after its retries or with a non-retryable status."""
+
+
+class ApiStats:
+    """Request and record counters shared by the requests of one run."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.records = 0
+        self.failed_records = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+
+    def stop(self):
+        self.seconds = time.perf_counter() - self.started
+
+    def requests_per_sec(self):
+        return self.requests / self.seconds if self.seconds else 0.0
+
+    def records_per_sec(self):
+        return self.records / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        return (f"{self.records} records in {self.requests} requests ({self.retries} retries), "
+                f"{self.seconds:.2f}s: {self.requests_per_sec():,.1f} requests/sec, "
+                f"{self.records_per_sec():,.0f} records/sec")
+
+
+class Connector:
+    """
+    Generic JSON REST API.
+
+    Reads GET read_path page by page; writes POST batches of records to write_path as
+    {records_key: [...]}. Subclasses override the request shapes for a specific API.
+
+    APIConfig.json keys: "base_url", "read_path", "write_path", "records_key" (default
+    "records"), "pagination" ("page" for page/page_size parameters, "next" for a next-page
+    URL in the response under "next_key") and "token_env", the environment variable holding
+    a bearer token.
+    """
+
+    name = 'rest'
+    max_batch_size = None  # Records per request the API accepts at most
+
+    def __init__(self, config):
+        self.config = config
+        self.base_url = config['base_url'].rstrip('/')
+        self.records_key = config.get('records_key', 'records')
+        self.pagination = config.get('pagination', 'page')
+
+    def url(self, path):
+        return path if path.startswith(('http://', 'https://')) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def headers(self):
+        headers = {'Accept': 'application/json'}
+        token_env = self.config.get('token_env')
+        if token_env and os.environ.get(token_env):
+            headers['Authorization'] = f"Bearer {os.environ[token_env]}"
+        return headers
+
+    def first_page(self, page_size):
+        """(url, params) of the first page of a "next" paginated read."""
+        return self.url(self.config.get('read_path', '')), {'limit': page_size}
+
+    def page(self, number, page_size):
+        """(url, params) of a numbered page, for APIs that can be read out of order."""
+        return self.url(self.config.get('read_path', '')), {'page': number, 'page_size': page_size}
+
+    def parse_page(self, body):
+        """Return (records, next (url, params) or None) of a page response."""
+        records = body if isinstance(body, list) else body.get(self.records_key, [])
+        next_url = None if isinstance(body, list) else body.get(self.config.get('next_key', 'next'))
+        return records, ((self.url(next_url), None) if next_url else None)
+
+    def write_request(self, records):
+        """(url, JSON payload) posting one batch of records."""
+        return self.url(self.config.get('write_path', '')), {self.records_key: records}
+
+    def failed_records(self, body):
+        """Number of records of a write the API rejected although the request succeeded."""
+        return 0
+
+
+class SalesforceConnector(Connector):
+    """
+    Salesforce REST API: SOQL query reads with nextRecordsUrl paging, and sObject
+    Collections writes of at most 200 records per request.
+
+    Extra APIConfig.json keys: "query" (SOQL text) and "sobject" (e.g. "Contact").
+    """
+
+    name = 'salesforce'
+    max_batch_size = 200
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.pagination = 'next'
+
+    def headers(self):
+        # Salesforce picks the page size itself; this header only caps it
+        return {**super().headers(), 'Sforce-Query-Options': f"batchSize={self.config.get('query_batch_size', 2000)}"}
+
+    def first_page(self, page_size):
+        return self.url('query'), {'q': self.config['query']}
+
+    def parse_page(self, body):
+        records = [{name: value for name, value in record.items() if name != 'attributes'}
+                   for record in body.get('records', [])]
+        if body.get('done', True) or not body.get('nextRecordsUrl'):
+            return records, None
+        # nextRecordsUrl is relative to the instance, not to the versioned base_url
+        instance = self.base_url.split('/services/')[0]
+        return records, (instance + body['nextRecordsUrl'], None)
+
+    def write_request(self, records):
+        sobject = {'type': self.config['sobject']}
+        return self.url('composite/sobjects'), {'allOrNone': False,
+                                                'records': [{'attributes': sobject, **record} for record in records]}
+
+    def failed_records(self, body):
+        return sum(1 for result in body if not result.get('success', True)) if isinstance(body, list) else 0
+
+
+CONNECTORS = {
+    'rest': Connector,
+    'salesforce': SalesforceConnector,
+}
+
+
+def connector_for(api_config):
+    """Connector for an APIConfig.json entry; its "type" selects the class."""
+    if not isinstance(api_config, dict) or 'base_url' not in api_config:
+        raise ValueError(f"API config {api_config!r} has no base_url; see APIConfig.json")
+    connector_class = CONNECTORS.get(api_config.get('type', 'rest'))
+    if connector_class is None:
+        raise ValueError(f"Unsupported API type: {api_config.get('type')}")
+    return connector_class(api_config)
+
+
+class ApiClient:
+    """
+    One pooled aiohttp session with bounded concurrency and retries.
+
+    At most concurrency requests are in flight, over at most as many kept-alive
+    connections. A failed attempt (connection error, timeout or a status in RETRY_STATUSES)
+    is retried after an exponential backoff with jitter, or after the server's Retry-After.
+
+    :param connector: Connector building the requests.
+    :param stats: ApiStats to count into.
+    """
+
+    def __init__(self, connector, stats, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT):
+        self.connector = connector
+        self.stats = stats
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = None
+        self.slots = None
+
+    async def __aenter__(self):
+        # aiohttp is only needed by the API routes
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        self.session = aiohttp.ClientSession(connector=connector, headers=self.connector.headers(),
+                                             timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                             json_serialize=lambda data: json.dumps(data, default=str))
+        self.slots = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.session.close()
+
+    async def request(self, method, url, params=None, payload=None):
+        """Send one request and return its decoded JSON body."""
+        import aiohttp
+
+        for attempt in range(self.retries + 1):
+            delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+            async with self.slots:
+                self.stats.requests += 1
+                try:
+                    async with self.session.request(method, url, params=params, json=payload) as response:
+                        if response.status < 400:
+                            return await response.json(content_type=None)
+                        text = await response.text()
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            raise ApiError(f"{method} {url} failed with {response.status}: {text[:200]}")
+                        retry_after = response.headers.get('Retry-After', '')
+                        if retry_after.isdigit():
+                            delay = float(retry_after)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    if attempt == self.retries:
+                        raise ApiError(f"{method} {url} failed after {attempt + 1} attempts: {error!r}") from error
+            # Back off outside the semaphore, so waiting retries do not hold a request slot
+            self.stats.retries += 1
+            await asyncio.sleep(delay)
+
+
+def _records(frame):
+    """JSON-ready records of a DataFrame: NaN becomes null and timestamps ISO strings."""
+    return json.loads(frame.to_json(orient='records', date_format='iso'))
+
+
+async def _write(connector, batches, done, stats, concurrency, retries, backoff):
+    """Post the record batches arriving on a queue until done, with up to concurrency requests in flight."""
+    async with ApiClient(connector, stats, concurrency, retries, backoff) as client:
+        pending = set()
+        errors = []
+
+        async def send(records):
+            url, payload = connector.write_request(records)
+            body = await client.request('POST', url, payload=payload)
+            failed = connector.failed_records(body)
+            stats.records += len(records) - failed
+            stats.failed_records += failed
+
+        def finished(task):
+            pending.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                errors.append(task.exception())
+
+        while not errors:
+            records = await asyncio.to_thread(batches.get)
+            if records is done:
+                break
+            # Backpressure: at most two batches per request slot wait in memory
+            while len(pending) >= concurrency * 2:
+                await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            task = asyncio.create_task(send(records))
+            pending.add(task)
+            task.add_done_callback(finished)
+        if pending:
+            await asyncio.wait(pending)
+        if errors:
+            raise errors[0]
+
+
+def write_chunks(api_config, chunks, batch_size=None, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES,
+                 stats=None, backoff=DEFAULT_BACKOFF):
+    """
+    Post a stream of DataFrame chunks to an API, batch_size records per request.
+
+    The chunks are iterated in the calling thread, so a source bound to it (such as a
+    SQLite cursor) keeps working; the event loop posting them runs in a background thread
+    and takes batches from a bounded queue.
+
+    :param api_config: APIConfig.json entry.
+    :param chunks: Iterable of DataFrames, e.g. extract_file or iter_query output.
+    :param batch_size: Records per request, capped at the connector's max_batch_size.
+    :param concurrency: Requests in flight at once.
+    :param backoff: Seconds before the first retry, doubled for each further attempt.
+    :return: ApiStats of the run.
+    """
+    connector = connector_for(api_config)
+    batch_size = batch_size or DEFAULT_BATCH_SIZE
+    if connector.max_batch_size:
+        batch_size = min(batch_size, connector.max_batch_size)
+    stats = stats if stats is not None else ApiStats()
+    batches = queue.Queue(maxsize=concurrency * 2)
+    done = object()
+    errors = []
+
+    def run():
+        try:
+            asyncio.run(_write(connector, batches, done, stats, concurrency, retries, backoff))
+        except Exception as error:
+            errors.append(error)
+
+    def put(item):
+        # A writer that stopped on an error no longer drains the queue
+        while thread.is_alive():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def record_batches():
+        for frame in chunks:
+            records = _records(frame)
+            for offset in range(0, len(records), batch_size):
+                yield records[offset:offset + batch_size]
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        for records in record_batches():
+            if not put(records):
+                break
+    finally:
+        put(done)
+        thread.join()
+        stats.stop()
+    if errors:
+        raise errors[0]
+    return stats
+
+
+async def _pages(client, connector, page_size):
+    """Yield the record lists of every page, in order."""
+    if connector.pagination == 'page':
+        # Numbered pages can be fetched a window at a time; a short page ends the stream
+        number = 1
+        while True:
+            window = [connector.page(number + offset, page_size) for offset in range(client.concurrency)]
+            bodies = await asyncio.gather(*(client.request('GET', url, params) for url, params in window))
+            for body in bodies:
+                records, _ = connector.parse_page(body)
+                if records:
+                    yield records
+                if len(records) < page_size:
+                    return
+            number += len(window)
+    else:
+        # Cursor pagination: each page names the next one, so pages are read one after another
+        next_page = connector.first_page(page_size)
+        while next_page is not None:
+            body = await client.request('GET', *next_page)
+            records, next_page = connector.parse_page(body)
+            if records:
+                yield records
+
+
+def read_chunks(api_config, page_size=None, concurrency=DEFAULT_CONCURRENCY, retries=DEFAULT_RETRIES,
+                stats=None, queue_size=4, backoff=DEFAULT_BACKOFF):
+    """
+    Stream an API's records as one DataFrame per page.
+
+    The event loop runs in a background thread and hands pages over through a bounded
+    queue, so the consumer (a file writer or a StreamingLoader) works while the next pages
+    download, and at most queue_size pages wait in memory.
+
+    :param api_config: APIConfig.json entry.
+    :param page_size: Records per page, for APIs that take one.
+    :param stats: ApiStats to count into; stopped when the stream ends.
+    :param backoff: Seconds before the first retry, doubled for each further attempt.
+    :return: Generator of DataFrames.
+    """
+    import pandas as pd
+
+    connector = connector_for(api_config)
+    page_size = page_size or DEFAULT_PAGE_SIZE
+    stats = stats if stats is not None else ApiStats()
+    pages = queue.Queue(maxsize=queue_size)
+    done = object()
+    stop = threading.Event()
+
+    async def produce():
+        async with ApiClient(connector, stats, concurrency, retries, backoff) as client:
+            async for records in _pages(client, connector, page_size):
+                stats.records += len(records)
+                # Blocks a worker thread, not the loop, while the consumer catches up
+                await asyncio.to_thread(pages.put, records)
+                if stop.is_set():
+                    return
+
+    def run():
+        try:
+            asyncio.run(produce())
+        except Exception as error:
+            pages.put(error)
+        finally:
+            pages.put(done)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield pd.DataFrame.from_records(item)
+    finally:
+        stop.set()
+        # Unblock a producer waiting on a full queue so its session gets closed
+        while thread.is_alive():
+            try:
+                pages.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        stats.stop()
@@ -0,0 +1,444 @@
+# db_loader.py
+
+import csv
+import io
+import queue
+import re
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_COMMIT_EVERY = 50000
+DEFAULT_FETCH_SIZE = 10000
+DEFAULT_SAMPLE_ROWS = 50000
+
+
+def _quote(name):
+    """Quote an identifier taken from a file header, which may hold spaces or keywords."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _kind(column):
+    """Type kind of one chunk's column, or None when it holds no values to go by."""
+    if not column.notna().any():
+        return None
+    if pd.api.types.is_bool_dtype(column.dtype):
+        return 'bool'
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return 'int'
+    if pd.api.types.is_float_dtype(column.dtype):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        return 'datetime'
+    return 'text'
+
+
+def _widen(kind, other):
+    """Kind holding both: a column without values takes the other, int widens to float, else text."""
+    if kind is None or kind == other:
+        return other
+    if other is None:
+        return kind
+    if {kind, other} == {'int', 'float'}:
+        return 'float'
+    return 'text'
+
+
+class Dialect:
+    """
+    Generic DB-API 2 target: CREATE TABLE from sampled dtypes and executemany inserts.
+
+    Subclasses override the type names, the placeholder style, the existence check and,
+    where the driver has one, the bulk path in insert_batch.
+    """
+
+    name = 'sql'
+    types = {'int': 'BIGINT', 'float': 'DOUBLE PRECISION', 'bool': 'BOOLEAN',
+             'datetime': 'TIMESTAMP', 'text': 'VARCHAR(4000)'}
+
+    def placeholders(self, count):
+        return ', '.join(['?'] * count)
+
+    def column_type(self, columns):
+        """
+        SQL type for one column seen across several chunks.
+
+        A column that is empty in every chunk is text, since nothing says it is numeric.
+        """
+        kind = None
+        for column in columns:
+            kind = _widen(kind, _kind(column))
+        return self.types[kind or 'text']
+
+    def table_exists(self, cursor, table):
+        try:
+            cursor.execute(f"SELECT 1 FROM {table} WHERE 1 = 0")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def create_table(self, cursor, table, frames):
+        columns = ', '.join(f"{_quote(name)} {self.column_type(frame[name] for frame in frames)}"
+                            for name in frames[0].columns)
+        cursor.execute(f"CREATE TABLE {table} ({columns})")
+
+    def rows(self, frame):
+        """Plain Python tuples with None for missing values, which every driver binds."""
+        values = frame.astype(object).where(frame.notna(), None)
+        return list(values.itertuples(index=False, name=None))
+
+    def query_cursor(self, conn, fetch_size):
+        """Cursor for streaming a query; drivers without server-side cursors fetch in arraysize batches."""
+        cursor = conn.cursor()
+        cursor.arraysize = fetch_size
+        return cursor
+
+    def insert_batch(self, cursor, table, frame):
+        columns = ', '.join(_quote(name) for name in frame.columns)
+        cursor.executemany(f"INSERT INTO {table} ({columns}) VALUES ({self.placeholders(len(frame.columns))})",
+                           self.rows(frame))
+
+
+class PostgresDialect(Dialect):
+    """COPY ... FROM STDIN per batch, the fastest load path psycopg2 offers."""
+
+    name = 'postgres'
+    types = dict(Dialect.types, text='TEXT')
+
+    def placeholders(self, count):
+        return ', '.join(['%s'] * count)
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT to_regclass(%s)", (table,))
+        return cursor.fetchone()[0] is not None
+
+    def query_cursor(self, conn, fetch_size):
+        # A named cursor keeps the result set on the server; without one psycopg2 buffers every row
+        cursor = conn.cursor(name=f"etl_export_{threading.get_ident()}")
+        cursor.itersize = fetch_size
+        return cursor
+
+    def insert_batch(self, cursor, table, frame):
+        # A float column of whole numbers (an int column with NaN) is written as 1, not 1.0,
+        # which COPY accepts for both BIGINT and DOUBLE PRECISION columns
+        for name in frame.columns:
+            column = frame[name]
+            if column.dtype.kind == 'f' and (column.dropna() % 1 == 0).all():
+                frame = frame.assign(**{name: column.astype('Int64')})
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_MINIMAL, date_format='%Y-%m-%d %H:%M:%S')
+        buffer.seek(0)
+        columns = ', '.join(_quote(name) for name in frame.columns)
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+class OracleDialect(Dialect):
+    """executemany with positional binds, which python-oracledb sends as one array bind."""
+
+    name = 'oracle'
+    types = {'int': 'NUMBER(19)', 'float': 'BINARY_DOUBLE', 'bool': 'NUMBER(1)',
+             'datetime': 'TIMESTAMP', 'text': 'VARCHAR2(4000)'}
+
+    def query_cursor(self, conn, fetch_size):
+        cursor = super().query_cursor(conn, fetch_size)
+        cursor.prefetchrows = fetch_size + 1
+        return cursor
+
+    def placeholders(self, count):
+        return ', '.join(f":{position}" for position in range(1, count + 1))
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT COUNT(*) FROM user_tables WHERE table_name = :1", (table.upper(),))
+        return cursor.fetchone()[0] > 0
+
+
+class SqlServerDialect(Dialect):
+    """Microsoft SQL Server over pyodbc, with fast_executemany binding a whole batch as parameter arrays."""
+
+    name = 'sqlserver'
+    types = {'int': 'BIGINT', 'float': 'FLOAT', 'bool': 'BIT',
+             'datetime': 'DATETIME2', 'text': 'NVARCHAR(4000)'}
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT OBJECT_ID(?, 'U')", (table,))
+        return cursor.fetchone()[0] is not None
+
+    def insert_batch(self, cursor, table, frame):
+        cursor.fast_executemany = True
+        super().insert_batch(cursor, table, frame)
+
+
+class SqliteDialect(Dialect):
+    """Local stand-in target: one transaction per commit interval makes executemany fast."""
+
+    name = 'sqlite'
+    types = {'int': 'INTEGER', 'float': 'REAL', 'bool': 'INTEGER', 'datetime': 'TEXT', 'text': 'TEXT'}
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone()[0] > 0
+
+    def rows(self, frame):
+        # sqlite3 has no adapter for pandas Timestamps
+        for name in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[name].dtype):
+                frame = frame.assign(**{name: frame[name].dt.strftime('%Y-%m-%d %H:%M:%S')})
+        return super().rows(frame)
+
+
+DIALECTS = {
+    'postgres': PostgresDialect,
+    'oracle': OracleDialect,
+    'sqlserver': SqlServerDialect,
+    'sql': SqlServerDialect,  # Older configs name SQL Server "sql"
+    'sqlite': SqliteDialect,
+}
+
+
+def connect(db_config):
+    """
+    Open a connection for a DbConfig.json entry and return (connection, dialect).
+
+    Drivers are imported for the configured type only, so loading into SQLite needs none
+    of psycopg2, oracledb or pyodbc.
+
+    :param db_config: Entry with "type" and its connection fields. The types are postgres
+        (psycopg2), oracle (oracledb), sqlserver (Microsoft SQL Server via pyodbc; "sql" is
+        accepted as an older name for it) and sqlite.
+    """
+    db_type = db_config['type']
+    if db_type not in DIALECTS:
+        raise ValueError(f"Unsupported database type: {db_type}")
+    if db_type == 'postgres':
+        import psycopg2
+
+        conn = psycopg2.connect(dbname=db_config['database'], user=db_config['user'],
+                                password=db_config['password'], host=db_config['host'], port=db_config['port'])
+    elif db_type == 'oracle':
+        import oracledb
+
+        dsn = oracledb.makedsn(db_config['host'], db_config['port'], service_name=db_config['service_name'])
+        conn = oracledb.connect(user=db_config['user'], password=db_config['password'], dsn=dsn)
+    elif db_type in ('sqlserver', 'sql'):
+        import pyodbc
+
+        conn = pyodbc.connect(
+            f"DRIVER={{{db_config.get('driver', 'ODBC Driver 18 for SQL Server')}}};"
+            f"SERVER={db_config['host']},{db_config['port']};DATABASE={db_config['service_name']};"
+            f"UID={db_config['user']};PWD={db_config['password']}")
+    else:
+        import sqlite3
+
+        conn = sqlite3.connect(db_config['database'])
+    return conn, DIALECTS[db_type]()
+
+
+class StreamingLoader:
+    """
+    Load DataFrame chunks into one table in batches, committing at a fixed row interval.
+
+    When the table does not exist yet, chunks are held back until sample_rows rows (or the
+    whole stream, if shorter) have arrived, and the column types are taken from all of them:
+    a column empty so far takes the type of later values, int widens to float when any
+    chunk has decimals or NaN, and mixed or all-empty columns are text. Each chunk is cut
+    into batch_size slices for the dialect's bulk path, and the transaction is committed
+    every commit_every rows and once more on close, so a failed load loses at most one
+    commit interval.
+
+    :param conn: Open DB-API connection.
+    :param dialect: Dialect matching the connection.
+    :param table: Target table name (letters, digits, underscores and an optional schema prefix).
+    :param batch_size: Rows per bulk insert call.
+    :param commit_every: Rows between commits.
+    :param sample_rows: Rows to look at before creating a missing table.
+    """
+
+    def __init__(self, conn, dialect, table, batch_size=DEFAULT_BATCH_SIZE, commit_every=DEFAULT_COMMIT_EVERY,
+                 sample_rows=DEFAULT_SAMPLE_ROWS):
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?', table):
+            raise ValueError(f"Invalid table name: {table}")
+        self.conn = conn
+        self.dialect = dialect
+        self.table = table
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.sample_rows = sample_rows
+        self.cursor = conn.cursor()
+        self.created = None
+        self.sample = []
+        self.rows = 0
+        self.batches = 0
+        self.commits = 0
+        self.seconds = 0.0
+        self.uncommitted = 0
+
+    def _prepare(self):
+        if self.dialect.table_exists(self.cursor, self.table):
+            self.created = False
+        else:
+            self.dialect.create_table(self.cursor, self.table, self.sample)
+            self.created = True
+        # Some drivers open a transaction for the catalog query; start the load from a clean one
+        self.conn.commit()
+
+    def load(self, frame):
+        """Insert one chunk; returns the number of rows loaded by this call, 0 while chunks are held as the sample."""
+        if not len(frame):
+            return 0
+        start = time.perf_counter()
+        if self.created is None:
+            self.sample.append(frame)
+            if sum(len(sample) for sample in self.sample) < self.sample_rows:
+                self.seconds += time.perf_counter() - start
+                return 0
+            rows = self._flush_sample()
+        else:
+            rows = self._insert(frame)
+        self.seconds += time.perf_counter() - start
+        return rows
+
+    def _flush_sample(self):
+        self._prepare()
+        sample, self.sample = self.sample, []
+        return sum(self._insert(frame) for frame in sample)
+
+    def _insert(self, frame):
+        for offset in range(0, len(frame), self.batch_size):
+            batch = frame.iloc[offset:offset + self.batch_size]
+            self.dialect.insert_batch(self.cursor, self.table, batch)
+            self.batches += 1
+            self.uncommitted += len(batch)
+            if self.uncommitted >= self.commit_every:
+                self.commit()
+        self.rows += len(frame)
+        return len(frame)
+
+    def commit(self):
+        if self.uncommitted:
+            self.conn.commit()
+            self.commits += 1
+            self.uncommitted = 0
+
+    def close(self):
+        start = time.perf_counter()
+        if self.sample:
+            self._flush_sample()
+        self.commit()
+        self.seconds += time.perf_counter() - start
+        self.cursor.close()
+
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def iter_query(conn, dialect, query, fetch_size=DEFAULT_FETCH_SIZE, params=None):
+    """
+    Stream a query's result as DataFrame batches of at most fetch_size rows.
+
+    Rows are pulled with fetchmany from a server-side cursor where the dialect has one, so
+    only one batch is held in memory regardless of the result size.
+    """
+    cursor = dialect.query_cursor(conn, fetch_size)
+    try:
+        cursor.execute(query, params) if params else cursor.execute(query)
+        columns = None
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if columns is None:
+                # A named Postgres cursor only has a description after the first fetch
+                columns = [column[0] for column in cursor.description]
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=columns)
+    finally:
+        cursor.close()
+
+
+def _subquery(query):
+    return query.strip().rstrip(';')
+
+
+def key_ranges(conn, dialect, query, key, parts):
+    """
+    Split a query's integer key space into parts half-open [low, high) ranges covering MIN to MAX.
+
+    :return: List of (low, high) tuples; empty when the query returns no rows.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM ({_subquery(query)}) q")
+    low, high = cursor.fetchone()
+    cursor.close()
+    if low is None:
+        return []
+    low, high = int(low), int(high)
+    step = max(1, -(-(high - low + 1) // parts))
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+def iter_query_parallel(db_config, query, key, parts, fetch_size=DEFAULT_FETCH_SIZE, queue_size=4):
+    """
+    Stream a query over several connections, each reading one key range.
+
+    Batches arrive in completion order, not key order. A bounded queue between the reader
+    threads and the consumer keeps at most queue_size batches in flight, so memory stays
+    bounded however large the result is.
+
+    :param db_config: DbConfig.json entry; every reader opens its own connection from it.
+    :param key: Integer column of the query to split on, e.g. the primary key.
+    :param parts: Number of key ranges and reader connections.
+    """
+    if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', key):
+        raise ValueError(f"Invalid key column: {key}")
+    conn, dialect = connect(db_config)
+    try:
+        ranges = key_ranges(conn, dialect, query, key, parts)
+    finally:
+        conn.close()
+    if not ranges:
+        return
+
+    batches = queue.Queue(maxsize=queue_size)
+    done = object()
+    stop = threading.Event()
+    lower, upper = dialect.placeholders(2).split(', ')
+
+    def read(low, high):
+        try:
+            conn, dialect = connect(db_config)
+            try:
+                ranged = f"SELECT * FROM ({_subquery(query)}) q WHERE {key} >= {lower} AND {key} < {upper}"
+                for batch in iter_query(conn, dialect, ranged, fetch_size, (low, high)):
+                    if stop.is_set():
+                        break
+                    batches.put(batch)
+            finally:
+                conn.close()
+        except Exception as error:
+            batches.put(error)
+        finally:
+            batches.put(done)
+
+    threads = [threading.Thread(target=read, args=bounds, daemon=True) for bounds in ranges]
+    for thread in threads:
+        thread.start()
+    remaining = len(threads)
+    try:
+        while remaining:
+            item = batches.get()
+            if item is done:
+                remaining -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        # Unblock readers waiting on a full queue so their connections get closed
+        while any(thread.is_alive() for thread in threads):
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
@@ -1,260 +1,850 @@
-import argparse
-import json
-import os
-import pandas as pd
-from datetime import datetime
-
-
-def load_json(file_name):
-    """
-    Load and return the JSON data from the given file.
-
-    :param file_name: Name of the JSON file to be loaded.
-    :return: Parsed JSON data.
-    """
-    with open(file_name, 'r') as file:
-        return json.load(file)
-
-
-def read_database_config(file_name, number):
-    """
-    Read the database configuration from a JSON file for the given number.
-
-    :param file_name: Name of the JSON file containing the configuration.
-    :param number: The key in the JSON file for which the config is to be read.
-    :return: The type of the database from the configuration.
-    """
-    print(f"\nReading {file_name} file ..")
-    config = load_json(file_name)
-    db_full = config[str(number)]
-    db_type = config[str(number)]["type"]
-    print("DB FUll Data is ",db_full)
-    print(f"\n Extracted Database type is {db_type} \n")
-    return db_full
-
-
-def read_file_config(file_name, number):
-    """
-    Read the file configuration from a JSON file for the given number.
-
-    :param file_name: Name of the JSON file containing the configuration.
-    :param number: The key in the JSON file for which the config is to be read.
-    :return: A tuple containing file info and file extension.
-    """
-    print(f"\nReading {file_name} file ...")
-    config = load_json(file_name)
-    file_info = config[str(number)]
-    file_name = file_info["file_name"]
-    file_extension = os.path.splitext(file_name)[1][1:]  # Extract extension from file_name
-    delimiter = file_info.get("delimiter", "")  # Get delimiter from file_info, default to empty string if not present
-    print(f"Extracted file name: {file_name}  with Delimiter: '{delimiter}' \n")
-    return file_name, delimiter, file_extension
-
-
-def read_file_output_config(file_name, number):
-    """
-    Read the output file configuration from a JSON file for the given number.
-
-    :param file_name: Name of the JSON file containing the configuration.
-    :param number: The key in the JSON file for which the config is to be read.
-    :return: The type of the output from the configuration.
-    """
-    print(f"\nReading {file_name} file ..")
-    config = load_json(file_name)
-    file_type = config[str(number)]
-    print(f"Extracted File type which we need to convert is {file_type} type \n")
-    return file_type
-
-
-def read_api_config(file_name, number):
-    """
-    Read the API configuration from a JSON file for the given number.
-
-    :param file_name: Name of the JSON file containing the configuration.
-    :param number: The key in the JSON file for which the config is to be read.
-    :return: The name of the API from the configuration.
-    """
-    print(f"Reading {file_name} file")
-    config = load_json(file_name)
-    api_name = config[str(number)]
-    print(f"Extracted API name from file is {api_name} \n")
-    return api_name
-
-
-# Define utility functions for each conversion
-def file_to_db(source, target, target_table):
-    # print("File_to_db",source,target)
-    print(f"We are in a function file_to_db to Extract {source[0][0]} and Save the {target_table} table to {target[0]['type']}  DB\n")
-    print("Work in progress....")
-
-
-def transform_data(data_frame):
-    # Adjust the columns dynamically based on the input data
-    required_columns = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
-    columns_to_keep = [col for col in data_frame.columns if col in required_columns]
-    return data_frame[columns_to_keep]
-
-
-def extract_csv(file_path, delimiter):
-    return pd.read_csv(file_path, delimiter=delimiter)
-
-
-def file_to_output(source, target):
-    print(f"We are in a function file_to_output to Extract {source[0][0]} and convert to {target[0]} format")
-    # print("^^^^^^^^^^^^^^^^^^^^^^^^^^^")
-    # print(source)
-    # print("Target",target[0])
-    output_format = target[0]
-    filename = source[0][0]
-    delimiter = source[0][1]
-    print("filename is :", filename)
-    print("delimiter is :", delimiter)
-    data = extract_csv(filename, delimiter)
-    data_frame = transform_data(data)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"output_{timestamp}.{output_format}"
-    if output_format == 'csv':
-        data_frame.to_csv(filename, index=False, sep=delimiter)
-    elif output_format == 'txt':
-        data_frame.to_csv(filename, index=False, sep=delimiter)
-    elif output_format == 'json':
-        data_frame.to_json(filename, orient='records', indent=4, lines=False)
-    else:
-        raise ValueError(f"Unsupported output format: {output_format}")
-
-    print(f"{filename} Created Successfully..")
-
-
-def file_to_api():
-    print("Calling File to API Utility....")
-
-
-def db_to_file():
-    print("Calling DB to File Utility....")
-
-
-def db_to_output():
-    print("Calling DB to File Conversion Logic....")
-
-
-def db_to_api():
-    print("Calling DB to API Utility....")
-
-
-def output_to_file():
-    print("Calling Output to File Utility....")
-
-
-def output_to_db():
-    print("Calling Output to DB Utility....")
-
-
-def output_to_api():
-    print("Calling Output to API Utility....")
-
-
-def api_to_file():
-    print("Calling API to File Utility....")
-
-
-def api_to_db():
-    print("Calling API to DB Utility....")
-
-
-def api_to_output():
-    print("Calling API to Output Utility....")
-
-
-def process_file(file, num):
-    """
-    Process the configuration file based on its type.
-
-    :param file: JSON configuration file name.
-    :param num: Key number to access in the JSON file.
-    :return: Tuple containing configuration data and its type.
-    """
-    if 'DbConfig' in file:
-        return read_database_config(file, num), "DB"
-    elif 'FileConfig' in file:
-        return read_file_config(file, num), "FILE"
-    elif 'OutputConfig' in file:
-        return read_file_output_config(file, num), "OUTPUT"
-    elif 'APIConfig' in file:
-        return read_api_config(file, num), "API"
-    else:
-        print(f"Unknown configuration type for {file}")
-
-
-def main():
-    parser = argparse.ArgumentParser(description='Read database type and file info from JSON config files.')
-
-    parser.add_argument('fileConfig1', type=str, help='The first JSON configuration file')
-    parser.add_argument('num1', type=int, help='The key number to access in the first JSON file')
-    parser.add_argument('fileConfig2', type=str, help='The second JSON configuration file')
-    parser.add_argument('num2', type=int, help='The key number to access in the second JSON file')
-
-    # Adding optional table argument which will be required only if the target is DB
-    parser.add_argument('--target_table', type=str, help='Provide table to save the Data',
-                        required=False)
-
-    parser.add_argument('--query', type=str, help='Provide FileConfig with txt file as number to retrive and save to file with comma seperated number',
-                        required=False)
-
-    args = parser.parse_args()
-
-    source_main = process_file(args.fileConfig1, args.num1)
-    target_main = process_file(args.fileConfig2, args.num2)
-    print("Source:", source_main[-1], "Target:", target_main[-1])
-    print(f"\nBy the inputs you passed we need to convert source {source_main[-1]} to target {target_main[-1]} type \n")
-
-    source, target = source_main[-1], target_main[-1]
-    target_table = None
-    query_txt = None
-    if source == "DB":
-        if args.query is None:
-            parser.error("Please Provide the FileConfig with txt file number which contains query to save.. using --query FileConfig.json,2 ")
-        query_txt = args.query
-        print("query_txt is ",query_txt)
-
-    if target == "DB":
-        if args.target_table is None:
-            parser.error("Please Provide Which table to insert using --table1 ... ")
-        target_table = args.target_table
-
-    # Check the combination and call the appropriate function
-    if source == target:
-        print(f"This Combination is not allowed: Source and Target both are {source}")
-    else:
-        if source == "FILE":
-            if target == "DB":
-                file_to_db(source_main, target_main, target_table)
-            elif target == "OUTPUT":
-                file_to_output(source_main, target_main)
-            elif target == "API":
-                file_to_api()
-        elif source == "DB":
-            if target == "FILE":
-                print("This Combination is not allowed: From DB to FILE ")
-                # db_to_file()
-            elif target == "OUTPUT":
-                db_to_output()
-            elif target == "API":
-                db_to_api()
-        elif source == "OUTPUT":
-            if target == "FILE":
-                output_to_file()
-            elif target == "DB":
-                output_to_db()
-            elif target == "API":
-                output_to_api()
-        elif source == "API":
-            if target == "FILE":
-                api_to_file()
-            elif target == "DB":
-                api_to_db()
-            elif target == "OUTPUT":
-                api_to_output()
-
-
-if __name__ == '__main__':
-    main()
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import ExitStack
+from datetime import datetime
+
+# Shared readers and writers live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etl_metrics import RunMetrics, add_metrics_arguments, instrumented_run, metrics_options  # noqa: E402
+from output_writers import open_writer  # noqa: E402
+from result_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_MB, ResultCache  # noqa: E402
+
+# Requests in flight at once on the API routes
+DEFAULT_API_CONCURRENCY = 8
+
+
+def load_json(file_name):
+    """
+    Load and return the JSON data from the given file.
+
+    :param file_name: Name of the JSON file to be loaded.
+    :return: Parsed JSON data.
+    """
+    with open(file_name, 'r') as file:
+        return json.load(file)
+
+
+def read_database_config(file_name, number):
+    """
+    Read the database configuration from a JSON file for the given number.
+
+    :param file_name: Name of the JSON file containing the configuration.
+    :param number: The key in the JSON file for which the config is to be read.
+    :return: The type of the database from the configuration.
+    """
+    print(f"\nReading {file_name} file ..")
+    config = load_json(file_name)
+    db_full = config[str(number)]
+    db_type = config[str(number)]["type"]
+    print("DB FUll Data is ",db_full)
+    print(f"\n Extracted Database type is {db_type} \n")
+    return db_full
+
+
+def read_file_config(file_name, number):
+    """
+    Read the file configuration from a JSON file for the given number.
+
+    :param file_name: Name of the JSON file containing the configuration.
+    :param number: The key in the JSON file for which the config is to be read.
+    :return: A tuple containing file info and file extension.
+    """
+    print(f"\nReading {file_name} file ...")
+    config = load_json(file_name)
+    file_info = config[str(number)]
+    file_name = file_info["file_name"]
+    file_extension = os.path.splitext(file_name)[1][1:]  # Extract extension from file_name
+    delimiter = file_info.get("delimiter", "")  # Get delimiter from file_info, default to empty string if not present
+    print(f"Extracted file name: {file_name}  with Delimiter: '{delimiter}' \n")
+    return file_name, delimiter, file_extension
+
+
+def read_file_output_config(file_name, number):
+    """
+    Read the output file configuration from a JSON file for the given number.
+
+    :param file_name: Name of the JSON file containing the configuration.
+    :param number: The key in the JSON file for which the config is to be read.
+    :return: The type of the output from the configuration.
+    """
+    print(f"\nReading {file_name} file ..")
+    config = load_json(file_name)
+    file_type = config[str(number)]
+    print(f"Extracted File type which we need to convert is {file_type} type \n")
+    return file_type
+
+
+def read_api_config(file_name, number):
+    """
+    Read the API configuration from a JSON file for the given number.
+
+    :param file_name: Name of the JSON file containing the configuration.
+    :param number: The key in the JSON file for which the config is to be read.
+    :return: The API configuration; its "type" selects the connector.
+    """
+    print(f"Reading {file_name} file")
+    config = load_json(file_name)
+    api_config = config[str(number)]
+    print(f"Extracted API name from file is {api_config['name']} \n")
+    return api_config
+
+
+# Define utility functions for each conversion
+def file_to_db(source, target, target_table, chunk_size=10000, batch_size=None, commit_every=None, metrics=None):
+    """
+    Stream a configured file into a database table.
+
+    :param source: FILE config tuple from process_file.
+    :param target: DB config tuple from process_file; its "type" selects the dialect.
+    :param target_table: Table to load, created from a sample of the chunks when missing.
+    :param batch_size: Rows per bulk insert (COPY on Postgres, executemany elsewhere).
+    :param commit_every: Rows between commits.
+    :return: Number of rows loaded.
+    """
+    from db_loader import DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_EVERY, StreamingLoader, connect
+
+    print(f"We are in a function file_to_db to Extract {source[0][0]} and Save the {target_table} table to {target[0]['type']}  DB\n")
+    filename, delimiter, file_extension = source[0]
+    chunks = extract_file(filename, delimiter, file_extension, chunk_size)
+    if metrics is not None:
+        metrics.add_file(filename, os.path.getsize(filename))
+        chunks = metrics.timed_iter('read', chunks, filename)
+
+    conn, dialect = connect(target[0])
+    try:
+        loader = StreamingLoader(conn, dialect, target_table, batch_size or DEFAULT_BATCH_SIZE,
+                                 commit_every or DEFAULT_COMMIT_EVERY)
+        for chunk in chunks:
+            chunk = transform_data(chunk)
+            seconds = loader.seconds
+            loader.load(chunk)
+            if metrics is not None:
+                metrics.add('db_write', loader.seconds - seconds, len(chunk), path=filename)
+        loader.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    action = "Created" if loader.created else "Appended to"
+    print(f"{action} {dialect.name} table {target_table}: {loader.rows} rows in {loader.batches} batches, "
+          f"{loader.commits} commits, {loader.seconds:.2f}s ({loader.rows_per_sec():,.0f} rows/sec)")
+    return loader.rows
+
+
+REQUIRED_COLUMNS = {'name', 'age', 'date_of_joining', 'id', 'author', 'title', 'genre', 'price', 'publish_date'}
+
+
+def transform_data(data_frame):
+    # Adjust the columns dynamically based on the input data
+    columns_to_keep = [col for col in data_frame.columns if col in REQUIRED_COLUMNS]
+    return data_frame[columns_to_keep]
+
+
+def extract_csv(file_path, delimiter, chunk_size=None, plan=None):
+    """
+    Read a delimited file, parsing only the columns the plan keeps.
+
+    :param plan: Optional ReadPlan; its usecols/dtype are passed to read_csv.
+    """
+    # pandas is imported by the routes that read files, not by every CLI invocation
+    import pandas as pd
+    from read_plan import csv_header
+
+    options = plan.csv_options(csv_header(file_path, delimiter)) if plan else {}
+    return pd.read_csv(file_path, delimiter=delimiter, chunksize=chunk_size, **options)
+
+
+def extract_file(filename, delimiter, file_extension, chunk_size=10000, plan=None):
+    """
+    Yield DataFrame chunks of a csv, txt, xml, json or jsonl file.
+
+    Delimited files and JSON lines are read chunk by chunk. XML is streamed with iterparse;
+    its record element is the root's first child tag. A JSON array has to be parsed whole
+    and is then sliced into chunks.
+
+    :param plan: Optional ReadPlan applied to delimited and XML sources; JSON is read whole.
+    """
+    import pandas as pd
+
+    if file_extension in ('csv', 'txt'):
+        yield from extract_csv(filename, delimiter, chunk_size, plan=plan)
+    elif file_extension == 'xml':
+        from xml_stream import iter_records
+
+        record_path, fields = xml_layout(filename)
+        if plan is not None:
+            fields = plan.xml_fields(fields)
+        yield from iter_records(filename, record_path, fields, chunk_size)
+    elif file_extension == 'jsonl':
+        yield from pd.read_json(filename, lines=True, chunksize=chunk_size)
+    elif file_extension == 'json':
+        frame = pd.read_json(filename)
+        for offset in range(0, len(frame), chunk_size):
+            yield frame.iloc[offset:offset + chunk_size]
+    else:
+        raise ValueError(f"Unsupported file type: {file_extension}")
+
+
+def xml_layout(filename):
+    """
+    Work out the record tag and field mapping of an XML file from its first record.
+
+    :return: Tuple of (record_path, fields) for xml_stream.iter_records.
+    """
+    import xml.etree.ElementTree as ET
+
+    depth = 0
+    for event, element in ET.iterparse(filename, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            continue
+        depth -= 1
+        if depth == 1:
+            # First complete child of the root: its attributes and children become the columns
+            fields = {name: {'path': f"@{name}"} for name in element.attrib}
+            fields.update({child.tag: {'path': child.tag} for child in element})
+            return element.tag, fields
+    raise ValueError(f"No records found in {filename}")
+
+
+def explain_file_plan(source):
+    from read_plan import ReadPlan, csv_header
+
+    filename, delimiter = source[0][0], source[0][1]
+    file_extension = os.path.splitext(filename)[1][1:]
+    plan = ReadPlan(REQUIRED_COLUMNS)
+    if file_extension in ('csv', 'txt'):
+        header = csv_header(filename, delimiter)
+        return plan.explain(filename, header, plan.csv_options(header))
+    if file_extension == 'xml':
+        record_path, fields = xml_layout(filename)
+        kept = plan.xml_fields(fields)
+        return plan.explain(filename, list(fields), {'record_path': record_path,
+                                                     'fields': {name: field['path'] for name, field in kept.items()}})
+    # JSON is parsed by pandas as a whole, so there are no columns to prune at read time
+    return [f"Read plan for {filename}", f"  not applicable: {file_extension} sources are read whole"]
+
+
+def _cache_key(cache, filename, delimiter, compression, chunk_size, output_format):
+    # Everything that changes the output bytes belongs in the key
+    transform_config = {'required_columns': sorted(REQUIRED_COLUMNS), 'delimiter': delimiter,
+                        'compression': compression, 'chunk_size': chunk_size}
+    return cache.key(filename, transform_config, output_format)
+
+
+def convert_file(filename, delimiter, outputs, compression=None, chunk_size=10000, metrics=None):
+    """
+    Read and transform a source file once, writing every chunk to each output.
+
+    Delimited and XML files read only the columns the read plan keeps; json and jsonl
+    sources are read whole.
+
+    :param outputs: List of (output_name, output_format) pairs.
+    :return: Dict of output_name to rows written.
+    """
+    from read_plan import ReadPlan
+
+    # Chunks are transformed and appended one at a time, so the file is never fully in memory
+    file_extension = os.path.splitext(filename)[1][1:]
+    chunks = extract_file(filename, delimiter, file_extension, chunk_size, plan=ReadPlan(REQUIRED_COLUMNS))
+    if metrics is not None:
+        metrics.add_file(filename, os.path.getsize(filename))
+        chunks = metrics.timed_iter('read', chunks, filename)
+    with ExitStack() as stack:
+        # Sources without a delimiter (xml, json) get the output format's usual one
+        writers = [stack.enter_context(open_writer(output_name, output_format,
+                                                   delimiter=delimiter or ('\t' if output_format == 'txt' else ','),
+                                                   compression=compression))
+                   for output_name, output_format in outputs]
+        for chunk in chunks:
+            if metrics is None:
+                chunk = transform_data(chunk)
+            else:
+                with metrics.stage('transform', filename) as stage:
+                    chunk = transform_data(chunk)
+                    stage.rows = len(chunk)
+            for writer in writers:
+                writer.write(chunk)
+    if metrics is not None:
+        for writer in writers:
+            metrics.add_writer(writer, writer.path)
+    return {writer.path: writer.rows for writer in writers}
+
+
+def file_to_output(source, target, compression=None, chunk_size=10000, metrics=None, cache=None):
+    print(f"We are in a function file_to_output to Extract {source[0][0]} and convert to {target[0]} format")
+    output_format = target[0]
+    filename = source[0][0]
+    delimiter = source[0][1]
+    print("filename is :", filename)
+    print("delimiter is :", delimiter)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_name = f"output_{timestamp}.{output_format}"
+    cache_key = None
+    if cache is not None:
+        cache_key = _cache_key(cache, filename, delimiter, compression, chunk_size, output_format)
+        artifact = cache.get(cache_key)
+        if artifact is not None:
+            cache.materialize(artifact, output_name)
+            print(f"{output_name} served from cache ({cache_key[:12]})..")
+            return output_name
+    rows = convert_file(filename, delimiter, [(output_name, output_format)], compression, chunk_size, metrics)
+
+    if cache is not None:
+        cache.put(cache_key, output_name, source=filename)
+
+    print(f"{output_name} Created Successfully with {rows[output_name]} rows..")
+    return output_name
+
+
+def _write_api(chunks, target, batch_size, concurrency, metrics=None, path=None):
+    """Post transformed chunks to the API of target and print the request and record rates."""
+    from api_connectors import ApiStats, write_chunks
+
+    stats = ApiStats()
+    if metrics is not None:
+        chunks = metrics.timed_iter('read', chunks, path)
+    write_chunks(target[0], (transform_data(chunk) for chunk in chunks), batch_size,
+                 concurrency or DEFAULT_API_CONCURRENCY, stats=stats)
+    if metrics is not None:
+        metrics.add('api_write', stats.seconds, stats.records, path=path)
+    failed = f", {stats.failed_records} rejected by the API" if stats.failed_records else ""
+    print(f"Posted to {target[0]['name']}: {stats.summary()}{failed}")
+    return stats.records
+
+
+def file_to_api(source, target, chunk_size=10000, batch_size=None, concurrency=None, metrics=None):
+    """
+    Stream a configured file to an API, batch_size records per request.
+
+    :param source: FILE config tuple from process_file.
+    :param target: API config tuple from process_file.
+    :param concurrency: Requests in flight at once.
+    :return: Number of records accepted.
+    """
+    print(f"We are in a function file_to_api to Extract {source[0][0]} and Post it to {target[0]['name']}\n")
+    filename, delimiter, file_extension = source[0]
+    if metrics is not None:
+        metrics.add_file(filename, os.path.getsize(filename))
+    return _write_api(extract_file(filename, delimiter, file_extension, chunk_size), target, batch_size,
+                      concurrency, metrics, filename)
+
+
+def db_to_file():
+    print("Calling DB to File Utility....")
+
+
+def read_query(query_arg):
+    """
+    Read the SQL text named by --query, given as "FileConfig.json,N".
+
+    :return: The query with surrounding whitespace removed.
+    """
+    config_file, number = query_arg.split(',')
+    file_name, _, _ = read_file_config(config_file.strip(), number.strip())
+    with open(file_name, 'r') as file:
+        return file.read().strip()
+
+
+def db_to_output(source, target, query, fetch_size=None, split_key=None, parallel=1, compression=None,
+                 metrics=None):
+    """
+    Export a query result to a file, streaming it in fetch_size batches.
+
+    :param source: DB config tuple from process_file.
+    :param target: OUTPUT config tuple from process_file.
+    :param query: SQL text to export.
+    :param fetch_size: Rows per fetch from the server-side cursor.
+    :param split_key: Integer column to split the query on when parallel > 1.
+    :param parallel: Number of key ranges read over separate connections.
+    :return: Name of the written file.
+    """
+    from db_loader import DEFAULT_FETCH_SIZE, connect, iter_query, iter_query_parallel
+
+    print(f"We are in a function db_to_output to Extract from {source[0]['type']} DB and convert to {target[0]} format")
+    output_format = target[0]
+    fetch_size = fetch_size or DEFAULT_FETCH_SIZE
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_name = f"output_{timestamp}.{output_format}"
+    delimiter = '\t' if output_format == 'txt' else ','
+
+    conn = None
+    if split_key and parallel > 1:
+        print(f"Reading {parallel} ranges of {split_key} over separate connections")
+        stream = iter_query_parallel(source[0], query, split_key, parallel, fetch_size)
+    else:
+        conn, dialect = connect(source[0])
+        stream = iter_query(conn, dialect, query, fetch_size)
+    batches = metrics.timed_iter('read', stream) if metrics is not None else stream
+    try:
+        with open_writer(output_name, output_format, delimiter=delimiter, compression=compression) as writer:
+            for batch in batches:
+                writer.write(batch)
+    finally:
+        stream.close()
+        if conn is not None:
+            conn.close()
+    if metrics is not None:
+        metrics.add_writer(writer)
+
+    print(f"{output_name} Created Successfully with {writer.rows} rows in {writer.chunks} batches..")
+    return output_name
+
+
+def db_to_api(source, target, query, fetch_size=None, batch_size=None, concurrency=None, metrics=None):
+    """
+    Post a query result to an API, streaming it from the database in fetch_size batches.
+
+    :param source: DB config tuple from process_file.
+    :param target: API config tuple from process_file.
+    :param query: SQL text to export.
+    :return: Number of records accepted.
+    """
+    from db_loader import DEFAULT_FETCH_SIZE, connect, iter_query
+
+    print(f"We are in a function db_to_api to Extract from {source[0]['type']} DB and Post it to {target[0]['name']}")
+    conn, dialect = connect(source[0])
+    stream = iter_query(conn, dialect, query, fetch_size or DEFAULT_FETCH_SIZE)
+    try:
+        return _write_api(stream, target, batch_size, concurrency, metrics)
+    finally:
+        stream.close()
+        conn.close()
+
+
+def output_to_file():
+    print("Calling Output to File Utility....")
+
+
+def output_to_db():
+    print("Calling Output to DB Utility....")
+
+
+def output_to_api():
+    print("Calling Output to API Utility....")
+
+
+def _read_api(source, page_size, concurrency, stats, metrics=None):
+    from api_connectors import read_chunks
+
+    pages = read_chunks(source[0], page_size, concurrency or DEFAULT_API_CONCURRENCY, stats=stats)
+    return metrics.timed_iter('read', pages) if metrics is not None else pages
+
+
+def _api_to_writer(source, output_name, output_format, page_size=None, concurrency=None, compression=None,
+                   metrics=None):
+    from api_connectors import ApiStats
+
+    stats = ApiStats()
+    delimiter = '\t' if output_format == 'txt' else ','
+    with open_writer(output_name, output_format, delimiter=delimiter, compression=compression) as writer:
+        for page in _read_api(source, page_size, concurrency, stats, metrics):
+            writer.write(page)
+    if metrics is not None:
+        metrics.add_writer(writer)
+    print(f"Read from {source[0]['name']}: {stats.summary()}")
+    print(f"{output_name} Created Successfully with {writer.rows} rows in {writer.chunks} pages..")
+    return output_name
+
+
+def api_to_file(source, target, page_size=None, concurrency=None, metrics=None):
+    """
+    Save an API's records to the file named by a FileConfig entry, in that file's format.
+
+    :param source: API config tuple from process_file.
+    :param target: FILE config tuple from process_file.
+    :return: Name of the written file.
+    """
+    filename, _, file_extension = target[0]
+    print(f"We are in a function api_to_file to Extract from {source[0]['name']} and Save it to {filename}")
+    return _api_to_writer(source, filename, file_extension, page_size, concurrency, metrics=metrics)
+
+
+def api_to_db(source, target, target_table, page_size=None, concurrency=None, batch_size=None, commit_every=None,
+              metrics=None):
+    """
+    Load an API's records into a database table, page by page.
+
+    :param source: API config tuple from process_file.
+    :param target: DB config tuple from process_file; its "type" selects the dialect.
+    :param target_table: Table to load, created from the first page when missing.
+    :return: Number of rows loaded.
+    """
+    from api_connectors import ApiStats
+    from db_loader import DEFAULT_BATCH_SIZE, DEFAULT_COMMIT_EVERY, StreamingLoader, connect
+
+    print(f"We are in a function api_to_db to Extract from {source[0]['name']} and Save the {target_table} table to "
+          f"{target[0]['type']} DB\n")
+    stats = ApiStats()
+    conn, dialect = connect(target[0])
+    try:
+        loader = StreamingLoader(conn, dialect, target_table, batch_size or DEFAULT_BATCH_SIZE,
+                                 commit_every or DEFAULT_COMMIT_EVERY)
+        for page in _read_api(source, page_size, concurrency, stats, metrics):
+            seconds = loader.seconds
+            loader.load(transform_data(page))
+            if metrics is not None:
+                metrics.add('db_write', loader.seconds - seconds, len(page))
+        loader.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    print(f"Read from {source[0]['name']}: {stats.summary()}")
+    print(f"Loaded {dialect.name} table {target_table}: {loader.rows} rows, {loader.commits} commits, "
+          f"{loader.seconds:.2f}s ({loader.rows_per_sec():,.0f} rows/sec)")
+    return loader.rows
+
+
+def api_to_output(source, target, page_size=None, concurrency=None, compression=None, metrics=None):
+    """
+    Export an API's records to a file in the configured output format.
+
+    :param source: API config tuple from process_file.
+    :param target: OUTPUT config tuple from process_file.
+    :return: Name of the written file.
+    """
+    output_format = target[0]
+    print(f"We are in a function api_to_output to Extract from {source[0]['name']} and convert to {output_format} format")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return _api_to_writer(source, f"output_{timestamp}.{output_format}", output_format, page_size, concurrency,
+                          compression, metrics)
+
+
+def process_file(file, num):
+    """
+    Process the configuration file based on its type.
+
+    :param file: JSON configuration file name.
+    :param num: Key number to access in the JSON file.
+    :return: Tuple containing configuration data and its type.
+    """
+    if 'DbConfig' in file:
+        return read_database_config(file, num), "DB"
+    elif 'FileConfig' in file:
+        return read_file_config(file, num), "FILE"
+    elif 'OutputConfig' in file:
+        return read_file_output_config(file, num), "OUTPUT"
+    elif 'APIConfig' in file:
+        return read_api_config(file, num), "API"
+    else:
+        print(f"Unknown configuration type for {file}")
+
+
+def resolve_config(file, num, configs):
+    """
+    Quiet counterpart of process_file for batch runs: look the entry up in configs loaded once.
+
+    :param configs: Dict of configuration file name to its parsed JSON.
+    :return: Tuple shaped like process_file's result.
+    """
+    if file not in configs:
+        configs[file] = load_json(file)
+    entry = configs[file][str(num)]
+    if 'DbConfig' in file:
+        return entry, "DB"
+    elif 'FileConfig' in file:
+        file_name = entry["file_name"]
+        return (file_name, entry.get("delimiter", ""), os.path.splitext(file_name)[1][1:]), "FILE"
+    elif 'OutputConfig' in file:
+        return entry, "OUTPUT"
+    elif 'APIConfig' in file:
+        return entry, "API"
+    raise ValueError(f"Unknown configuration type for {file}")
+
+
+def _numbers(file, numbers, configs):
+    if numbers == '*':
+        if file not in configs:
+            configs[file] = load_json(file)
+        return sorted(configs[file], key=int)
+    return numbers if isinstance(numbers, list) else [numbers]
+
+
+def expand_manifest(manifest, configs):
+    """
+    Expand a manifest into single source -> target jobs.
+
+    The manifest is a list of jobs (or {"jobs": [...]}), each like
+    {"source": ["FileConfig.json", "*"], "target": ["OutputConfig.json", [1, 2, 3]]}; a number
+    may be a single key, a list of keys or "*" for every entry, and every source is paired
+    with every target. Optional "target_table" is passed on for DB targets, and DB sources
+    need a "query" given like --query, e.g. "FileConfig.json,2".
+    """
+    jobs = []
+    for job in manifest.get('jobs', []) if isinstance(manifest, dict) else manifest:
+        source_file, source_numbers = job['source']
+        target_file, target_numbers = job['target']
+        for source_num in _numbers(source_file, source_numbers, configs):
+            for target_num in _numbers(target_file, target_numbers, configs):
+                jobs.append({'source': (source_file, source_num), 'target': (target_file, target_num),
+                             'target_table': job.get('target_table'), 'query': job.get('query')})
+    return jobs
+
+
+def plan_batch(jobs, configs):
+    """
+    Group FILE -> OUTPUT jobs by source so each file is read once for all its formats.
+
+    :return: Tuple of (groups, other_jobs), where groups maps (file_name, delimiter) to the
+        distinct output formats and other_jobs holds resolved (label, source, target, table,
+        query) tuples.
+    """
+    groups = {}
+    other_jobs = []
+    for job in jobs:
+        source_main = resolve_config(*job['source'], configs)
+        target_main = resolve_config(*job['target'], configs)
+        if source_main[-1] == "FILE" and target_main[-1] == "OUTPUT":
+            formats = groups.setdefault(source_main[0][:2], [])
+            if target_main[0] not in formats:
+                formats.append(target_main[0])
+        else:
+            label = f"{job['source'][0]},{job['source'][1]} -> {job['target'][0]},{job['target'][1]}"
+            other_jobs.append((label, source_main, target_main, job['target_table'], job['query']))
+    return groups, other_jobs
+
+
+def run_file_group(filename, delimiter, formats, timestamp, compression=None, chunk_size=10000,
+                   cache_dir=None, cache_max_bytes=None):
+    """
+    Produce every requested format of one source file; runs in a batch worker process.
+
+    Formats found in the result cache are linked, the rest share a single read.
+
+    :return: Dict with outputs, cache hits, rows, seconds and per-stage metrics.
+    """
+    start = time.perf_counter()
+    stem = os.path.basename(filename).replace('.', '_')
+    outputs = [(f"output_{timestamp}_{stem}.{output_format}", output_format) for output_format in formats]
+    cache = ResultCache(cache_dir, cache_max_bytes) if cache_dir else None
+    metrics = RunMetrics(filename)
+    hits = []
+    misses = outputs
+    keys = {}
+    if cache is not None:
+        misses = []
+        for output_name, output_format in outputs:
+            keys[output_name] = _cache_key(cache, filename, delimiter, compression, chunk_size, output_format)
+            artifact = cache.get(keys[output_name])
+            if artifact is not None:
+                cache.materialize(artifact, output_name)
+                hits.append(output_name)
+            else:
+                misses.append((output_name, output_format))
+    rows = convert_file(filename, delimiter, misses, compression, chunk_size, metrics) if misses else {}
+    if cache is not None:
+        for output_name, _ in misses:
+            cache.put(keys[output_name], output_name, source=filename)
+        cache.close()
+    return {'source': filename, 'outputs': [name for name, _ in outputs], 'cached': hits, 'rows': rows,
+            'seconds': time.perf_counter() - start, 'stages': metrics.report()['stages']}
+
+
+def run_manifest(manifest_path, workers=None, compression=None, chunk_size=10000, cache_dir=None,
+                 cache_max_bytes=None, metrics=None):
+    """
+    Run every conversion in a manifest in this process, FILE -> OUTPUT groups on a worker pool.
+
+    :return: List of (source, error) failures.
+    """
+    configs = {}
+    jobs = expand_manifest(load_json(manifest_path), configs)
+    groups, other_jobs = plan_batch(jobs, configs)
+    conversions = sum(len(formats) for formats in groups.values())
+    print(f"Manifest {manifest_path}: {len(jobs)} job(s), {conversions} file conversion(s) from "
+          f"{len(groups)} source read(s), {len(other_jobs)} other job(s)")
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import pandas  # noqa: F401  Loaded once before the pool forks so workers inherit it
+
+    failures = []
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_file_group, filename, delimiter, formats, timestamp, compression,
+                                   chunk_size, cache_dir, cache_max_bytes): filename
+                   for (filename, delimiter), formats in groups.items()}
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"FAILED {filename}: {e}")
+                failures.append((filename, str(e)))
+                continue
+            for name in result['outputs']:
+                detail = 'from cache' if name in result['cached'] else f"{result['rows'][name]} rows"
+                print(f"{name} Created Successfully ({detail})..")
+            if metrics is not None:
+                metrics.add_file(filename, os.path.getsize(filename))
+                for stage, totals in result['stages'].items():
+                    # Serialize totals cover every output of the source, so keep them out of its file line
+                    path = None if stage == 'serialize' else filename
+                    metrics.add(stage, totals['seconds'], totals['rows'], totals['bytes'], path,
+                                chunks=totals['chunks'])
+
+    file_failures = len(failures)
+    for label, source_main, target_main, target_table, query in other_jobs:
+        # One failing job is reported and counted; the rest of the batch still runs
+        try:
+            if source_main[-1] == "DB" and query is None:
+                raise ValueError('DB sources need a "query" in the manifest job, e.g. "FileConfig.json,2"')
+            if target_main[-1] == "DB" and target_table is None:
+                raise ValueError('DB targets need a "target_table" in the manifest job')
+            route(source_main[-1], target_main[-1], source_main, target_main, target_table, compression, metrics,
+                  query=read_query(query) if query else None)
+        except Exception as e:
+            print(f"FAILED {label}: {e}")
+            failures.append((label, str(e)))
+    failed_sources = len(set(name for name, _ in failures[:file_failures]))
+    failed_jobs = len(failures) - file_failures
+    print(f"{len(groups) - failed_sources}/{len(groups)} source(s) converted, "
+          f"{len(other_jobs) - failed_jobs}/{len(other_jobs)} other job(s) done, {len(failures)} failed")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Read database type and file info from JSON config files.')
+
+    parser.add_argument('fileConfig1', type=str, nargs='?', help='The first JSON configuration file')
+    parser.add_argument('num1', type=int, nargs='?', help='The key number to access in the first JSON file')
+    parser.add_argument('fileConfig2', type=str, nargs='?', help='The second JSON configuration file')
+    parser.add_argument('num2', type=int, nargs='?', help='The key number to access in the second JSON file')
+
+    parser.add_argument('--manifest', type=str,
+                        help='JSON list of {"source": [config, num], "target": [config, num]} jobs to run in one process')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes for --manifest conversions (default: CPU count)')
+
+    # Adding optional table argument which will be required only if the target is DB
+    parser.add_argument('--target_table', type=str, help='Provide table to save the Data',
+                        required=False)
+
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help='Rows per bulk insert for DB targets (default 5000)')
+    parser.add_argument('--commit-every', type=int, default=None,
+                        help='Rows between commits for DB targets (default 50000)')
+
+    parser.add_argument('--compression', type=str, required=False,
+                        help='Compression codec for parquet (snappy, zstd, gzip) or arrow (lz4, zstd) outputs')
+
+    parser.add_argument('--query', type=str, help='Provide FileConfig with txt file as number to retrive and save to file with comma seperated number',
+                        required=False)
+
+    parser.add_argument('--fetch-size', type=int, default=None,
+                        help='Rows per fetch when exporting a DB query (default 10000)')
+    parser.add_argument('--split-key', type=str,
+                        help='Integer column to split a DB export on, read in --parallel key ranges')
+    parser.add_argument('--parallel', type=int, default=1,
+                        help='Connections reading --split-key ranges of a DB export concurrently')
+
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help=f'Requests in flight at once on API routes (default {DEFAULT_API_CONCURRENCY})')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='Records per page when reading from an API (default 1000)')
+    parser.add_argument('--api-batch-size', type=int, default=None,
+                        help='Records per request when posting to an API (default 200)')
+
+    parser.add_argument('--explain', action='store_true', help='Print the column read plan of a FILE source')
+
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help='Directory of the conversion result cache')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_MB, help='Size bound of the result cache in MB')
+    parser.add_argument('--no-cache', action='store_true', help='Always convert, bypassing the result cache')
+
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    if args.manifest:
+        cache_dir = None if args.no_cache else args.cache_dir
+        with instrumented_run('manifest', **metrics_options(args)) as metrics:
+            failures = run_manifest(args.manifest, args.workers, args.compression, cache_dir=cache_dir,
+                                    cache_max_bytes=args.cache_max_mb * 1024 * 1024, metrics=metrics)
+        sys.exit(1 if failures else 0)
+    if args.num2 is None:
+        parser.error("fileConfig1 num1 fileConfig2 num2 are required unless --manifest is given")
+
+    source_main = process_file(args.fileConfig1, args.num1)
+    target_main = process_file(args.fileConfig2, args.num2)
+    print("Source:", source_main[-1], "Target:", target_main[-1])
+    print(f"\nBy the inputs you passed we need to convert source {source_main[-1]} to target {target_main[-1]} type \n")
+
+    source, target = source_main[-1], target_main[-1]
+    target_table = None
+    query_txt = None
+    query = None
+    if source == "DB":
+        if args.query is None:
+            parser.error("Please Provide the FileConfig with txt file number which contains query to save.. using --query FileConfig.json,2 ")
+        query_txt = args.query
+        print("query_txt is ",query_txt)
+        query = read_query(query_txt)
+
+    if target == "DB":
+        if args.target_table is None:
+            parser.error("Please Provide Which table to insert using --table1 ... ")
+        target_table = args.target_table
+
+    if args.explain and source == "FILE":
+        print('\n'.join(explain_file_plan(source_main)))
+
+    cache = None
+    if not args.no_cache and source == "FILE" and target == "OUTPUT":
+        cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    with instrumented_run(f"{source.lower()}_to_{target.lower()}", **metrics_options(args)) as metrics:
+        route(source, target, source_main, target_main, target_table, args.compression, metrics, cache,
+              args.batch_size, args.commit_every, query, args.fetch_size, args.split_key, args.parallel,
+              args.concurrency, args.page_size, args.api_batch_size)
+
+
+def route(source, target, source_main, target_main, target_table, compression=None, metrics=None, cache=None,
+          batch_size=None, commit_every=None, query=None, fetch_size=None, split_key=None, parallel=1,
+          concurrency=None, page_size=None, api_batch_size=None):
+    # Check the combination and call the appropriate function
+    if source == target:
+        print(f"This Combination is not allowed: Source and Target both are {source}")
+    else:
+        if source == "FILE":
+            if target == "DB":
+                file_to_db(source_main, target_main, target_table, batch_size=batch_size, commit_every=commit_every,
+                           metrics=metrics)
+            elif target == "OUTPUT":
+                file_to_output(source_main, target_main, compression=compression, metrics=metrics, cache=cache)
+            elif target == "API":
+                file_to_api(source_main, target_main, batch_size=api_batch_size, concurrency=concurrency,
+                            metrics=metrics)
+        elif source == "DB":
+            if target == "FILE":
+                print("This Combination is not allowed: From DB to FILE ")
+                # db_to_file()
+            elif target == "OUTPUT":
+                db_to_output(source_main, target_main, query, fetch_size, split_key, parallel, compression, metrics)
+            elif target == "API":
+                db_to_api(source_main, target_main, query, fetch_size, api_batch_size, concurrency, metrics)
+        elif source == "OUTPUT":
+            if target == "FILE":
+                output_to_file()
+            elif target == "DB":
+                output_to_db()
+            elif target == "API":
+                output_to_api()
+        elif source == "API":
+            if target == "FILE":
+                api_to_file(source_main, target_main, page_size, concurrency, metrics)
+            elif target == "DB":
+                api_to_db(source_main, target_main, target_table, page_size, concurrency, batch_size, commit_every,
+                          metrics)
+            elif target == "OUTPUT":
+                api_to_output(source_main, target_main, page_size, concurrency, compression, metrics)
+
+
+if __name__ == '__main__':
+    main()
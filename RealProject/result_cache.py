@@ -0,0 +1,206 @@
+# result_cache.py
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+
+DEFAULT_CACHE_DIR = '.conversion_cache'
+DEFAULT_MAX_MB = 1024
+
+
+class ResultCache:
+    """
+    Content-addressed cache of conversion outputs.
+
+    An artifact is keyed on the SHA-256 of the source file's contents, the transform
+    configuration and the output format, so a rerun over identical input is served by
+    copying the stored artifact instead of converting again. Source hashes are remembered
+    per (path, size, mtime) so unchanged sources are not re-hashed either. Artifacts are
+    evicted least recently used first once the cache exceeds max_bytes.
+
+    :param directory: Cache directory holding the artifacts and the index database.
+    :param max_bytes: Size bound for all stored artifacts.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        # Batch workers share the index, so wait for each other's writes
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), timeout=60)
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS artifacts (
+            key TEXT PRIMARY KEY,
+            file_name TEXT,
+            size INTEGER,
+            source TEXT,
+            created_at REAL,
+            last_used REAL,
+            hits INTEGER DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS source_hashes (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            sha256 TEXT
+        );
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER
+        );
+        """)
+        self.conn.commit()
+
+    def _count(self, name, amount=1):
+        self.conn.execute("INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?",
+                          (name, amount, amount))
+
+    def source_hash(self, path):
+        """SHA-256 of a file's contents, reused while its size and mtime are unchanged."""
+        info = os.stat(path)
+        key = os.path.abspath(path)
+        row = self.conn.execute("SELECT size, mtime_ns, sha256 FROM source_hashes WHERE path = ?", (key,)).fetchone()
+        if row and row[:2] == (info.st_size, info.st_mtime_ns):
+            return row[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        self.conn.execute("INSERT OR REPLACE INTO source_hashes VALUES (?, ?, ?, ?)",
+                          (key, info.st_size, info.st_mtime_ns, digest.hexdigest()))
+        self.conn.commit()
+        return digest.hexdigest()
+
+    def key(self, source_path, transform_config, output_format):
+        """
+        Build the cache key of one conversion.
+
+        :param source_path: Input file; only its contents matter, not its name.
+        :param transform_config: JSON-serialisable settings that affect the output.
+        :param output_format: Output format, e.g. csv or parquet.
+        """
+        config = json.dumps(transform_config, sort_keys=True, default=str)
+        material = f"{self.source_hash(source_path)}|{config}|{output_format}"
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key):
+        """Return the stored artifact path for key, or None on a miss."""
+        row = self.conn.execute("SELECT file_name, size FROM artifacts WHERE key = ?", (key,)).fetchone()
+        path = os.path.join(self.directory, row[0]) if row else None
+        if path is None or not os.path.exists(path):
+            if row:
+                self.conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            self._count('misses')
+            self.conn.commit()
+            return None
+        self.conn.execute("UPDATE artifacts SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        self._count('hits')
+        self._count('bytes_served', row[1])
+        self.conn.commit()
+        return path
+
+    def put(self, key, produced_path, source=None):
+        """
+        Store a freshly produced output under key and evict old artifacts if over budget.
+
+        The output is copied, not linked, so it stays the user's own writable file and a later
+        write to it cannot change the artifact. An output larger than max_bytes is not stored.
+
+        :return: The artifact path, or None when the output was too large to cache.
+        """
+        size = os.path.getsize(produced_path)
+        if size > self.max_bytes:
+            self._count('skipped')
+            self.conn.commit()
+            return None
+        file_name = key + os.path.splitext(produced_path)[1]
+        path = os.path.join(self.directory, file_name)
+        if os.path.exists(path):
+            # Caches from before artifacts were copied hold read-only hard links
+            os.remove(path)
+        shutil.copyfile(produced_path, path)
+        now = time.time()
+        self.conn.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, 0)",
+                          (key, file_name, size, source, now, now))
+        self._count('stores')
+        self.conn.commit()
+        self.evict()
+        return path
+
+    def evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        evicted = 0
+        for key, file_name, size in self.conn.execute(
+                "SELECT key, file_name, size FROM artifacts ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.directory, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+            self.conn.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+            self.conn.commit()
+        return evicted
+
+    def materialize(self, artifact, target):
+        """Copy a cached artifact to target; a copy, so the output can be rewritten without touching the cache."""
+        if os.path.exists(target):
+            os.remove(target)
+        shutil.copyfile(artifact, target)
+        return target
+
+    def stats(self):
+        counters = dict(self.conn.execute("SELECT name, value FROM counters").fetchall())
+        entries, total = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM artifacts").fetchone()
+        lookups = counters.get('hits', 0) + counters.get('misses', 0)
+        return {
+            'directory': self.directory,
+            'entries': entries,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'hit_rate': round(counters.get('hits', 0) / lookups, 3) if lookups else None,
+            'stores': counters.get('stores', 0),
+            'evictions': counters.get('evictions', 0),
+            'skipped': counters.get('skipped', 0),
+            'bytes_served': counters.get('bytes_served', 0),
+        }
+
+    def clear(self):
+        for (file_name,) in self.conn.execute("SELECT file_name FROM artifacts").fetchall():
+            path = os.path.join(self.directory, file_name)
+            if os.path.exists(path):
+                os.remove(path)
+        self.conn.execute("DELETE FROM artifacts")
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the conversion result cache.')
+    parser.add_argument('command', choices=['stats', 'clear'], help='stats: print cache statistics; clear: drop all artifacts')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Cache directory')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_MB, help='Cache size bound in MB')
+    args = parser.parse_args()
+
+    cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+    if args.command == 'clear':
+        cache.clear()
+        print(f"Cleared {args.cache_dir}")
+    for name, value in cache.stats().items():
+        print(f"{name}: {value}")
+    cache.close()
+
+
+if __name__ == '__main__':
+    main()
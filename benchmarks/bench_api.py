@@ -0,0 +1,152 @@
+# bench_api.py
+#
+# Time the API routes' connector engine against a local stub HTTP server: posting a
+# record stream in batches and reading it back page by page, one request at a time and
+# with concurrent requests. The stub adds a fixed latency per request and can fail a share
+# of them with 503 to exercise the retries.
+#
+#   python benchmarks/bench_api.py --records 50000 --latency-ms 20
+#   python benchmarks/bench_api.py --fail-rate 0.05
+#   python benchmarks/bench_api.py --serve          # stub for APIConfig.json entry 3
+#
+# The engine needs aiohttp (see requirements.txt); the stub server only uses the standard library.
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'RealProject'))
+
+from api_connectors import ApiStats, read_chunks, write_chunks  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """GET /records?page=&page_size= serves the server's records; POST /records counts what it receives."""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so the client's connection pool is exercised
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delay_or_fail(self):
+        server = self.server
+        time.sleep(server.latency)
+        if server.fail_rate and random.random() < server.fail_rate:
+            self._reply(503, {'error': 'try again'})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if self._delay_or_fail():
+            return
+        params = parse_qs(url.query)
+        page = int(params.get('page', ['1'])[0])
+        page_size = int(params.get('page_size', ['1000'])[0])
+        start = (page - 1) * page_size
+        self._reply(200, {'records': self.server.records[start:start + page_size]})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if self._delay_or_fail():
+            return
+        records = json.loads(body)['records']
+        with self.server.lock:
+            self.server.received += len(records)
+        self._reply(200, {'accepted': len(records)})
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # The default backlog of 5 drops bursts of concurrent connects
+
+
+def start_stub(records, latency=0.0, fail_rate=0.0, port=0):
+    """Serve records on 127.0.0.1 from a background thread; returns the server, its port is server_port."""
+    server = StubServer(('127.0.0.1', port), StubHandler)
+    server.records = records
+    server.latency = latency
+    server.fail_rate = fail_rate
+    server.received = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def generate(records, seed=0):
+    rng = random.Random(seed)
+    return [{'id': index, 'name': f"name_{index}", 'age': rng.randint(18, 80),
+             'price': round(rng.random() * 100, 2)} for index in range(records)]
+
+
+def run_write(config, frame, chunk_size, batch_size, concurrency):
+    stats = ApiStats()
+    chunks = (frame.iloc[offset:offset + chunk_size] for offset in range(0, len(frame), chunk_size))
+    write_chunks(config, chunks, batch_size, concurrency, stats=stats)
+    return stats
+
+
+def run_read(config, page_size, concurrency):
+    stats = ApiStats()
+    rows = sum(len(page) for page in read_chunks(config, page_size, concurrency, stats=stats))
+    return stats, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API connector engine against a local stub server.')
+    parser.add_argument('--records', type=int, default=20000, help='Records served and posted')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='Stub latency per request')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of requests the stub fails with 503')
+    parser.add_argument('--batch-size', type=int, default=200, help='Records per POST')
+    parser.add_argument('--page-size', type=int, default=500, help='Records per GET page')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='Requests in flight')
+    parser.add_argument('--serve', action='store_true', help='Only run the stub on port 8765 until interrupted')
+    args = parser.parse_args()
+
+    records = generate(args.records)
+    server = start_stub(records, args.latency_ms / 1000, args.fail_rate, 8765 if args.serve else 0)
+    if args.serve:
+        print(f"Stub API with {len(records)} records on http://127.0.0.1:{server.server_port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            return
+    config = {'name': 'stub', 'type': 'rest', 'base_url': f"http://127.0.0.1:{server.server_port}",
+              'read_path': 'records', 'write_path': 'records', 'pagination': 'page'}
+    frame = pd.DataFrame.from_records(records)
+
+    print(f"{args.records} records, {args.latency_ms:g}ms latency, {args.fail_rate:.0%} failures")
+    print(f"{'run':<22} {'seconds':>8} {'requests':>9} {'retries':>8} {'req/sec':>9} {'records/sec':>12}")
+    for concurrency in args.concurrency:
+        server.received = 0
+        stats = run_write(config, frame, 10000, args.batch_size, concurrency)
+        assert server.received == args.records, f"stub received {server.received} of {args.records} records"
+        runs = [(f"write x{concurrency}", stats)]
+        stats, rows = run_read(config, args.page_size, concurrency)
+        assert rows == args.records, f"read {rows} of {args.records} records"
+        runs.append((f"read x{concurrency}", stats))
+        for name, stats in runs:
+            print(f"{name:<22} {stats.seconds:>8.2f} {stats.requests:>9} {stats.retries:>8} "
+                  f"{stats.requests_per_sec():>9,.1f} {stats.records_per_sec():>12,.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
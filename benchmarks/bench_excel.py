@@ -0,0 +1,103 @@
+# bench_excel.py
+#
+# Time the id enrichment of the `tmp` workflow on generated workbooks: the original
+# read_excel / merge / to_excel cycle against excel_cache + lookup_index + the write-only
+# xlsx writer, both on a cold cache and on a warm one.
+#
+#   python benchmarks/bench_excel.py --rows 100000
+#   python benchmarks/bench_excel.py --rows 500000 --skip-baseline
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel_cache import ExcelCache  # noqa: E402
+from lookup_index import KeyIndex, enrich_file  # noqa: E402
+from output_writers import write_chunks  # noqa: E402
+
+
+def generate(directory, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = rng.permutation(rows * 2)[:rows]
+    reference = pd.DataFrame({'1id': ids, '1mname': [f"name_{value}" for value in ids]})
+    target = pd.DataFrame({'2id': rng.integers(0, rows * 2, rows), '2name': 'original',
+                           'amount': rng.random(rows).round(2)})
+    paths = os.path.join(directory, 'file1.xlsx'), os.path.join(directory, 'file2.xlsx')
+    for frame, path in zip((reference, target), paths):
+        write_chunks([frame], path, 'xlsx')
+    return paths
+
+
+def baseline(file1, file2, output):
+    """Steps 1-5 of the first variant in tmp."""
+    timings = {}
+    start = time.perf_counter()
+    df1 = pd.read_excel(file1)
+    df2 = pd.read_excel(file2)
+    timings['read'] = time.perf_counter() - start
+    start = time.perf_counter()
+    merged_df = pd.merge(df2, df1[['1id', '1mname']], left_on='2id', right_on='1id', how='left')
+    df2.loc[merged_df['1mname'].notna(), '2name'] = merged_df['1mname']
+    timings['merge'] = time.perf_counter() - start
+    start = time.perf_counter()
+    df2.to_excel(output, index=False)
+    timings['write'] = time.perf_counter() - start
+    return timings
+
+
+def cached(file1, file2, output, index_dir):
+    timings = {}
+    start = time.perf_counter()
+    index = KeyIndex.open_or_build(file1, '1id', '1mname', index_dir)
+    ExcelCache().parquet_path(file2)
+    timings['read'] = time.perf_counter() - start
+    start = time.perf_counter()
+    enrich_file(file2, output, index, '2id', '2name')
+    timings['merge+write'] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the xlsx enrichment cycle.')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows per workbook')
+    parser.add_argument('--skip-baseline', action='store_true', help='Only time the cached path')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        os.chdir(directory)  # excel_cache keeps its cache next to the working directory
+        start = time.perf_counter()
+        file1, file2 = generate(directory, args.rows)
+        print(f"Generated 2 x {args.rows} row workbooks in {time.perf_counter() - start:.1f}s")
+
+        runs = []
+        if not args.skip_baseline:
+            runs.append(('read_excel/merge/to_excel', baseline(file1, file2, 'baseline.xlsx')))
+        index_dir = os.path.join(directory, 'index')
+        runs.append(('cache + index, cold', cached(file1, file2, 'cold.xlsx', index_dir)))
+        runs.append(('cache + index, warm', cached(file1, file2, 'warm.xlsx', index_dir)))
+
+        if not args.skip_baseline:
+            expected = pd.read_excel('baseline.xlsx')
+            actual = pd.read_excel('warm.xlsx')
+            print(f"Outputs match: {expected['2name'].equals(actual['2name'])}")
+        print(f"{'run':<28} {'total':>8}  stages")
+        for name, timings in runs:
+            stages = ', '.join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items())
+            print(f"{name:<28} {sum(timings.values()):>7.2f}s  {stages}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# bench_startup.py
+#
+# Cold-start cost of each CLI route: wall time of the whole invocation and the import time
+# reported by `python -X importtime`, with the heaviest top-level imports per route.
+#
+#   python benchmarks/bench_startup.py --repeat 5
+#   python benchmarks/bench_startup.py --routes process_file_txt file_processing_output_to_api
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+APPROACH1 = os.path.join(ROOT, 'Approach1')
+REAL_PROJECT = os.path.join(ROOT, 'RealProject')
+
+
+def prepare_workdir():
+    """Copy the sample inputs and configs into a scratch directory so no route writes into the repo."""
+    workdir = tempfile.mkdtemp(prefix='etl_startup_')
+    for name in ('input.csv', 'input.txt', 'input.xml'):
+        shutil.copy(os.path.join(APPROACH1, name), workdir)
+    with open(os.path.join(APPROACH1, 'config.json'), 'r') as file:
+        config = json.load(file)
+    for entry in config.values():
+        entry['input_path'] = os.path.join(workdir, entry['input_path'])
+        entry['output_path'] = os.path.join(workdir, entry['output_path'])
+    with open(os.path.join(workdir, 'config.json'), 'w') as file:
+        json.dump(config, file)
+    for name in ('DbConfig.json', 'OutputConfig.json', 'APIConfig.json'):
+        shutil.copy(os.path.join(REAL_PROJECT, name), workdir)
+    with open(os.path.join(workdir, 'FileConfig.json'), 'w') as file:
+        json.dump({'1': {'file_name': 'input.csv', 'delimiter': ','}}, file)
+    return workdir
+
+
+def routes(workdir):
+    """Route name -> (working directory, script, arguments)."""
+    dutil = os.path.join(APPROACH1, 'Dutil.py')
+    file_processing = os.path.join(REAL_PROJECT, 'file_processing.py')
+    return {
+        'process_file_help': (ROOT, os.path.join(ROOT, 'process_file.py'), ['--help']),
+        'process_file_txt': (ROOT, os.path.join(ROOT, 'process_file.py'), ['--type', 'txt']),
+        'process_file_parallel_help': (ROOT, os.path.join(ROOT, 'process_file_parallel.py'), ['--help']),
+        'dutil_csv': (workdir, dutil, ['csv', 'config.json']),
+        'dutil_txt': (workdir, dutil, ['txt', 'config.json']),
+        'dutil_xml': (workdir, dutil, ['xml', 'config.json']),
+        'dutil_db_help': (workdir, os.path.join(APPROACH1, 'Dutil_db.py'), ['--help']),
+        'file_processing_output_to_api': (workdir, file_processing, ['OutputConfig.json', '1', 'APIConfig.json', '1']),
+        'file_processing_file_to_output': (workdir, file_processing,
+                                           ['FileConfig.json', '1', 'OutputConfig.json', '2', '--no-cache']),
+    }
+
+
+def parse_importtime(stderr):
+    """
+    Return (total import seconds, [(module, cumulative seconds)], set of every loaded module).
+
+    Lines look like "import time:  self [us] | cumulative | module"; nested imports are
+    indented, so only unindented module names are counted towards the total.
+    """
+    top_level = []
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip())
+        if not name.startswith('  '):
+            top_level.append((name.strip(), int(cumulative) / 1e6))
+    heaviest = sorted(top_level, key=lambda item: item[1], reverse=True)
+    return sum(seconds for _, seconds in top_level), heaviest, loaded
+
+
+def measure(cwd, script, arguments, repeat):
+    walls = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, *arguments], cwd=cwd, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        walls.append(time.perf_counter() - start)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', script, *arguments], cwd=cwd,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    import_seconds, heaviest, loaded = parse_importtime(completed.stderr)
+    return {
+        'wall_seconds_median': round(statistics.median(walls), 4),
+        'wall_seconds_min': round(min(walls), 4),
+        'import_seconds': round(import_seconds, 4),
+        'heaviest_imports': [(name, round(seconds, 4)) for name, seconds in heaviest[:5]],
+        'pandas': 'pandas' in loaded,
+        'psycopg2': 'psycopg2' in loaded,
+        'sqlalchemy': 'sqlalchemy' in loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure CLI cold-start time per route.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per route (median is reported)')
+    parser.add_argument('--routes', nargs='+', help='Subset of routes to measure')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    workdir = prepare_workdir()
+    try:
+        available = routes(workdir)
+        selected = args.routes or list(available)
+        results = {}
+        print(f"{'route':<32} {'wall (median)':>14} {'imports':>9}  pandas psycopg2 sqlalchemy  heaviest imports")
+        for name in selected:
+            cwd, script, arguments = available[name]
+            result = measure(cwd, script, arguments, args.repeat)
+            results[name] = result
+            heaviest = ', '.join(f"{module} {seconds * 1000:.0f}ms" for module, seconds in result['heaviest_imports'][:3])
+            print(f"{name:<32} {result['wall_seconds_median'] * 1000:>12.0f}ms {result['import_seconds'] * 1000:>7.0f}ms  "
+                  f"{'yes' if result['pandas'] else 'no':>6} {'yes' if result['psycopg2'] else 'no':>8} "
+                  f"{'yes' if result['sqlalchemy'] else 'no':>10}  {heaviest}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# bench_transform.py
+#
+# Compare the row-by-row chunk transform that process_file.process_chunk used to run
+# against the column rule engine, on test_data.csv scaled up.
+#
+#   python benchmarks/bench_transform.py --scale 100
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import source_config  # noqa: E402
+from chunk_transform import apply_rules  # noqa: E402
+
+COLUMNS = ['id', 'name', 'date', 'amount']
+
+
+def legacy_process_chunk(chunk):
+    processed_rows = []
+    for index, row in chunk.iterrows():
+        if 'date' in row:
+            row['date'] = datetime.strptime(row['date'], '%Y-%m-%d').strftime('%Y-%m-%d')
+        if 'amount' in row:
+            row['amount'] = row['amount'] * 1.1
+        processed_rows.append(row.to_dict())
+    return processed_rows
+
+
+def vectorized_process_chunk(chunk):
+    return apply_rules(chunk, source_config.TRANSFORM_RULES)
+
+
+def scale_file(source, scale):
+    with open(source, 'r') as file:
+        body = file.read()
+    if not body.endswith('\n'):
+        body += '\n'
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(handle, 'w') as out:
+        for _ in range(scale):
+            out.write(body)
+    return path
+
+
+def run(path, func, chunk_size):
+    rows = 0
+    start = time.perf_counter()
+    for chunk in pd.read_csv(path, chunksize=chunk_size, names=COLUMNS, header=0):
+        func(chunk)
+        rows += len(chunk)
+    return rows, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the process_file chunk transform.')
+    parser.add_argument('--source', default='test_data.csv', help='CSV file to scale up')
+    parser.add_argument('--scale', type=int, default=50, help='Number of times to repeat the source file')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Rows per chunk')
+    args = parser.parse_args()
+
+    path = scale_file(args.source, args.scale)
+    try:
+        for label, func in (('iterrows', legacy_process_chunk), ('vectorized', vectorized_process_chunk)):
+            rows, seconds = run(path, func, args.chunk_size)
+            print(f"{label:<12} {rows:>10} rows  {seconds:8.3f}s  {rows / seconds:12,.0f} rows/sec")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
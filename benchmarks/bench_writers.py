@@ -0,0 +1,62 @@
+# bench_writers.py
+#
+# Write the same chunk stream with every output_writers format and compare throughput and
+# file size against CSV.
+#
+#   python benchmarks/bench_writers.py --scale 100 --compression zstd
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_writers import WRITERS, write_chunks  # noqa: E402
+
+COLUMNS = ['id', 'name', 'date', 'amount']
+ARROW_CODECS = {'lz4', 'zstd'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark output_writers formats.')
+    parser.add_argument('--source', default='test_data.csv', help='CSV file used as the chunk source')
+    parser.add_argument('--scale', type=int, default=50, help='Number of times to repeat the source rows')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='Rows per chunk')
+    parser.add_argument('--compression', default=None, help='Codec for parquet/arrow (e.g. snappy, zstd, lz4)')
+    parser.add_argument('--no-dictionary', action='store_true', help='Disable parquet dictionary encoding')
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.source, names=COLUMNS)
+    data = pd.concat([data] * args.scale, ignore_index=True)
+    chunks = [data.iloc[i:i + args.chunk_size] for i in range(0, len(data), args.chunk_size)]
+
+    directory = tempfile.mkdtemp()
+    try:
+        results = []
+        for output_format in WRITERS:
+            compression = args.compression
+            if output_format == 'arrow' and compression not in ARROW_CODECS:
+                compression = None
+            path = os.path.join(directory, f"out.{output_format}")
+            start = time.perf_counter()
+            rows = write_chunks(chunks, path, output_format, delimiter='\t' if output_format == 'txt' else ',',
+                                compression=compression, use_dictionary=not args.no_dictionary)
+            seconds = time.perf_counter() - start
+            results.append((output_format, rows, seconds, os.path.getsize(path)))
+
+        csv_size = dict((fmt, size) for fmt, _, _, size in results)['csv']
+        print(f"{'format':<8} {'rows':>10} {'seconds':>8} {'rows/sec':>12} {'MB':>8} {'vs csv':>7}")
+        for output_format, rows, seconds, size in results:
+            print(f"{output_format:<8} {rows:>10} {seconds:8.3f} {rows / seconds:12,.0f} "
+                  f"{size / 1e6:8.2f} {size / csv_size:7.2f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# generate_data.py
+#
+# Synthetic inputs for the ETL benchmarks. Rows are generated in vectorized blocks so
+# 1e8-row files can be produced without holding them in memory.
+#
+#   python benchmarks/generate_data.py --format csv --rows 1000000 --output /tmp/bench.csv
+#   python benchmarks/generate_data.py --format xml --rows 100000 --columns id:int,name:str,genre:category
+
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_COLUMNS = 'id:int,name:str,date:date,amount:float'
+CATEGORIES = ['Computer', 'Fantasy', 'Romance', 'Horror', 'Science Fiction']
+BLOCK_ROWS = 500000
+
+
+def parse_columns(spec):
+    """
+    Parse "name:type,..." where type is int, float, str, date or category.
+    """
+    columns = []
+    for item in spec.split(','):
+        name, _, kind = item.strip().partition(':')
+        if kind not in ('int', 'float', 'str', 'date', 'category'):
+            raise ValueError(f"Unsupported column type '{kind}' for column '{name}'")
+        columns.append((name, kind))
+    return columns
+
+
+def generate_block(columns, start, rows, string_width, rng):
+    data = {}
+    for name, kind in columns:
+        if kind == 'int':
+            data[name] = np.arange(start + 1, start + rows + 1) if name == 'id' else rng.integers(0, 100000, rows)
+        elif kind == 'float':
+            data[name] = np.round(rng.uniform(0, 10000, rows), 2)
+        elif kind == 'str':
+            letters = rng.integers(97, 123, (rows, string_width), dtype=np.uint8)
+            data[name] = letters.view(f'S{string_width}').ravel().astype(str)
+        elif kind == 'date':
+            days = rng.integers(0, 3650, rows)
+            data[name] = (np.datetime64('2015-01-01') + days).astype(str)
+        else:
+            data[name] = np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), rows)]
+    return pd.DataFrame(data)
+
+
+def iter_blocks(rows, columns, string_width=12, seed=0):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, BLOCK_ROWS):
+        yield generate_block(columns, start, min(BLOCK_ROWS, rows - start), string_width, rng)
+
+
+def _write_xml_block(file, block):
+    names = list(block.columns)
+    for values in block.itertuples(index=False):
+        fields = ''.join(f"<{name}>{value}</{name}>" for name, value in zip(names, values))
+        file.write(f"  <record>{fields}</record>\n")
+
+
+def generate(path, file_format, rows, columns=DEFAULT_COLUMNS, string_width=12, seed=0):
+    """
+    Write a synthetic input file.
+
+    :param file_format: csv (comma), txt (tab), xml (<records><record>...) or json (JSON Lines).
+    :return: The parsed column list, e.g. to build a matching XML layout.
+    """
+    columns = parse_columns(columns)
+    with open(path, 'w', newline='') as file:
+        if file_format == 'xml':
+            file.write('<?xml version="1.0"?>\n<records>\n')
+        for index, block in enumerate(iter_blocks(rows, columns, string_width, seed)):
+            if file_format in ('csv', 'txt'):
+                block.to_csv(file, index=False, header=index == 0, sep=',' if file_format == 'csv' else '\t')
+            elif file_format == 'json':
+                file.write(block.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+            elif file_format == 'xml':
+                _write_xml_block(file, block)
+            else:
+                raise ValueError(f"Unsupported format: {file_format}")
+        if file_format == 'xml':
+            file.write('</records>\n')
+    return columns
+
+
+def xml_layout(columns):
+    types = {'int': 'int', 'float': 'float'}
+    return {
+        'record_path': 'record',
+        'fields': {name: {'path': name, 'type': types.get(kind, 'str')} for name, kind in columns},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic ETL benchmark inputs.')
+    parser.add_argument('--format', required=True, choices=['csv', 'txt', 'xml', 'json'])
+    parser.add_argument('--rows', type=int, required=True, help='Number of rows (e.g. 10000 to 100000000)')
+    parser.add_argument('--output', required=True, help='File to write')
+    parser.add_argument('--columns', default=DEFAULT_COLUMNS, help='Comma separated name:type list')
+    parser.add_argument('--string-width', type=int, default=12, help='Characters per generated string value')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    columns = generate(args.output, args.format, args.rows, args.columns, args.string_width, args.seed)
+    if args.format == 'xml':
+        print(json.dumps(xml_layout(columns)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+# run_benchmarks.py
+#
+# Run the ETL entry points against synthetic inputs and append rows/sec, peak RSS and CPU
+# utilisation to a JSON Lines results file, one record per (target, format, rows).
+#
+#   python benchmarks/run_benchmarks.py --rows 10000 1000000 --formats csv xml
+#   python benchmarks/run_benchmarks.py --rows 100000 --targets dutil --compare
+#
+# Each measurement runs in a fresh interpreter so peak RSS and CPU time belong to that
+# target alone. process_file writes to a SQLite stand-in instead of Postgres.
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from generate_data import DEFAULT_COLUMNS, generate, parse_columns, xml_layout  # noqa: E402
+
+DELIMITERS = {'csv': ',', 'txt': '\t'}
+
+# Input formats each entry point can read
+TARGETS = {
+    'process_file': ['csv'],
+    'process_file_parallel': ['csv', 'txt'],
+    'dutil': ['csv', 'txt', 'xml'],
+    'file_to_output': ['csv', 'txt'],
+}
+
+
+def _sqlite_loader(database):
+    local = threading.local()
+
+    def load(rows):
+        if not hasattr(local, 'conn'):
+            local.conn = sqlite3.connect(database, timeout=60, check_same_thread=False)
+            local.conn.execute('CREATE TABLE IF NOT EXISTS processed_data '
+                               '(id INTEGER PRIMARY KEY, name TEXT, date TEXT, amount REAL)')
+        local.conn.executemany('INSERT OR REPLACE INTO processed_data (id, name, date, amount) VALUES (?, ?, ?, ?)',
+                               rows[['id', 'name', 'date', 'amount']].itertuples(index=False, name=None))
+        local.conn.commit()
+    return load
+
+
+def run_target(target, file_format, path, workdir, columns):
+    """
+    Run one entry point in this process and return the number of rows it handled.
+    """
+    delimiter = DELIMITERS.get(file_format, ',')
+    if target == 'process_file':
+        import process_file
+        counted = []
+        load = _sqlite_loader(os.path.join(workdir, 'bench.sqlite'))
+        process_file.LOADERS['sqlite'] = lambda rows: (load(rows), counted.append(len(rows)))
+        process_file.process_csv_in_chunks(path, delimiter, chunk_size=10000, load_mode='sqlite', writers=1)
+        return sum(counted)
+    if target == 'process_file_parallel':
+        import process_file_parallel
+        tasks = process_file_parallel.plan_tasks([(path, delimiter)], 64 * 1024 * 1024)
+        per_file, failures, _ = process_file_parallel.run_batch(tasks)
+        if failures:
+            raise RuntimeError(failures[0][1])
+        return sum(stats['rows'] for stats in per_file.values())
+    if target == 'dutil':
+        sys.path.insert(0, os.path.join(ROOT, 'Approach1'))
+        import Dutil
+        output_path = os.path.join(workdir, 'dutil_output.csv')
+        config = {file_format: {'input_path': path, 'output_path': output_path, 'delimiter': delimiter}}
+        if file_format == 'xml':
+            config[file_format].update(xml_layout(parse_columns(columns)))
+        Dutil.process_file(file_format, config)
+        return _count_rows(output_path)
+    if target == 'file_to_output':
+        sys.path.insert(0, os.path.join(ROOT, 'RealProject'))
+        import file_processing
+        os.chdir(workdir)
+        source = ((path, delimiter, file_format), 'FILE')
+        file_processing.file_to_output(source, ('csv', 'OUTPUT'))
+        outputs = [name for name in os.listdir(workdir) if name.startswith('output_')]
+        return _count_rows(os.path.join(workdir, outputs[-1]))
+    raise ValueError(f"Unknown target: {target}")
+
+
+def _count_rows(path):
+    with open(path, 'rb') as file:
+        return max(sum(block.count(b'\n') for block in iter(lambda: file.read(1 << 20), b'')) - 1, 0)
+
+
+def _cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime + children.ru_utime + children.ru_stime
+
+
+def child_main(target, file_format, path, workdir, columns):
+    cpu_start = _cpu_seconds()
+    start = time.perf_counter()
+    rows = run_target(target, file_format, path, workdir, columns)
+    wall = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    print(json.dumps({
+        'rows': rows,
+        'wall_seconds': round(wall, 4),
+        'rows_per_sec': round(rows / wall, 1) if wall else None,
+        'cpu_seconds': round(cpu, 4),
+        'cpu_utilisation': round(cpu / wall, 3) if wall else None,
+        # ru_maxrss is in kilobytes on Linux; pool workers are reported through RUSAGE_CHILDREN
+        'peak_rss_mb': round(peak_kb / 1024, 1),
+    }))
+
+
+def measure(target, file_format, path, columns):
+    workdir = tempfile.mkdtemp(prefix='etl_bench_')
+    with tempfile.TemporaryFile() as stderr:
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', target, file_format, path, workdir, columns],
+            stdout=subprocess.PIPE, stderr=stderr, cwd=workdir, text=True)
+        if completed.returncode != 0:
+            stderr.seek(0)
+            tail = stderr.read().decode(errors='replace').strip().splitlines()[-1:]
+            return {'error': tail[0] if tail else f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def current_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compare(records, previous):
+    for record in records:
+        key = (record['target'], record['format'], record['rows_requested'])
+        baseline = [old for old in previous
+                    if (old['target'], old['format'], old['rows_requested']) == key
+                    and old.get('commit') != record.get('commit') and old.get('rows_per_sec')]
+        if not baseline or not record.get('rows_per_sec'):
+            continue
+        base = baseline[-1]
+        print(f"{key[0]:<22} {key[1]:<4} {key[2]:>10} rows: {record['rows_per_sec'] / base['rows_per_sec']:6.2f}x "
+              f"rows/sec vs {base['commit']}, peak RSS {record['peak_rss_mb']} MB vs {base['peak_rss_mb']} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child_main(*sys.argv[2:7])
+        return
+
+    parser = argparse.ArgumentParser(description='Benchmark the ETL entry points on synthetic data.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000], help='Row counts to generate')
+    parser.add_argument('--formats', nargs='+', default=['csv', 'txt', 'xml'], choices=['csv', 'txt', 'xml', 'json'])
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument('--columns', default=DEFAULT_COLUMNS, help='Column mix as name:type,... (see generate_data)')
+    parser.add_argument('--string-width', type=int, default=12)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'etl_bench_data'),
+                        help='Where generated inputs are kept and reused')
+    parser.add_argument('--results', default=os.path.join(BENCH_DIR, 'results.jsonl'))
+    parser.add_argument('--compare', action='store_true', help='Compare against the latest run of another commit')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    previous = load_results(args.results)
+    commit = current_commit()
+    records = []
+    for rows in args.rows:
+        for file_format in args.formats:
+            targets = [target for target in args.targets if file_format in TARGETS[target]]
+            if not targets:
+                continue
+            spec = hashlib.md5(f"{args.columns}|{args.string_width}".encode()).hexdigest()[:8]
+            name = f"{file_format}_{rows}_{spec}.{file_format}"
+            path = os.path.join(args.data_dir, name)
+            if not os.path.exists(path):
+                print(f"Generating {rows} {file_format} rows into {path}")
+                generate(path, file_format, rows, args.columns, args.string_width)
+            for target in targets:
+                result = measure(target, file_format, path, args.columns)
+                record = {
+                    'timestamp': datetime.now().isoformat(timespec='seconds'),
+                    'commit': commit,
+                    'python': platform.python_version(),
+                    'cpu_count': os.cpu_count(),
+                    'target': target,
+                    'format': file_format,
+                    'rows_requested': rows,
+                    'columns': args.columns,
+                    'input_bytes': os.path.getsize(path),
+                    **result,
+                }
+                records.append(record)
+                if 'error' in result:
+                    print(f"{target:<22} {file_format:<4} {rows:>10} rows: FAILED {result['error']}")
+                else:
+                    print(f"{target:<22} {file_format:<4} {rows:>10} rows: {result['rows_per_sec']:>12,.0f} rows/sec, "
+                          f"peak RSS {result['peak_rss_mb']:>8} MB, CPU {result['cpu_utilisation']:.2f} cores")
+
+    with open(args.results, 'a') as file:
+        for record in records:
+            file.write(json.dumps(record) + '\n')
+    print(f"Results appended to {args.results}")
+    if args.compare:
+        compare(records, previous)
+
+
+if __name__ == "__main__":
+    main()
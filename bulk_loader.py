@@ -0,0 +1,60 @@
+# bulk_loader.py
+
+import io
+
+
+def copy_upsert(conn, frame, table, columns, key):
+    """
+    Stream a DataFrame into a staging table with COPY and merge it into the target table.
+
+    Rows with a key are upserted on that key; rows without one are inserted and take the
+    column default. The caller owns the transaction and must commit.
+
+    :param conn: Open psycopg2 connection.
+    :param frame: DataFrame holding at least the given columns.
+    :param table: Target table name.
+    :param columns: Columns to load, in target table order.
+    :param key: Conflict column used for the upsert.
+    :return: Number of rows copied.
+    """
+    stage = f"{table}_stage"
+    column_list = ", ".join(columns)
+    value_columns = [col for col in columns if col != key]
+    value_list = ", ".join(value_columns)
+    update_list = ", ".join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+
+    column = frame[key]
+    if column.dtype.kind == 'f' and (column.dropna() % 1 == 0).all():
+        # One missing id makes read_csv return the column as float64; COPY would then send
+        # "5.0", which an integer key rejects, so write it as a nullable integer instead
+        frame = frame.assign(**{key: column.astype('Int64')})
+    buffer = io.StringIO()
+    frame.to_csv(buffer, columns=columns, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = conn.cursor()
+    cursor.execute(f"""
+    CREATE TEMP TABLE IF NOT EXISTS {stage} ON COMMIT DELETE ROWS AS
+    SELECT {column_list} FROM {table} WITH NO DATA;
+    """)
+    cursor.copy_expert(f"COPY {stage} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+    # DISTINCT ON keeps one row per key so a chunk with repeated ids cannot hit the same row twice
+    cursor.execute(f"""
+    INSERT INTO {table} ({column_list})
+    SELECT DISTINCT ON ({key}) {column_list} FROM {stage}
+    WHERE {key} IS NOT NULL
+    ORDER BY {key}, ctid DESC
+    ON CONFLICT ({key}) DO UPDATE SET {update_list};
+    """)
+    cursor.execute(f"""
+    INSERT INTO {table} ({value_list})
+    SELECT {value_list} FROM {stage}
+    WHERE {key} IS NULL;
+    """)
+    # Explicit keys bypass a SERIAL sequence; move it past them so default keys don't collide.
+    # is_called = false makes the next default exactly MAX + 1, which is 1 on an empty table
+    cursor.execute(f"""
+    SELECT setval(pg_get_serial_sequence('{table}', '{key}'), COALESCE(MAX({key}), 0) + 1, false) FROM {table};
+    """)
+    cursor.close()
+    return len(frame)
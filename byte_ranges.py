@@ -0,0 +1,77 @@
+# byte_ranges.py
+
+import io
+import mmap
+import os
+
+import pandas as pd
+
+# Quotes are counted in blocks of this size so splitting never copies a whole range
+_SCAN_BLOCK = 16 * 1024 * 1024
+
+
+def read_header(path):
+    with open(path, 'rb') as file:
+        header = file.readline()
+        return header, file.tell()
+
+
+def _count(view, start, end, quotechar):
+    total = 0
+    for offset in range(start, end, _SCAN_BLOCK):
+        total += view[offset:min(offset + _SCAN_BLOCK, end)].count(quotechar)
+    return total
+
+
+def split_ranges(path, target_size, skip_header=True, quotechar='"', start=None):
+    """
+    Split a file into newline-aligned byte ranges of roughly target_size bytes.
+
+    A newline only ends a range when it sits outside a quoted field, found by keeping the
+    quote count parity since the start of the range; doubled quotes ("") keep the parity
+    unchanged, so standard CSV escaping is handled. Pass quotechar=None for files without quoting.
+
+    :param path: File to split.
+    :param target_size: Approximate bytes per range.
+    :param skip_header: Start the first range after the header line.
+    :param quotechar: Quote character of the file, or None.
+    :param start: Offset of a row boundary to start from instead of the file start, e.g. a
+        checkpointed offset.
+    :return: List of (start, end) byte offsets covering the file body.
+    """
+    size = os.path.getsize(path)
+    if start is None:
+        start = read_header(path)[1] if skip_header else 0
+    if start >= size:
+        return []
+    quote = quotechar.encode() if quotechar else None
+    ranges = []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        while start < size:
+            end = min(start + max(target_size, 1), size)
+            parity = _count(view, start, end, quote) % 2 if quote else 0
+            while end < size:
+                newline = view.find(b'\n', end)
+                if newline == -1:
+                    end = size
+                    break
+                if quote:
+                    parity = (parity + _count(view, end, newline, quote)) % 2
+                end = newline + 1
+                if parity == 0:
+                    break
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_range(path, start, end, delimiter, names, **read_csv_args):
+    """
+    Parse the rows between two range offsets straight from a memory map of the file.
+
+    :param names: Column names, normally taken from the file header.
+    :param read_csv_args: Extra pd.read_csv options such as dtype or usecols.
+    """
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        data = view[start:end]
+    return pd.read_csv(io.BytesIO(data), delimiter=delimiter, header=None, names=names, **read_csv_args)
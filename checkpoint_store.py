@@ -0,0 +1,146 @@
+# checkpoint_store.py
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Bytes hashed at the start of the file and just before the committed offset
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def _hash_bytes(path, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        return hashlib.sha1(file.read(end - start)).hexdigest()
+
+
+class CheckpointStore:
+    """
+    Per-file ingestion checkpoints kept in a local SQLite database.
+
+    For every file it records a fingerprint (size, mtime, hash of the first 64 KB) and the
+    byte offset up to which rows are committed, together with a hash of the 64 KB before that
+    offset. A rerun can then skip unchanged files, resume after the last committed offset, or
+    read only the tail appended since the last run.
+    """
+
+    def __init__(self, database='.etl_checkpoints.sqlite'):
+        self.database = database
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(database, check_same_thread=False)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS file_checkpoints (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            head_hash TEXT,
+            committed_offset INTEGER,
+            committed_hash TEXT,
+            committed_rows INTEGER,
+            complete INTEGER,
+            updated_at REAL
+        )
+        """)
+        self.conn.commit()
+
+    def _fingerprint(self, path):
+        stat = os.stat(path)
+        head_hash = _hash_bytes(path, 0, min(stat.st_size, FINGERPRINT_BYTES))
+        return stat.st_size, stat.st_mtime_ns, head_hash
+
+    def plan(self, path, body_start=0):
+        """
+        Decide how much of a file still needs loading.
+
+        :param path: File about to be ingested.
+        :param body_start: Offset of the first data row (after the header).
+        :return: Tuple (action, offset): ("skip", size) when nothing changed, ("resume", offset)
+            after an interrupted run, ("append", offset) for new data at the end of a completed
+            file, or ("full", body_start) when the file is new or was rewritten.
+        """
+        size, mtime_ns, head_hash = self._fingerprint(path)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, head_hash, committed_offset, committed_hash, complete "
+                "FROM file_checkpoints WHERE path = ?", (os.path.abspath(path),)).fetchone()
+        if row is None:
+            return 'full', body_start
+        old_size, old_mtime_ns, old_head_hash, offset, committed_hash, complete = row
+        if old_head_hash != head_hash or size < offset:
+            return 'full', body_start
+        if complete and (size, mtime_ns) == (old_size, old_mtime_ns):
+            return 'skip', size
+        # The bytes before the committed offset must be untouched for a resume to be safe
+        if offset and _hash_bytes(path, max(0, offset - FINGERPRINT_BYTES), offset) != committed_hash:
+            return 'full', body_start
+        if offset <= body_start:
+            return 'full', body_start
+        return ('append' if complete else 'resume'), offset
+
+    def start(self, path, offset, reset):
+        """
+        Record the fingerprint of a file whose load starts at offset.
+
+        :param reset: Forget the committed row count, for files that are loaded from scratch.
+        """
+        size, mtime_ns, head_hash = self._fingerprint(path)
+        committed_hash = _hash_bytes(path, max(0, offset - FINGERPRINT_BYTES), offset)
+        key = os.path.abspath(path)
+        with self.lock:
+            row = self.conn.execute("SELECT committed_rows FROM file_checkpoints WHERE path = ?", (key,)).fetchone()
+            rows = 0 if reset or row is None else row[0]
+            self.conn.execute("INSERT OR REPLACE INTO file_checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?)",
+                              (key, size, mtime_ns, head_hash, offset, committed_hash, rows, time.time()))
+            self.conn.commit()
+
+    def commit(self, path, offset, rows):
+        """Move the committed offset forward after rows up to offset are durably loaded."""
+        committed_hash = _hash_bytes(path, max(0, offset - FINGERPRINT_BYTES), offset)
+        with self.lock:
+            self.conn.execute(
+                "UPDATE file_checkpoints SET committed_offset = ?, committed_hash = ?, "
+                "committed_rows = committed_rows + ?, updated_at = ? WHERE path = ?",
+                (offset, committed_hash, rows, time.time(), os.path.abspath(path)))
+            self.conn.commit()
+
+    def complete(self, path):
+        with self.lock:
+            self.conn.execute("UPDATE file_checkpoints SET complete = 1, updated_at = ? WHERE path = ?",
+                              (time.time(), os.path.abspath(path)))
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class RangeCommitter:
+    """
+    Turn out-of-order range completions into a contiguous committed offset.
+
+    Writers finish byte ranges in any order; the checkpoint only advances once every range
+    before it is loaded, so a resume never skips a range that was still in flight.
+    """
+
+    def __init__(self, store, path, ranges):
+        self.store = store
+        self.path = path
+        self.ends = dict(ranges)
+        self.next_start = ranges[0][0] if ranges else None
+        self.done = {}
+        self.lock = threading.Lock()
+
+    def mark_done(self, start, rows):
+        with self.lock:
+            self.done[start] = rows
+            offset = None
+            rows_committed = 0
+            while self.next_start in self.done:
+                rows_committed += self.done.pop(self.next_start)
+                offset = self.ends[self.next_start]
+                self.next_start = offset
+            if offset is not None:
+                self.store.commit(self.path, offset, rows_committed)
+                logging.info(f"Checkpoint for {self.path} advanced to byte {offset}")
@@ -0,0 +1,60 @@
+# chunk_transform.py
+
+import pandas as pd
+
+
+# Registry of column rule types. Each entry takes (column Series, rule dict) and
+# returns the transformed Series; every implementation must stay column-wise.
+RULE_TYPES = {}
+
+
+def register_rule(name):
+    def decorator(func):
+        RULE_TYPES[name] = func
+        return func
+    return decorator
+
+
+@register_rule("date_format")
+def date_format(series, rule):
+    parsed = pd.to_datetime(series, format=rule.get("input_format", "%Y-%m-%d"))
+    output_format = rule.get("output_format")
+    if output_format is None:
+        return parsed
+    return parsed.dt.strftime(output_format)
+
+
+@register_rule("scale")
+def scale(series, rule):
+    return pd.to_numeric(series) * rule["factor"]
+
+
+@register_rule("offset")
+def offset(series, rule):
+    return pd.to_numeric(series) + rule["value"]
+
+
+@register_rule("strip")
+def strip(series, rule):
+    return series.str.strip()
+
+
+def apply_rules(chunk, rules):
+    """
+    Apply declarative column rules to a chunk as whole-column operations.
+
+    :param chunk: DataFrame chunk to transform.
+    :param rules: List of dicts with at least "column" and "rule" keys.
+    :return: A new DataFrame with the rules applied; rules for missing columns are skipped.
+    """
+    chunk = chunk.copy()
+    for rule in rules:
+        column = rule["column"]
+        if column not in chunk.columns:
+            continue
+        try:
+            func = RULE_TYPES[rule["rule"]]
+        except KeyError:
+            raise ValueError(f"Unknown transform rule: {rule['rule']}")
+        chunk[column] = func(chunk[column], rule)
+    return chunk
@@ -0,0 +1,195 @@
+# chunk_validation.py
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+def _to_int(series):
+    # Whole numbers only: "12.0" counts as 12, "12.5" does not
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return series, series.notna()
+    numbers = series if pd.api.types.is_float_dtype(series.dtype) else pd.to_numeric(series, errors='coerce')
+    whole = numbers.notna() & (numbers % 1 == 0)
+    return numbers.where(whole), whole
+
+
+def _to_float(series):
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return series, series.notna()
+    numbers = pd.to_numeric(series, errors='coerce')
+    return numbers, numbers.notna()
+
+
+def _to_date(series, spec):
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return series, series.notna()
+    parsed = pd.to_datetime(series, format=spec.get('format', '%Y-%m-%d'), errors='coerce')
+    return parsed, parsed.notna()
+
+
+def _to_str(series):
+    return series, pd.Series(True, index=series.index)
+
+
+def _check_column(series, spec):
+    """
+    Return (converted column, {reason code: failing mask}) for one column.
+
+    Every check is a whole-column mask; values are only converted, never dropped here.
+    Columns whose dtype already matches the spec are used as they are, and values are
+    only turned into strings for the pattern and max_length checks.
+    """
+    kind = spec.get('type', 'str')
+    missing = series.isna()
+    # Blank strings count as missing; only text columns can hold them
+    if pd.api.types.is_object_dtype(series.dtype):
+        # Object columns may mix strings with other values, which .str cannot take
+        missing |= series.astype(str).str.strip() == ''
+    elif pd.api.types.is_string_dtype(series.dtype):
+        missing |= series.str.strip().eq('').fillna(False).astype(bool)
+    if kind == 'int':
+        converted, ok = _to_int(series)
+    elif kind == 'float':
+        converted, ok = _to_float(series)
+    elif kind == 'date':
+        converted, ok = _to_date(series, spec)
+    elif kind == 'str':
+        converted, ok = _to_str(series)
+    else:
+        raise ValueError(f"Unknown column type in validation schema: {kind}")
+
+    failures = {}
+    if spec.get('required'):
+        failures['missing'] = missing
+    # A missing optional value is not a type error
+    failures[f'bad_{kind}'] = ~ok & ~missing
+    if 'min' in spec:
+        failures['below_min'] = ok & (converted < spec['min'])
+    if 'max' in spec:
+        failures['above_max'] = ok & (converted > spec['max'])
+    if 'pattern' in spec or 'max_length' in spec:
+        text = series.astype(str)
+        if 'pattern' in spec:
+            failures['pattern'] = ~missing & ~text.str.fullmatch(spec['pattern'])
+        if 'max_length' in spec:
+            failures['too_long'] = text.str.len() > spec['max_length']
+    return converted, failures
+
+
+def validate_chunk(chunk, schema, convert=True):
+    """
+    Split a chunk into rows that pass the schema and rows that do not.
+
+    :param chunk: DataFrame chunk.
+    :param schema: Mapping of column name to a spec: "type" (str, int, float or date, with
+        "format" for dates), optional "required", "min", "max", "pattern" (full-match regex)
+        and "max_length". A column the chunk lacks fails every row as "absent:<column>".
+    :param convert: Replace checked columns of the good rows with their converted values.
+    :return: Tuple of (good rows, bad rows with a "reasons" column of ";"-joined codes such
+        as "bad_date:date;below_min:age").
+    """
+    reasons = pd.Series('', index=chunk.index, dtype=object)
+    bad = np.zeros(len(chunk), dtype=bool)
+    converted = {}
+    for name, spec in schema.items():
+        if name not in chunk.columns:
+            failures = {'absent': pd.Series(True, index=chunk.index)}
+        else:
+            converted[name], failures = _check_column(chunk[name], spec)
+        for code, mask in failures.items():
+            mask = mask.to_numpy(dtype=bool)
+            if mask.any():
+                # Only failing rows get a reason string, so clean chunks build no strings at all
+                reasons[mask] = reasons[mask] + f"{code}:{name};"
+                bad |= mask
+    good = chunk[~bad]
+    if convert and len(good):
+        good = good.assign(**{name: column[~bad] for name, column in converted.items()})
+        for name, spec in schema.items():
+            if spec.get('type') == 'int' and name in good.columns:
+                # Nullable integers only when the column actually has missing values
+                column = good[name]
+                good[name] = column.astype('Int64' if column.isna().any() else 'int64')
+    good.attrs = dict(chunk.attrs)
+    rejected = chunk[bad].assign(reasons=reasons[bad].str.rstrip(';'))
+    return good, rejected
+
+
+def infer_validation_schema(sample, threshold=0.98):
+    """
+    Infer a schema from a sample chunk: a column gets the strictest type that at least
+    threshold of its non-empty values satisfy, so a few dirty values do not decide it.
+
+    Float columns and text holding decimal points are never inferred as int: amounts such
+    as 100.00 in the sample say nothing about the decimals in later rows.
+    """
+    schema = {}
+    for name in sample.columns:
+        values = sample[name].dropna()
+        values = values[values.astype(str).str.strip() != '']
+        kind = 'str'
+        if len(values):
+            decimal = (pd.api.types.is_float_dtype(values.dtype)
+                       or values.astype(str).str.contains('.', regex=False).any())
+            for candidate, check in (('int', lambda v: _to_int(v)[1]), ('float', lambda v: _to_float(v)[1]),
+                                     ('date', lambda v: _to_date(v, {})[1])):
+                if candidate == 'int' and decimal:
+                    continue
+                if check(values).mean() >= threshold:
+                    kind = candidate
+                    break
+        schema[name] = {'type': kind}
+    return schema
+
+
+class QuarantineSink:
+    """
+    Thread-safe JSON lines file of rejected rows with their reason codes.
+
+    Each line holds the source, the reason codes and the row's original values, so rows can
+    be fixed and replayed. Counts per reason code are kept for the run summary.
+
+    :param path: Quarantine file; appended to, so several runs or files can share it. None
+        only counts the rejected rows, which are then dropped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.checked = 0
+        self.reasons = {}
+        self.lock = threading.Lock()
+
+    def add(self, rejected, source=None, checked=0):
+        """Record a chunk's rejected rows; checked is the chunk's total row count."""
+        with self.lock:
+            self.checked += checked
+            if not len(rejected):
+                return
+            for codes in rejected['reasons']:
+                for code in codes.split(';'):
+                    self.reasons[code] = self.reasons.get(code, 0) + 1
+            self.rows += len(rejected)
+            if self.path is None:
+                return
+            lines = []
+            rows = rejected.drop(columns='reasons').astype(object).where(rejected.notna(), None)
+            for reasons, row in zip(rejected['reasons'], rows.to_dict('records')):
+                lines.append(json.dumps({'source': source, 'reasons': reasons.split(';'), 'row': row}, default=str))
+            with open(self.path, 'a') as file:
+                file.write('\n'.join(lines) + '\n')
+
+    def summary_lines(self):
+        share = self.rows / self.checked if self.checked else 0
+        if self.path is None:
+            lines = [f"Validation: {self.rows}/{self.checked} rows dropped ({share:.2%}), no quarantine file"]
+        else:
+            lines = [f"Validation: {self.rows}/{self.checked} rows quarantined ({share:.2%}) to "
+                     f"{os.path.abspath(self.path)}"]
+        for code, count in sorted(self.reasons.items(), key=lambda item: -item[1]):
+            lines.append(f"  {code}: {count}")
+        return lines
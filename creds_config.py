@@ -1,10 +1,17 @@
-
-
-# Postgres DB Details
-DATABASE = {
-    'dbname': 'newDB',
-    'user': 'postgres',
-    'password': 'password',
-    'host': 'localhost',
-    'port': '5432'
-}
+
+
+# Postgres DB Details
+DATABASE = {
+    'dbname': 'newDB',
+    'user': 'postgres',
+    'password': 'password',
+    'host': 'localhost',
+    'port': '5432'
+}
+
+# Connection pool settings used by db_pool; max_size of None sizes the pool to the worker count
+DATABASE_POOL = {
+    'min_size': 1,
+    'max_size': None,
+    'pre_ping': True
+}
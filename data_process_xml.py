@@ -1,34 +1,63 @@
-import xml.etree.ElementTree as ET
-
-
-def extract_data(filename):
-    """
-  Extracts name, age, and amount data from each record in an XML file.
-
-  Args:
-      filename: The path to the XML file.
-
-  Returns:
-      A list of dictionaries, where each dictionary contains the extracted data
-      for a single record.
-  """
-    tree = ET.parse(filename)
-    root = tree.getroot()
-
-    data = []
-    for record in root.findall('record'):
-        record_data = {}
-        record_data['name'] = record.find('name').text
-        record_data['age'] = int(record.find('age').text)  # Convert age to integer
-        record_data['amount'] = float(record.find('amount').text)  # Convert amount to float
-        data.append(record_data)
-
-    return data
-
-
-if __name__ == "__main__":
-    filename = "test_data.xml"  # Replace with the actual filename
-    extracted_data = extract_data(filename)
-
-    for record in extracted_data:
-        print(f"Name: {record['name']}, Age: {record['age']}, Amount: {record['amount']}")
+import logging
+
+import source_config
+from chunk_validation import QuarantineSink, validate_chunk
+from xml_stream import iter_records
+
+
+def extract_batches(filename, layout="record", batch_size=1000, sink=None):
+    """
+  Streams records from an XML file as validated DataFrame batches.
+
+  Args:
+      filename: The path to the XML file.
+      layout: Key of the record layout in source_config.XML_LAYOUTS.
+      batch_size: Number of records per batch.
+      sink: Optional chunk_validation.QuarantineSink receiving the records that fail
+          validation; without one they are dropped, and the count is logged as a warning.
+
+  Returns:
+      A generator of DataFrames that can be fed to the same chunked
+      transform/load path as CSV chunks.
+  """
+    config = source_config.XML_LAYOUTS[layout]
+    # Fields are read as text and converted by the validation pass, so one bad value
+    # rejects its record instead of failing the whole batch
+    fields = {name: {**field, "type": "str"} for name, field in config["fields"].items()}
+    schema = source_config.VALIDATION_SCHEMAS.get(layout) or {
+        name: {"type": field.get("type", "str")} for name, field in config["fields"].items()}
+    counter = QuarantineSink(None) if sink is None else None
+    for batch in iter_records(filename, config["record_path"], fields, batch_size):
+        good, rejected = validate_chunk(batch, schema)
+        (sink or counter).add(rejected, filename, len(batch))
+        yield good
+    if counter is not None and counter.rows:
+        for line in counter.summary_lines():
+            logging.warning(f"{filename}: {line.strip()}")
+
+
+def extract_data(filename):
+    """
+  Extracts name, age, and amount data from each record in an XML file.
+
+  Args:
+      filename: The path to the XML file.
+
+  Returns:
+      A list of dictionaries, where each dictionary contains the extracted data
+      for a single record.
+  """
+    data = []
+    for batch in extract_batches(filename):
+        data.extend(batch.to_dict('records'))
+    return data
+
+
+if __name__ == "__main__":
+    filename = "test_data.xml"  # Replace with the actual filename
+    sink = QuarantineSink("quarantine.jsonl")
+    for batch in extract_batches(filename, sink=sink):
+        for record in batch.to_dict('records'):
+            print(f"Name: {record['name']}, Age: {record['age']}, Amount: {record['amount']}")
+    for line in sink.summary_lines():
+        print(line)
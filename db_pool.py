@@ -0,0 +1,130 @@
+# db_pool.py
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import cpu_count
+
+import creds_config
+
+_pool = None
+_pool_pid = None
+_slots = None
+_lock = threading.Lock()
+
+METRICS = {
+    'checkouts': 0,
+    'reconnects': 0,
+    'wait_seconds': 0.0,
+    'max_wait_seconds': 0.0,
+    'checkout_seconds': 0.0,
+    'max_checkout_seconds': 0.0,
+}
+
+
+def init_pool(size=None):
+    """
+    Create the process-wide connection pool from creds_config.DATABASE.
+
+    Calling it again in the same process returns the existing pool; a forked child gets
+    its own pool instead of sharing the parent's sockets.
+
+    :param size: Maximum number of connections, defaults to DATABASE_POOL['max_size'] or the CPU count.
+    :return: The psycopg2 ThreadedConnectionPool.
+    """
+    # Imported here so modules that only reference db_pool do not pay for psycopg2 at startup
+    from psycopg2 import pool as pg_pool
+
+    global _pool, _pool_pid, _slots
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            return _pool
+        settings = creds_config.DATABASE_POOL
+        max_size = size or settings.get('max_size') or cpu_count()
+        min_size = min(settings.get('min_size', 1), max_size)
+        _pool = pg_pool.ThreadedConnectionPool(
+            min_size,
+            max_size,
+            dbname=creds_config.DATABASE['dbname'],
+            user=creds_config.DATABASE['user'],
+            password=creds_config.DATABASE['password'],
+            host=creds_config.DATABASE['host'],
+            port=creds_config.DATABASE['port']
+        )
+        _pool_pid = os.getpid()
+        # ThreadedConnectionPool raises when exhausted; the semaphore makes callers wait instead
+        _slots = threading.BoundedSemaphore(max_size)
+        logging.info(f"Created database connection pool with {min_size}-{max_size} connections")
+        return _pool
+
+
+def _is_alive(conn):
+    if conn.closed:
+        return False
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        conn.rollback()
+        return True
+    except Exception:
+        return False
+
+
+def _record(name, seconds):
+    with _lock:
+        METRICS[f'{name}_seconds'] += seconds
+        METRICS[f'max_{name}_seconds'] = max(METRICS[f'max_{name}_seconds'], seconds)
+
+
+@contextmanager
+def connection():
+    """
+    Check a connection out of the pool for the duration of the block.
+
+    The connection is pinged first when DATABASE_POOL['pre_ping'] is set and replaced if it
+    is dead. A failed transaction is rolled back before the connection goes back.
+    """
+    db_pool = init_pool()
+    wait_start = time.perf_counter()
+    _slots.acquire()
+    try:
+        conn = db_pool.getconn()
+        if creds_config.DATABASE_POOL.get('pre_ping', True) and not _is_alive(conn):
+            db_pool.putconn(conn, close=True)
+            conn = db_pool.getconn()
+            with _lock:
+                METRICS['reconnects'] += 1
+        _record('wait', time.perf_counter() - wait_start)
+        with _lock:
+            METRICS['checkouts'] += 1
+
+        checkout_start = time.perf_counter()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            _record('checkout', time.perf_counter() - checkout_start)
+            db_pool.putconn(conn, close=bool(conn.closed))
+    finally:
+        _slots.release()
+
+
+def pool_metrics():
+    with _lock:
+        metrics = dict(METRICS)
+    metrics['size'] = _pool.maxconn if _pool is not None else 0
+    return metrics
+
+
+def close_pool():
+    global _pool, _pool_pid
+    with _lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.closeall()
+        _pool = None
+        _pool_pid = None
@@ -0,0 +1,196 @@
+# dtype_optimizer.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Date-only and date-time strings that format back to exactly the same text
+DATETIME_PATTERNS = {
+    r'\d{4}-\d{2}-\d{2}': '%Y-%m-%d',
+    r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}': '%Y-%m-%d %H:%M:%S',
+}
+# Integers without leading zeros or signs, so they also write back unchanged
+CANONICAL_INT = r'-?(?:0|[1-9]\d*)'
+INT_TYPES = ['int8', 'int16', 'int32', 'int64']
+
+
+def _string_dtype():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None  # Python-backed strings save nothing over object columns
+    return 'string[pyarrow]'
+
+
+def _int_type(minimum, maximum):
+    for name in INT_TYPES:
+        info = np.iinfo(name)
+        if info.min <= minimum and maximum <= info.max:
+            return name
+    return 'int64'
+
+
+def _is_text(column):
+    return pd.api.types.is_object_dtype(column.dtype) or pd.api.types.is_string_dtype(column.dtype)
+
+
+def _infer_column(column, category_ratio, max_categories, parse_dates):
+    values = column.dropna()
+    if pd.api.types.is_bool_dtype(column.dtype) or values.empty:
+        return {'kind': 'keep'}
+    if pd.api.types.is_integer_dtype(column.dtype):
+        return {'kind': 'int', 'dtype': _int_type(values.min(), values.max())}
+    if not _is_text(column):
+        return {'kind': 'keep'}
+    if not values.map(type).eq(str).all():
+        return {'kind': 'keep'}  # Mixed Python objects are left alone
+    text = values.astype(str)
+    if text.str.fullmatch(CANONICAL_INT).all():
+        numbers = pd.to_numeric(text)
+        if pd.api.types.is_integer_dtype(numbers.dtype):
+            return {'kind': 'int', 'dtype': _int_type(numbers.min(), numbers.max())}
+    if parse_dates:
+        for pattern, date_format in DATETIME_PATTERNS.items():
+            if text.str.fullmatch(pattern).all():
+                return {'kind': 'datetime', 'format': date_format}
+    distinct = text.unique()
+    if len(distinct) <= max_categories and len(distinct) <= category_ratio * len(text):
+        return {'kind': 'category', 'categories': sorted(distinct), 'max_categories': max_categories}
+    string_dtype = _string_dtype()
+    return {'kind': 'string', 'dtype': string_dtype} if string_dtype else {'kind': 'keep'}
+
+
+def infer_schema(frame, category_ratio=0.5, max_categories=1000, parse_dates=True):
+    """
+    Infer compact column types from a sample chunk.
+
+    :param frame: Sample chunk, typically the first one of a file.
+    :param category_ratio: Text columns with at most this share of distinct values become categorical.
+    :param max_categories: Upper bound on the categories of one column.
+    :param parse_dates: Turn ISO date / date-time strings into datetime64.
+    :return: Schema dict of column name to a spec such as {"kind": "int", "dtype": "int16"},
+        {"kind": "category", "categories": [...]}, {"kind": "datetime", "format": ...},
+        {"kind": "string", "dtype": "string[pyarrow]"} or {"kind": "keep"}.
+    """
+    return {name: _infer_column(frame[name], category_ratio, max_categories, parse_dates) for name in frame.columns}
+
+
+def _apply_column(column, spec):
+    """Convert one column; returns (column, spec), where spec may have been widened."""
+    kind = spec['kind']
+    if kind == 'int':
+        numbers = pd.to_numeric(column, errors='coerce')
+        if numbers.isna().sum() != column.isna().sum() or not (numbers.dropna() % 1 == 0).all():
+            return column, spec  # Not integers in this chunk; leave the column as it came
+        values = numbers.dropna()
+        dtype = spec['dtype']
+        if not values.empty and not (np.iinfo(dtype).min <= values.min() and values.max() <= np.iinfo(dtype).max):
+            widest = max(INT_TYPES.index(dtype), INT_TYPES.index(_int_type(values.min(), values.max())))
+            spec = dict(spec, dtype=INT_TYPES[widest])
+            dtype = spec['dtype']
+        # Nullable integers only when a chunk actually has missing values
+        return numbers.astype(dtype.capitalize() if len(values) != len(numbers) else dtype), spec
+    if kind == 'category':
+        if not _is_text(column) and not isinstance(column.dtype, pd.CategoricalDtype):
+            return column, spec
+        categories = spec['categories']
+        new = sorted(set(column.dropna().astype(str).unique()) - set(categories))
+        if len(categories) + len(new) > spec['max_categories']:
+            # Cardinality outgrew the sample; fall back to plain strings from here on
+            string_dtype = _string_dtype()
+            spec = {'kind': 'string', 'dtype': string_dtype} if string_dtype else {'kind': 'keep'}
+            return _apply_column(column.astype(object), spec)
+        if new:
+            spec = dict(spec, categories=categories + new)
+        return pd.Series(pd.Categorical(column, categories=spec['categories']), index=column.index), spec
+    if kind == 'datetime':
+        parsed = pd.to_datetime(column, format=spec['format'], errors='coerce')
+        if parsed.isna().sum() != column.isna().sum():
+            return column, spec  # Some values do not match the sampled format
+        return parsed, spec
+    if kind == 'string':
+        return column.astype(spec['dtype']) if _is_text(column) else column, spec
+    return column, spec
+
+
+def apply_schema(frame, schema):
+    """
+    Convert a chunk to an inferred schema.
+
+    Integers that no longer fit are widened and unseen category values are appended, so
+    later chunks never fail or lose values; columns that do not match their spec at all
+    are left unchanged.
+
+    :return: Tuple of (converted frame, schema), where the schema includes any widening.
+    """
+    columns = {}
+    schema = dict(schema)
+    for name in frame.columns:
+        if name in schema:
+            columns[name], schema[name] = _apply_column(frame[name], schema[name])
+        else:
+            columns[name] = frame[name]
+    result = pd.DataFrame(columns, index=frame.index)
+    result.attrs = dict(frame.attrs)
+    return result, schema
+
+
+def memory_bytes(frame):
+    return int(frame.memory_usage(index=False, deep=True).sum())
+
+
+class MemoryReport:
+    """Thread-safe totals of chunk memory before and after dtype optimization."""
+
+    def __init__(self):
+        self.chunks = 0
+        self.before = 0
+        self.after = 0
+        self.lock = threading.Lock()
+
+    def add(self, before, after):
+        with self.lock:
+            self.chunks += 1
+            self.before += before
+            self.after += after
+
+    def lines(self, schema=None):
+        saved = self.before - self.after
+        share = saved / self.before if self.before else 0
+        lines = [f"Dtype optimization: {self.chunks} chunks, {self.before / 1e6:.1f} MB -> {self.after / 1e6:.1f} MB "
+                 f"({saved / 1e6:.1f} MB, {share:.0%} saved)"]
+        for name, spec in (schema or {}).items():
+            detail = spec.get('dtype') or spec.get('format') or (
+                f"{len(spec['categories'])} categories" if 'categories' in spec else '')
+            lines.append(f"  {name}: {spec['kind']} {detail}".rstrip())
+        return lines
+
+
+class DtypeOptimizer:
+    """
+    Infer a compact schema from the first chunk of a stream and apply it to every chunk.
+
+    For single-process readers; pool workers use infer_schema/apply_schema directly with a
+    schema inferred once in the parent.
+    """
+
+    def __init__(self, **infer_options):
+        self.infer_options = infer_options
+        self.schema = None
+        self.report = MemoryReport()
+
+    def apply(self, frame):
+        if self.schema is None:
+            self.schema = infer_schema(frame, **self.infer_options)
+        before = memory_bytes(frame)
+        result, self.schema = apply_schema(frame, self.schema)
+        self.report.add(before, memory_bytes(result))
+        return result
+
+    def optimize(self, chunks):
+        for chunk in chunks:
+            yield self.apply(chunk)
+
+    def report_lines(self):
+        return self.report.lines(self.schema)
@@ -0,0 +1,110 @@
+# etl_logging.py
+
+import atexit
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import threading
+import time
+from datetime import datetime, timezone
+
+DEFAULT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, merging any extra={'fields': {...}}."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'process': record.process,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging(level=logging.INFO, filename=None, fmt=DEFAULT_FORMAT, json_format=False):
+    """
+    Route all logging through a queue drained by a background listener.
+
+    Callers only enqueue records; formatting and the actual write happen on the listener
+    thread. The queue is a multiprocessing queue, so forked pool workers log through the
+    same listener.
+
+    :param filename: Log file to append to; logs go to stderr when omitted.
+    :param json_format: Emit structured JSON lines instead of the plain text format.
+    :return: The started QueueListener (stopped automatically at exit).
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    handler = logging.FileHandler(filename) if filename else logging.StreamHandler()
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(fmt))
+
+    log_queue = multiprocessing.Queue(-1)
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+class RowSampler:
+    """
+    Decide which rows are worth logging: every Nth row, capped at a rate per second.
+
+    :param every: Log one row out of every this many (0 disables row logging).
+    :param max_per_second: Upper bound on sampled rows logged per second across threads.
+    """
+
+    def __init__(self, every=1000, max_per_second=10):
+        self.every = every
+        self.max_per_second = max_per_second
+        self.seen = 0
+        self.tokens = float(max_per_second)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _take(self, wanted):
+        now = time.monotonic()
+        self.tokens = min(self.max_per_second, self.tokens + (now - self.last) * self.max_per_second)
+        self.last = now
+        granted = min(wanted, int(self.tokens))
+        self.tokens -= granted
+        return granted
+
+    def sample_positions(self, count):
+        """Positions among the next count rows that should be logged."""
+        with self.lock:
+            start = self.seen
+            self.seen += count
+            if not self.every:
+                return range(0)
+            positions = range((-start) % self.every, count, self.every)
+            return positions[:self._take(len(positions))]
+
+    def sample(self, frame):
+        """Return the rows of a chunk that should be logged, chosen without a Python row loop."""
+        return frame.iloc[list(self.sample_positions(len(frame)))]
+
+
+def add_logging_arguments(parser):
+    parser.add_argument('--log-json', action='store_true', help='Write structured JSON log lines')
+    parser.add_argument('--log-sample-every', type=int, default=1000,
+                        help='Log one row out of every N (0 disables row logging)')
+    parser.add_argument('--log-rate-limit', type=int, default=10, help='Maximum sampled rows logged per second')
@@ -0,0 +1,259 @@
+# etl_metrics.py
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Stages reported in this order; entry points only record the ones they actually run
+STAGES = ['read', 'parse', 'validate', 'transform', 'serialize', 'db_write', 'api_write']
+
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux; pool workers are reported through RUSAGE_CHILDREN
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak_kb * 1024
+
+
+class StageTimer:
+    """Handed out by RunMetrics.stage(); set rows/bytes before the block ends."""
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+
+
+class RunMetrics:
+    """
+    Per-stage timings, row and byte counts for one ETL run, totalled per stage and per file.
+
+    Stage seconds are busy time summed over chunks, so with parallel workers they can add
+    up to more than the wall clock. add() is thread-safe.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.time()
+        self.start = time.perf_counter()
+        self.wall_seconds = None
+        self.stages = {}
+        self.files = {}
+        self.extra = {}
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds, rows=0, nbytes=0, path=None, chunks=1):
+        with self.lock:
+            targets = [self.stages]
+            if path is not None:
+                targets.append(self.files.setdefault(path, {'bytes': 0, 'stages': {}})['stages'])
+            for stages in targets:
+                totals = stages.setdefault(stage, {'chunks': 0, 'rows': 0, 'bytes': 0, 'seconds': 0.0})
+                totals['chunks'] += chunks
+                totals['rows'] += rows
+                totals['bytes'] += nbytes
+                totals['seconds'] += seconds
+
+    def add_file(self, path, nbytes):
+        """Record the input size of a file."""
+        with self.lock:
+            self.files.setdefault(path, {'bytes': 0, 'stages': {}})['bytes'] += nbytes
+
+    @contextmanager
+    def stage(self, stage, path=None):
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        finally:
+            self.add(stage, time.perf_counter() - start, timer.rows, timer.bytes, path)
+
+    def timed_iter(self, stage, chunks, path=None):
+        """Wrap a chunk iterator so the time spent producing each chunk counts towards stage."""
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            self.add(stage, time.perf_counter() - start, len(chunk) if hasattr(chunk, 'columns') else 0, path=path)
+            yield chunk
+
+    def add_timings(self, timings, rows, path=None, nbytes=0):
+        """Record a chunk's {stage: seconds} dict, e.g. measured inside a pool worker."""
+        for stage, seconds in timings.items():
+            self.add(stage, seconds, rows, nbytes if stage in ('read', 'parse') else 0, path)
+
+    def add_writer(self, writer, path=None):
+        """Record the serialize stage of a finished output_writers.ChunkWriter."""
+        nbytes = os.path.getsize(writer.path) if os.path.exists(writer.path) else 0
+        self.add('serialize', writer.seconds, writer.rows, nbytes, path, chunks=writer.chunks)
+
+    def finish(self):
+        if self.wall_seconds is None:
+            self.wall_seconds = time.perf_counter() - self.start
+
+    def report(self):
+        """
+        Return the run as a plain dict (JSON serialisable).
+        """
+        self.finish()
+        wall = max(self.wall_seconds, 1e-9)
+
+        def stage_report(stages):
+            report = {}
+            for stage in sorted(stages, key=lambda name: (STAGES.index(name) if name in STAGES else len(STAGES), name)):
+                totals = dict(stages[stage])
+                busy = max(totals['seconds'], 1e-9)
+                totals['rows_per_sec'] = round(totals['rows'] / busy, 1)
+                totals['mb_per_sec'] = round(totals['bytes'] / 1e6 / busy, 2) if totals['bytes'] else None
+                totals['share_of_wall'] = round(totals['seconds'] / wall, 3)
+                report[stage] = totals
+            return report
+
+        with self.lock:
+            peak = _peak_rss_bytes()
+            return {
+                'name': self.name,
+                'started': datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+                'wall_seconds': round(self.wall_seconds, 4),
+                'peak_rss_mb': round(peak / 1024 / 1024, 1) if peak is not None else None,
+                'stages': stage_report(self.stages),
+                'files': {path: {'bytes': info['bytes'], 'stages': stage_report(info['stages'])}
+                          for path, info in sorted(self.files.items())},
+                **self.extra,
+            }
+
+    def summary_lines(self):
+        report = self.report()
+        lines = [f"Run {report['name']}: wall {report['wall_seconds']:.3f}s, peak RSS {report['peak_rss_mb']} MB"]
+        for stage, totals in report['stages'].items():
+            throughput = f", {totals['mb_per_sec']:.2f} MB/sec" if totals['mb_per_sec'] is not None else ''
+            lines.append(f"  {stage:<10} {totals['chunks']:>6} chunks {totals['rows']:>12} rows "
+                         f"{totals['seconds']:>9.3f}s busy ({totals['share_of_wall']:.0%} of wall) "
+                         f"{totals['rows_per_sec']:>14,.0f} rows/sec{throughput}")
+        for path, info in report['files'].items():
+            stages = info['stages'].values()
+            busy = sum(totals['seconds'] for totals in stages)
+            rows = max([totals['rows'] for totals in stages] or [0])
+            nbytes = info['bytes'] or max([totals['bytes'] for totals in stages] or [0])
+            lines.append(f"  file {path}: {rows} rows, {nbytes / 1e6:.1f} MB, {busy:.3f}s busy")
+        return lines
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=2) + '\n')
+
+    def write_prometheus(self, path):
+        """
+        Write the run in the Prometheus text format, e.g. for node_exporter's textfile collector.
+        """
+        report = self.report()
+        run = report['name']
+        lines = [
+            '# TYPE etl_run_wall_seconds gauge',
+            f'etl_run_wall_seconds{{run="{run}"}} {report["wall_seconds"]}',
+        ]
+        if report['peak_rss_mb'] is not None:
+            lines += ['# TYPE etl_run_peak_rss_bytes gauge',
+                      f'etl_run_peak_rss_bytes{{run="{run}"}} {int(report["peak_rss_mb"] * 1024 * 1024)}']
+        for metric in ('seconds', 'rows', 'bytes', 'chunks'):
+            lines.append(f'# TYPE etl_stage_{metric} gauge')
+            for stage, totals in report['stages'].items():
+                lines.append(f'etl_stage_{metric}{{run="{run}",stage="{stage}"}} {totals[metric]}')
+        _write_atomic(path, '\n'.join(lines) + '\n')
+
+
+def _write_atomic(path, text):
+    # Scrapers must never see a half written file
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as file:
+        file.write(text)
+    os.replace(temp_path, path)
+
+
+@contextmanager
+def instrumented_run(name, metrics_json=None, metrics_prom=None, profile=False, output_dir=None, report=print):
+    """
+    Collect RunMetrics for the enclosed run and report them when it ends.
+
+    :param name: Run name used in reports and file names.
+    :param metrics_json: Write the report to this JSON file.
+    :param metrics_prom: Write the stage totals to this Prometheus textfile.
+    :param profile: Wrap the run in cProfile and tracemalloc and write {name}_{timestamp}.prof,
+        .profile.txt and .memory.txt into output_dir.
+    :param output_dir: Where profile output goes, defaults to the metrics file's directory or ".".
+    :param report: Callable for the end-of-run summary lines (print or logging.info).
+    """
+    metrics = RunMetrics(name)
+    profiler = None
+    if profile:
+        # Profiling modules are only loaded when asked for; pstats alone is a noticeable import
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            output_dir = output_dir or os.path.dirname(os.path.abspath(metrics_json or metrics_prom or name))
+            prefix = os.path.join(output_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+            _write_profile(profiler, prefix)
+            metrics.extra['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+            _write_memory(prefix)
+            tracemalloc.stop()
+            metrics.extra['profile'] = prefix + '.prof'
+            report(f"Profile written to {prefix}.prof, {prefix}.profile.txt and {prefix}.memory.txt")
+        metrics.finish()
+        for line in metrics.summary_lines():
+            report(line)
+        if metrics_json:
+            metrics.write_json(metrics_json)
+        if metrics_prom:
+            metrics.write_prometheus(metrics_prom)
+
+
+def _write_profile(profiler, prefix, limit=40):
+    import io
+    import pstats
+
+    profiler.dump_stats(prefix + '.prof')
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(limit)
+    with open(prefix + '.profile.txt', 'w') as file:
+        file.write(text.getvalue())
+
+
+def _write_memory(prefix, limit=25):
+    import tracemalloc
+
+    # Only allocations made by this process are traced, not those of pool workers
+    current, peak = tracemalloc.get_traced_memory()
+    with open(prefix + '.memory.txt', 'w') as file:
+        file.write(f"current {current / 1024 / 1024:.1f} MB, peak {peak / 1024 / 1024:.1f} MB\n")
+        for stat in tracemalloc.take_snapshot().statistics('lineno')[:limit]:
+            file.write(f"{stat}\n")
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument('--metrics-json', help='Write per-stage run metrics to this JSON file')
+    parser.add_argument('--metrics-prom', help='Write per-stage run metrics to this Prometheus textfile')
+    parser.add_argument('--profile', action='store_true',
+                        help='Run under cProfile and tracemalloc and write the profiles next to the metrics')
+
+
+def metrics_options(args):
+    return {'metrics_json': args.metrics_json, 'metrics_prom': args.metrics_prom, 'profile': args.profile}
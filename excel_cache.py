@@ -0,0 +1,226 @@
+# excel_cache.py
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+DEFAULT_CACHE_DIR = '.excel_cache'
+DEFAULT_CHUNK_SIZE = 50000
+
+
+def iter_xlsx(path, sheet_name=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a worksheet as DataFrame chunks with openpyxl's read-only mode.
+
+    The first row is the header. Cells are read as their cached values, so formulas come
+    back as their last computed result.
+
+    :param sheet_name: Worksheet to read, defaults to the first one.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else f"column_{position}" for position, name in enumerate(header)]
+        batch = []
+        for row in rows:
+            if not any(value is not None for value in row):
+                continue  # Trailing formatted but empty rows
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield _frame(batch, columns)
+                batch = []
+        if batch:
+            yield _frame(batch, columns)
+    finally:
+        workbook.close()
+
+
+def _frame(rows, columns):
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    for name in frame.columns:
+        column = frame[name]
+        if column.dtype == object:
+            kinds = set(column.dropna().map(type))
+            if len(kinds) > 1 and not kinds <= {int, float}:
+                # Mixed cells such as numbers and text: keep the column as text throughout
+                frame[name] = column.map(lambda value: None if value is None else str(value))
+    return frame
+
+
+class _SchemaMismatch(Exception):
+    def __init__(self, column, override):
+        super().__init__(column)
+        self.column = column
+        self.override = override
+
+
+def _conform(table, schema):
+    """Cast a chunk's Arrow table to the schema fixed by the first chunk."""
+    import pyarrow as pa
+
+    columns = []
+    for field in schema:
+        column = table.column(field.name)
+        if column.type != field.type:
+            try:
+                column = column.cast(field.type)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+                numeric = pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+                # A column that was empty in the first chunk widens to float if numbers arrive later
+                was_numeric = (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)
+                               or pa.types.is_null(field.type))
+                raise _SchemaMismatch(field.name, 'float' if numeric and was_numeric else 'string')
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def _to_table(frame, overrides):
+    """Arrow table of a chunk, with overridden columns converted and typed explicitly."""
+    import pyarrow as pa
+
+    types = {'float': pa.float64(), 'string': pa.string()}
+    for name, kind in overrides.items():
+        if kind == 'float':
+            try:
+                frame[name] = pd.to_numeric(frame[name]).astype(float)
+            except (ValueError, TypeError):
+                raise _SchemaMismatch(name, 'string')  # Text after numbers: widen once more
+        else:
+            frame[name] = frame[name].map(lambda value: None if pd.isna(value) else str(value))
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for name, kind in overrides.items():
+        # An all-empty column would otherwise be inferred as the null type again on every pass
+        position = table.schema.get_field_index(name)
+        table = table.set_column(position, name, table.column(name).cast(types[kind]))
+    return table
+
+
+def xlsx_to_parquet(path, parquet_path, sheet_name=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Convert a worksheet to Parquet, one row group per streamed chunk.
+
+    The first chunk fixes the column types. If a later chunk holds values that do not fit,
+    such as decimals in a column that started as whole numbers, that column is widened to
+    float or text and the sheet is converted again. A column is widened at most once to
+    each type, so a mismatch that widening cannot resolve raises ValueError.
+
+    :return: Number of rows written.
+    """
+    import pyarrow.parquet as pq
+
+    overrides = {}
+    temp_path = f"{parquet_path}.tmp"
+    while True:
+        writer = None
+        rows = 0
+        try:
+            for frame in iter_xlsx(path, sheet_name, chunk_size):
+                table = _to_table(frame, overrides)
+                if writer is None:
+                    writer = pq.ParquetWriter(temp_path, table.schema)
+                table = _conform(table, writer.schema)
+                writer.write_table(table)
+                rows += table.num_rows
+        except _SchemaMismatch as mismatch:
+            if overrides.get(mismatch.column) == mismatch.override:
+                raise ValueError(f"{path}: column {mismatch.column} does not fit {mismatch.override} either")
+            logging.info(f"{path}: column {mismatch.column} changes type, converting it as {mismatch.override}")
+            overrides[mismatch.column] = mismatch.override
+            continue
+        finally:
+            if writer is not None:
+                writer.close()
+        break
+    if writer is None:
+        pd.DataFrame().to_parquet(temp_path)
+    os.replace(temp_path, parquet_path)
+    return rows
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ExcelCache:
+    """
+    Parquet copies of xlsx worksheets, converted once and reused while the workbook is unchanged.
+
+    An entry is valid while the workbook's size and mtime match; if only the mtime moved
+    (a copy or a touch), the content hash is compared before converting again. Each
+    workbook and sheet keeps one entry, replaced when the workbook changes.
+
+    :param directory: Cache directory.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry(self, path, sheet_name):
+        name = hashlib.sha256(f"{os.path.abspath(path)}|{sheet_name or ''}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}.parquet"), os.path.join(self.directory, f"{name}.json")
+
+    def parquet_path(self, path, sheet_name=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Return the Parquet copy of a worksheet, converting it first if it is missing or stale."""
+        parquet_path, meta_path = self._entry(path, sheet_name)
+        info = os.stat(path)
+        meta = None
+        if os.path.exists(parquet_path) and os.path.exists(meta_path):
+            with open(meta_path, 'r') as file:
+                meta = json.load(file)
+            if (meta['size'], meta['mtime_ns']) == (info.st_size, info.st_mtime_ns):
+                return parquet_path
+        sha256 = _file_hash(path)
+        if meta is None or meta['sha256'] != sha256:
+            start = time.perf_counter()
+            rows = xlsx_to_parquet(path, parquet_path, sheet_name, chunk_size)
+            logging.info(f"Converted {path} to {parquet_path}: {rows} rows in {time.perf_counter() - start:.2f}s")
+        with open(meta_path, 'w') as file:
+            json.dump({'path': os.path.abspath(path), 'sheet': sheet_name, 'size': info.st_size,
+                       'mtime_ns': info.st_mtime_ns, 'sha256': sha256}, file)
+        return parquet_path
+
+    def iter_chunks(self, path, sheet_name=None, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Yield DataFrame chunks of a worksheet from its Parquet copy."""
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(self.parquet_path(path, sheet_name, chunk_size))
+        for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+
+    def read(self, path, sheet_name=None, columns=None):
+        """Whole worksheet as one DataFrame, like pd.read_excel but served from the cache."""
+        return pd.read_parquet(self.parquet_path(path, sheet_name), columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert xlsx workbooks to cached Parquet copies.')
+    parser.add_argument('workbooks', nargs='+', help='xlsx files to convert')
+    parser.add_argument('--sheet', default=None, help='Worksheet name, defaults to the first sheet')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='Cache directory')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per streamed chunk')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    cache = ExcelCache(args.cache_dir)
+    for workbook in args.workbooks:
+        logging.info(f"{workbook}: {cache.parquet_path(workbook, args.sheet, args.chunk_size)}")
+
+
+if __name__ == "__main__":
+    main()
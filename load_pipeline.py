@@ -0,0 +1,149 @@
+# load_pipeline.py
+
+import logging
+import queue
+import threading
+import time
+from functools import partial
+from multiprocessing import Pool, cpu_count
+
+_STOP = object()
+
+
+def _timed_call(func, item):
+    start = time.perf_counter()
+    result = func(item)
+    return result, time.perf_counter() - start
+
+
+def _rows(item):
+    # Work items that are not DataFrames (e.g. byte range descriptors) have no row count yet
+    return len(item) if hasattr(item, 'columns') else 0
+
+
+def _new_stats(workers, writers, queue_size):
+    stage = {'chunks': 0, 'rows': 0, 'seconds': 0.0}
+    return {
+        'workers': workers,
+        'writers': writers,
+        'queue_size': queue_size,
+        'read': dict(stage),
+        'transform': dict(stage),
+        'load': dict(stage),
+        'queue': {'max_depth': 0, 'depth_samples': 0, 'depth_total': 0, 'put_wait_seconds': 0.0},
+    }
+
+
+def _add(stats, lock, stage, rows, seconds):
+    with lock:
+        stats[stage]['chunks'] += 1
+        stats[stage]['rows'] += rows
+        stats[stage]['seconds'] += seconds
+
+
+def run_pipeline(chunks, transform, load, workers=None, writers=2, queue_size=4):
+    """
+    Run reader -> transform pool -> bounded queue -> writer threads.
+
+    At most workers + queue_size + writers chunks are alive at once: the reader blocks until
+    a writer has finished a chunk, so a slow database throttles parsing instead of letting
+    transformed chunks pile up in memory.
+
+    :param chunks: Iterable of input chunks (e.g. a pd.read_csv chunk reader) or work items
+        such as byte ranges that the transform parses itself.
+    :param transform: Picklable function run on each chunk in the process pool.
+    :param load: Function called with each transformed chunk from one of the writer threads.
+    :param workers: Transform processes, defaults to the CPU count.
+    :param writers: Number of concurrent writer threads.
+    :param queue_size: Transformed chunks allowed to wait for a writer.
+    :return: Per-stage stats dict with chunks, rows, busy seconds and queue depth.
+    """
+    workers = workers or cpu_count()
+    stats = _new_stats(workers, writers, queue_size)
+    lock = threading.Lock()
+    in_flight = threading.BoundedSemaphore(workers + queue_size + writers)
+    results = queue.Queue(maxsize=queue_size)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        iterator = iter(chunks)
+        while True:
+            while not in_flight.acquire(timeout=0.1):
+                if stop.is_set():
+                    return
+            start = time.perf_counter()
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                in_flight.release()
+                return
+            _add(stats, lock, 'read', _rows(chunk), time.perf_counter() - start)
+            yield chunk
+
+    def writer():
+        while True:
+            item = results.get()
+            if item is _STOP:
+                return
+            try:
+                # After a failure keep draining so the reader is never left blocked
+                if not errors:
+                    start = time.perf_counter()
+                    load(item)
+                    _add(stats, lock, 'load', len(item), time.perf_counter() - start)
+            except Exception as e:
+                logging.error(f"Writer failed to load chunk: {e}")
+                errors.append(e)
+            finally:
+                in_flight.release()
+
+    threads = [threading.Thread(target=writer, name=f"writer-{i}", daemon=True) for i in range(writers)]
+
+    start = time.perf_counter()
+    try:
+        # Fork the workers before any writer thread exists: a child forked while a writer holds
+        # a lock (the connection pool's, a handler's) would inherit it held and deadlock on it
+        with Pool(workers) as pool:
+            for thread in threads:
+                thread.start()
+            try:
+                for result, seconds in pool.imap(partial(_timed_call, transform), reader()):
+                    _add(stats, lock, 'transform', len(result), seconds)
+                    put_start = time.perf_counter()
+                    results.put(result)
+                    with lock:
+                        depth = results.qsize()
+                        stats['queue']['put_wait_seconds'] += time.perf_counter() - put_start
+                        stats['queue']['max_depth'] = max(stats['queue']['max_depth'], depth)
+                        stats['queue']['depth_samples'] += 1
+                        stats['queue']['depth_total'] += depth
+                    if errors:
+                        break
+            finally:
+                # Unblocks the reader so the pool's task feeder can exit on early termination
+                stop.set()
+    finally:
+        started = [thread for thread in threads if thread.ident is not None]
+        for _ in started:
+            results.put(_STOP)
+        for thread in started:
+            thread.join()
+
+    stats['wall_seconds'] = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return stats
+
+
+def log_stats(stats):
+    wall = max(stats['wall_seconds'], 1e-9)
+    for stage in ('read', 'transform', 'load'):
+        info = stats[stage]
+        busy = max(info['seconds'], 1e-9)
+        logging.info(f"Stage {stage}: {info['chunks']} chunks, {info['rows']} rows, busy {info['seconds']:.3f}s "
+                     f"({info['rows'] / busy:,.0f} rows/sec busy, {info['rows'] / wall:,.0f} rows/sec wall)")
+    depth = stats['queue']
+    average = depth['depth_total'] / depth['depth_samples'] if depth['depth_samples'] else 0
+    logging.info(f"Queue: max depth {depth['max_depth']}/{stats['queue_size']}, average depth {average:.1f}, "
+                 f"backpressure wait {depth['put_wait_seconds']:.3f}s, wall {stats['wall_seconds']:.3f}s")
@@ -0,0 +1,250 @@
+# lookup_index.py
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from excel_cache import ExcelCache
+from output_writers import open_writer
+
+DEFAULT_INDEX_DIR = '.lookup_index'
+DEFAULT_CHUNK_SIZE = 100000
+# Bumped whenever keys are stored differently, so indexes built by older code are rebuilt
+INDEX_VERSION = 2
+
+
+def read_table(path, columns=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield DataFrame chunks of a csv, txt or xlsx file.
+
+    Workbooks are read from their excel_cache Parquet copy, converted on first use.
+
+    :param columns: Only parse these columns.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xlsx':
+        yield from ExcelCache().iter_chunks(path, columns=columns, chunk_size=chunk_size)
+    elif extension in ('.csv', '.txt'):
+        yield from pd.read_csv(path, sep='\t' if extension == '.txt' else ',', usecols=columns,
+                               chunksize=chunk_size)
+    else:
+        raise ValueError(f"Unsupported file type: {extension}")
+
+
+def _key_text(keys):
+    """
+    Keys as the text both build and lookup hash: whole-valued floats drop their ".0", so an
+    id read as 1.0 on one side still matches 1 or "1" on the other.
+    """
+    def text(value):
+        if isinstance(value, (float, np.floating)) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    return keys.astype(object).map(text)
+
+
+def _hash_keys(keys):
+    return pd.util.hash_array(np.asarray(keys, dtype=object)).astype(np.uint64)
+
+
+class KeyIndex:
+    """
+    Persistent key -> value lookup over a reference file, memory-mapped from an Arrow IPC file.
+
+    Integer keys are stored sorted and looked up with np.searchsorted; any other key type is
+    stored by its 64-bit hash, sorted, and matches are checked against the stored key. A key
+    that appears more than once keeps its last value, as a dict built over the rows would.
+    Opening maps the file instead of reading it, so an index over tens of millions of ids
+    costs no load time and its pages are shared between processes.
+
+    :param path: The .arrow index file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        self.hashed = 'hash' in self.table.column_names
+        # Zero-copy views of the mapped columns
+        self.search = self.table.column('hash' if self.hashed else 'key').combine_chunks().to_numpy()
+        self.keys = self.table.column('key').combine_chunks()
+        self.values = self.table.column('value').combine_chunks()
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @classmethod
+    def build(cls, reference_path, key_column, value_column, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Build an index file from a reference file.
+
+        :param reference_path: csv, txt or xlsx file holding the reference rows.
+        :param key_column: Column with the join key.
+        :param value_column: Column looked up by key.
+        :param path: Index file to write; written to a temporary name first and then replaced.
+        """
+        chunks = list(read_table(reference_path, [key_column, value_column], chunk_size))
+        frame = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame(columns=[key_column, value_column])
+        frame = frame[frame[key_column].notna()]
+        keys = frame[key_column]
+        if pd.api.types.is_float_dtype(keys.dtype) and (keys % 1 == 0).all():
+            keys = keys.astype(np.int64)  # Whole ids read as float64 because the column has gaps
+        hashed = not pd.api.types.is_integer_dtype(keys.dtype)
+        if hashed:
+            keys = _key_text(keys)
+        search = _hash_keys(keys) if hashed else keys.to_numpy(dtype=np.int64)
+        # Stable sort, then keep the last row of each run of equal keys
+        order = np.argsort(search, kind='stable')
+        search = search[order]
+        last = np.append(search[1:] != search[:-1], True)
+        order, search = order[last], search[last]
+        columns = {'key': pa.array(keys.to_numpy()[order]),
+                   'value': pa.array(frame[value_column].to_numpy()[order], from_pandas=True)}
+        if hashed:
+            columns = {'hash': pa.array(search), **columns}
+        table = pa.table(columns)
+        temp_path = f"{path}.tmp"
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+        return cls(path)
+
+    @classmethod
+    def open_or_build(cls, reference_path, key_column, value_column, index_dir=DEFAULT_INDEX_DIR,
+                      chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Open the index of a reference file, rebuilding it when the file changed since the last build.
+
+        The index is named after the reference path and the two columns; its .json sidecar
+        records the reference size and mtime it was built from.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        name = hashlib.sha256(f"{os.path.abspath(reference_path)}|{key_column}|{value_column}".encode()).hexdigest()[:16]
+        path = os.path.join(index_dir, f"{name}.arrow")
+        meta_path = os.path.join(index_dir, f"{name}.json")
+        info = os.stat(reference_path)
+        source = {'path': os.path.abspath(reference_path), 'size': info.st_size, 'mtime_ns': info.st_mtime_ns,
+                  'key': key_column, 'value': value_column, 'version': INDEX_VERSION}
+        if os.path.exists(path) and os.path.exists(meta_path):
+            with open(meta_path, 'r') as file:
+                if json.load(file) == source:
+                    logging.info(f"Using lookup index {path} for {reference_path}")
+                    return cls(path)
+        start = time.perf_counter()
+        index = cls.build(reference_path, key_column, value_column, path, chunk_size)
+        with open(meta_path, 'w') as file:
+            json.dump(source, file)
+        logging.info(f"Built lookup index {path} for {reference_path}: {len(index)} keys in "
+                     f"{time.perf_counter() - start:.2f}s")
+        return index
+
+    def positions(self, keys):
+        """
+        Index positions of keys, with -1 where a key is not in the index.
+
+        :param keys: Series of lookup keys.
+        """
+        if len(self) == 0:
+            return np.full(len(keys), -1, dtype=np.int64)
+        present = keys.notna().to_numpy()
+        if self.hashed:
+            text = _key_text(keys)
+            search = _hash_keys(text)
+        else:
+            numbers = pd.to_numeric(keys, errors='coerce')
+            # Keys that are not whole numbers can never match an integer index
+            present = present & numbers.notna().to_numpy() & (numbers % 1 == 0).fillna(False).to_numpy()
+            search = numbers.fillna(0).to_numpy(dtype=np.int64)
+        found = np.searchsorted(self.search, search)
+        found = np.minimum(found, len(self) - 1)
+        matched = present & (self.search[found] == search)
+        if self.hashed and matched.any():
+            stored = self.keys.take(pa.array(found[matched])).to_numpy(zero_copy_only=False)
+            matched[matched] = stored == text.to_numpy()[matched]
+        return np.where(matched, found, -1)
+
+    def values_at(self, positions):
+        """Values at index positions, e.g. the matched entries of positions()."""
+        return self.values.take(pa.array(positions)).to_numpy(zero_copy_only=False)
+
+
+def enrich(frame, index, key_column, target_column, default=None):
+    """
+    Set target_column from the index for every row whose key matches.
+
+    :param default: Value for rows without a match, e.g. "NO MATCH"; None keeps the
+        row's current target_column value (or leaves it empty if the column is new).
+    :return: Tuple of (enriched frame, matched row count).
+    """
+    found = index.positions(frame[key_column])
+    matched = found >= 0
+    frame = frame.copy()
+    if target_column in frame.columns and default is None:
+        values = frame[target_column].astype(object)
+    else:
+        values = pd.Series(default, index=frame.index, dtype=object)
+    if matched.any():
+        values[matched] = index.values_at(found[matched])
+    frame[target_column] = values
+    return frame, int(matched.sum())
+
+
+def enrich_file(target_path, output_path, index, key_column, target_column, default=None,
+                chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream a target file through enrich and write the result chunk by chunk.
+
+    :return: Tuple of (rows, matched rows).
+    """
+    rows = matched = 0
+    output_format = os.path.splitext(output_path)[1].lower().lstrip('.')
+    temp_path = f"{output_path}.tmp"
+    # Written aside and then moved, so a target can be enriched in place
+    with open_writer(temp_path, output_format, delimiter='\t' if output_format == 'txt' else ',') as writer:
+        for chunk in read_table(target_path, chunk_size=chunk_size):
+            chunk, hits = enrich(chunk, index, key_column, target_column, default)
+            writer.write(chunk)
+            rows, matched = rows + len(chunk), matched + hits
+    os.replace(temp_path, output_path)
+    return rows, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Enrich target files with values looked up by id in a reference file.')
+    parser.add_argument('reference', help='Reference file (csv, txt or xlsx)')
+    parser.add_argument('targets', nargs='+', help='Target files to enrich')
+    parser.add_argument('--reference-key', required=True, help='Key column of the reference file')
+    parser.add_argument('--reference-value', required=True, help='Value column of the reference file')
+    parser.add_argument('--target-key', required=True, help='Key column of the target files')
+    parser.add_argument('--target-column', required=True, help='Column of the target files to set')
+    parser.add_argument('--default', default=None,
+                        help='Value for rows without a match (e.g. "NO MATCH"); by default they keep their value')
+    parser.add_argument('--in-place', action='store_true', help='Overwrite the targets instead of writing *_enriched files')
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR, help='Directory of the persistent lookup indexes')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per chunk of delimited files')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    index = KeyIndex.open_or_build(args.reference, args.reference_key, args.reference_value, args.index_dir,
+                                   args.chunk_size)
+    for target in args.targets:
+        stem, extension = os.path.splitext(target)
+        output_path = target if args.in_place else f"{stem}_enriched{extension}"
+        start = time.perf_counter()
+        rows, matched = enrich_file(target, output_path, index, args.target_key, args.target_column, args.default,
+                                    args.chunk_size)
+        logging.info(f"Enriched {target} -> {output_path}: {matched}/{rows} rows matched in "
+                     f"{time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+# output_writers.py
+
+import csv
+import os
+import time
+
+
+class ChunkWriter:
+    """
+    Base class for writers that append DataFrame chunks to one output file.
+
+    Writers are context managers; write() may be called any number of times and close()
+    finalizes the file. rows, chunks and seconds (time spent serializing) are kept per writer.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def write(self, data_frame):
+        start = time.perf_counter()
+        self._write(data_frame)
+        self.seconds += time.perf_counter() - start
+        self.rows += len(data_frame)
+        self.chunks += 1
+
+    def _write(self, data_frame):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class DelimitedWriter(ChunkWriter):
+    """
+    Write delimited text with a header row from the first chunk.
+
+    When no chunk is written at all, close() still writes the header from columns if given,
+    so an empty result is an empty table rather than a zero-byte file.
+    """
+
+    def __init__(self, path, delimiter=',', columns=None, **options):
+        super().__init__(path)
+        self.delimiter = delimiter or ','
+        self.columns = columns
+        self.file = open(path, 'w', newline='')
+        self.header = True
+
+    def _write(self, data_frame):
+        data_frame.to_csv(self.file, index=False, sep=self.delimiter, header=self.header)
+        self.header = False
+
+    def close(self):
+        if self.header and self.columns:
+            csv.writer(self.file, delimiter=self.delimiter, lineterminator=os.linesep).writerow(self.columns)
+        self.file.close()
+
+
+class JsonLinesWriter(ChunkWriter):
+    def __init__(self, path, **options):
+        super().__init__(path)
+        self.file = open(path, 'w')
+
+    def _write(self, data_frame):
+        if len(data_frame):
+            self.file.write(data_frame.to_json(orient='records', lines=True, date_format='iso').rstrip('\n'))
+            self.file.write('\n')
+
+    def close(self):
+        self.file.close()
+
+
+class JsonArrayWriter(ChunkWriter):
+    """Write one JSON array of records, streamed chunk by chunk."""
+
+    def __init__(self, path, **options):
+        super().__init__(path)
+        self.file = open(path, 'w')
+        self.file.write('[')
+        self.first = True
+
+    def _write(self, data_frame):
+        if not len(data_frame):
+            return
+        records = data_frame.to_json(orient='records', lines=True, date_format='iso').rstrip('\n')
+        if not self.first:
+            self.file.write(',')
+        self.file.write('\n' + records.replace('\n', ',\n'))
+        self.first = False
+
+    def close(self):
+        self.file.write('\n]\n')
+        self.file.close()
+
+
+def _widen_type(current, incoming):
+    """The narrowest Arrow type holding values of both types: null takes the other, int widens to float, else string."""
+    import pyarrow as pa
+
+    if current == incoming or pa.types.is_null(incoming):
+        return current
+    if pa.types.is_null(current):
+        return incoming
+    if pa.types.is_integer(current) and pa.types.is_integer(incoming):
+        return pa.int64()
+    if (pa.types.is_integer(current) or pa.types.is_floating(current)) and \
+            (pa.types.is_integer(incoming) or pa.types.is_floating(incoming)):
+        return pa.float64()
+    return pa.string()
+
+
+def _conform(table, schema):
+    """
+    Fit a chunk's table to the file's schema, widening the schema where the chunk does not fit.
+
+    :return: Tuple of (table cast to the resulting schema, that schema); the schema is the
+        same object that was passed in when no column had to change.
+    """
+    import pyarrow as pa
+
+    if table.schema.names != schema.names:
+        raise ValueError(f"Chunk columns {table.schema.names} do not match the file's columns {schema.names}")
+    if table.schema.equals(schema, check_metadata=False):
+        return table, schema
+    types = [_widen_type(field.type, table.schema.field(index).type) for index, field in enumerate(schema)]
+    if types != schema.types:
+        # The pandas metadata describes the first chunk's dtypes, which no longer hold
+        schema = pa.schema([field.with_type(data_type) for field, data_type in zip(schema, types)])
+    return table.cast(schema), schema
+
+
+class ParquetWriter(ChunkWriter):
+    """
+    Write each chunk as a Parquet row group; the first chunk sets the schema.
+
+    Nothing is written until the first chunk arrives, since the schema comes from it. When a
+    later chunk does not fit (a column null so far gets values, an int column gets decimals
+    or NaN), the schema is widened and the row groups written so far are rewritten with it.
+    """
+
+    def __init__(self, path, compression='snappy', use_dictionary=True, **options):
+        super().__init__(path)
+        self.compression = compression or 'snappy'
+        self.use_dictionary = use_dictionary
+        self.schema = None
+        self.writer = None
+
+    def _write(self, data_frame):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(data_frame, preserve_index=False)
+        if self.writer is None:
+            self._open(table.schema)
+        else:
+            table, schema = _conform(table, self.schema)
+            if schema is not self.schema:
+                self._rewrite(schema)
+        self.writer.write_table(table)
+
+    def _open(self, schema):
+        import pyarrow.parquet as pq
+
+        self.schema = schema
+        self.writer = pq.ParquetWriter(self.path, schema, compression=self.compression,
+                                       use_dictionary=self.use_dictionary)
+
+    def _rewrite(self, schema):
+        import pyarrow.parquet as pq
+
+        self.writer.close()
+        source = pq.ParquetFile(self.path)
+        groups = [source.read_row_group(index) for index in range(source.num_row_groups)]
+        source.close()
+        self._open(schema)
+        for group in groups:
+            self.writer.write_table(group.cast(schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ArrowWriter(ChunkWriter):
+    """
+    Write an Arrow IPC file, one record batch per chunk; compression may be lz4 or zstd.
+
+    Schema drift between chunks is handled as in ParquetWriter.
+    """
+
+    def __init__(self, path, compression=None, **options):
+        super().__init__(path)
+        self.compression = compression
+        self.schema = None
+        self.sink = None
+        self.writer = None
+
+    def _write(self, data_frame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(data_frame, preserve_index=False)
+        if self.writer is None:
+            self._open(table.schema)
+        else:
+            table, schema = _conform(table, self.schema)
+            if schema is not self.schema:
+                self._rewrite(schema)
+        self.writer.write_table(table)
+
+    def _open(self, schema):
+        import pyarrow as pa
+
+        self.schema = schema
+        self.sink = pa.OSFile(self.path, 'wb')
+        self.writer = pa.ipc.new_file(self.sink, schema,
+                                      options=pa.ipc.IpcWriteOptions(compression=self.compression))
+
+    def _rewrite(self, schema):
+        import pyarrow as pa
+
+        self.writer.close()
+        self.sink.close()
+        with pa.OSFile(self.path, 'rb') as source:
+            reader = pa.ipc.open_file(source)
+            batches = [reader.get_batch(index) for index in range(reader.num_record_batches)]
+        self._open(schema)
+        for batch in batches:
+            self.writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.sink.close()
+
+
+class XlsxWriter(ChunkWriter):
+    """
+    Write an xlsx workbook with openpyxl's write-only mode, appending rows chunk by chunk.
+
+    Rows are streamed to the sheet's XML as they are appended, so memory does not grow with
+    the number of rows as it does with DataFrame.to_excel.
+    """
+
+    def __init__(self, path, sheet_name='Sheet1', **options):
+        from openpyxl import Workbook
+
+        super().__init__(path)
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(sheet_name)
+        self.header = True
+
+    def _write(self, data_frame):
+        if self.header:
+            self.sheet.append([str(name) for name in data_frame.columns])
+            self.header = False
+        values = data_frame.astype(object).where(data_frame.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+WRITERS = {
+    'csv': DelimitedWriter,
+    'txt': DelimitedWriter,
+    'json': JsonArrayWriter,
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+    'arrow': ArrowWriter,
+    'xlsx': XlsxWriter,
+}
+
+
+def open_writer(path, output_format, delimiter=None, compression=None, use_dictionary=True, columns=None):
+    """
+    Open a chunk writer for the given output format.
+
+    :param path: Output file path.
+    :param output_format: One of WRITERS (csv, txt, json, jsonl, parquet, arrow, xlsx).
+    :param delimiter: Field separator for csv/txt.
+    :param compression: Codec for parquet (snappy, zstd, gzip, ...) or arrow (lz4, zstd).
+    :param use_dictionary: Dictionary-encode parquet columns.
+    :param columns: Column names for the csv/txt header when no chunk is written.
+    :return: A ChunkWriter.
+    """
+    try:
+        writer_class = WRITERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    return writer_class(path, delimiter=delimiter, compression=compression, use_dictionary=use_dictionary,
+                        columns=columns)
+
+
+def write_chunks(chunks, path, output_format, metrics=None, **options):
+    """
+    Write an iterable of DataFrame chunks to one file and return the number of rows written.
+
+    :param metrics: Optional etl_metrics.RunMetrics that records the serialize stage.
+    """
+    with open_writer(path, output_format, **options) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    if metrics is not None:
+        metrics.add_writer(writer, path)
+    return writer.rows
@@ -1,118 +1,275 @@
-# process_file.py
-
-import source_config
-import creds_config
-import logging
-from datetime import datetime
-import argparse
-import pandas as pd
-from multiprocessing import Pool, cpu_count
-import psycopg2
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
-
-# Database connection function
-def get_db_connection():
-    return psycopg2.connect(
-        dbname=creds_config.DATABASE['dbname'],
-        user=creds_config.DATABASE['user'],
-        password=creds_config.DATABASE['password'],
-        host=creds_config.DATABASE['host'],
-        port=creds_config.DATABASE['port']
-    )
-
-
-def create_table():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    create_table_query = """
-    CREATE TABLE IF NOT EXISTS processed_data (
-        id SERIAL PRIMARY KEY,
-        name VARCHAR(255),
-        date DATE,
-        amount FLOAT
-    );
-    """
-    cursor.execute(create_table_query)
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-
-def process_chunk(chunk):
-    processed_rows = []
-    for index, row in chunk.iterrows():
-        # print("Index,row",index,row)
-        if 'date' in row:
-            row['date'] = datetime.strptime(row['date'], '%Y-%m-%d').strftime('%Y-%m-%d')  # Change format for database compatibility
-        if 'amount' in row:
-            row['amount'] = row['amount'] * 1.1  # Add 10% to the amount
-        processed_rows.append(row.to_dict())
-    return processed_rows
-
-
-def insert_data(rows):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    insert_query = """
-    INSERT INTO processed_data (name, date, amount)
-    VALUES (%s, %s, %s)
-    ON CONFLICT (id) DO UPDATE SET
-    name = EXCLUDED.name,
-    date = EXCLUDED.date,
-    amount = EXCLUDED.amount;
-    """
-    for row in rows:
-        cursor.execute(insert_query, (row.get('name'), row.get('date'), row.get('amount')))
-    conn.commit()
-    cursor.close()
-    conn.close()
-
-
-def process_csv_in_chunks(path, delimiter, chunk_size=1000):
-    try:
-        columns = ['id', 'name', 'date', 'amount']
-        chunks = pd.read_csv(path, delimiter=delimiter, chunksize=chunk_size, names=columns, header=0)
-        with Pool(cpu_count()) as pool:
-            for result in pool.imap(process_chunk, chunks):
-                insert_data(result)
-                for row in result:
-                    logging.info(f"Processed and inserted row: {row}")
-    except FileNotFoundError:
-        logging.error(f"File not found: {path}")
-    except Exception as e:
-        logging.error(f"An error occurred while processing CSV: {e}")
-
-# Process TXT files (no changes needed)
-def process_txt(path):
-    try:
-        with open(path, mode='r') as file:
-            for line in file:
-                logging.info(line.strip())
-    except FileNotFoundError:
-        logging.error(f"File not found: {path}")
-    except Exception as e:
-        logging.error(f"An error occurred while processing TXT: {e}")
-
-
-def main(file_type):
-    if file_type in source_config.FILES:
-        config = source_config.FILES[file_type]
-        path = config["path"]
-        if file_type == "csv":
-            delimiter = config["delimiter"]
-            create_table()  # Ensure the table exists before processing
-            process_csv_in_chunks(path, delimiter)
-        elif file_type == "txt":
-            process_txt(path)
-    else:
-        logging.error(f"Unsupported file type: {file_type}")
-
-
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Process CSV or TXT files.')
-    parser.add_argument('--type', required=True, choices=['csv', 'txt'], help='Type of the source file to process')
-    args = parser.parse_args()
-
-    main(args.type)
+# process_file.py
+
+import source_config
+import db_pool
+import logging
+import argparse
+import os
+import time
+from functools import partial
+from multiprocessing import cpu_count
+from bulk_loader import copy_upsert
+from load_pipeline import run_pipeline, log_stats
+from checkpoint_store import CheckpointStore, RangeCommitter
+from etl_logging import RowSampler, add_logging_arguments, setup_logging
+from etl_metrics import add_metrics_arguments, instrumented_run, metrics_options
+
+# pandas-backed modules (chunk_transform, byte_ranges, dtype_optimizer) are imported inside the
+# CSV functions and the NumPy-backed text_engine inside process_txt, so --help starts without them
+
+COLUMNS = ['id', 'name', 'date', 'amount']
+
+
+def create_table():
+    create_table_query = """
+    CREATE TABLE IF NOT EXISTS processed_data (
+        id SERIAL PRIMARY KEY,
+        name VARCHAR(255),
+        date DATE,
+        amount FLOAT
+    );
+    """
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(create_table_query)
+        conn.commit()
+        cursor.close()
+
+
+def process_chunk(chunk, schema=None, checks=None):
+    from chunk_transform import apply_rules
+    from chunk_validation import validate_chunk
+    from dtype_optimizer import apply_schema, memory_bytes
+
+    timings = dict(chunk.attrs.get('timings', {}))
+    rejected = None
+    if checks is not None:
+        # Bad rows are set aside with reason codes instead of failing the chunk in apply_rules
+        start = time.perf_counter()
+        checked = len(chunk)
+        chunk, rejected = validate_chunk(chunk, checks)
+        timings['validate'] = time.perf_counter() - start
+    # Date normalization and amount uplift run as whole-column operations
+    start = time.perf_counter()
+    result = apply_rules(chunk, source_config.TRANSFORM_RULES)
+    if schema is not None:
+        # Compact dtypes before the chunk is pickled back and queued for a writer
+        before = memory_bytes(result)
+        result, _ = apply_schema(result, schema)
+        result.attrs['memory'] = (before, memory_bytes(result))
+    # Worker-side stage timings travel with the chunk to the writer, which records them
+    result.attrs['timings'] = {**timings, 'transform': time.perf_counter() - start}
+    if rejected is not None:
+        result.attrs['quarantine'] = (rejected, checked)
+    return result
+
+
+def process_range(task, schema=None, checks=None):
+    from byte_ranges import read_range
+
+    # Each worker parses its own slice of the file, so only transformed rows cross processes
+    path, start, end, delimiter = task
+    parse_start = time.perf_counter()
+    chunk = read_range(path, start, end, delimiter, COLUMNS)
+    chunk.attrs['timings'] = {'parse': time.perf_counter() - parse_start}
+    result = process_chunk(chunk, schema, checks)
+    result.attrs['range'] = (start, end)  # Lets the writer report which bytes are committed
+    return result
+
+
+def insert_data(rows):
+    insert_query = """
+    INSERT INTO processed_data (id, name, date, amount)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    date = EXCLUDED.date,
+    amount = EXCLUDED.amount;
+    """
+    with db_pool.connection() as conn:
+        cursor = conn.cursor()
+        for row in rows.itertuples(index=False):
+            cursor.execute(insert_query, (row.id, row.name, row.date, row.amount))
+        conn.commit()
+        cursor.close()
+
+
+def insert_data_copy(rows):
+    with db_pool.connection() as conn:
+        copy_upsert(conn, rows, 'processed_data', ['id', 'name', 'date', 'amount'], key='id')
+        conn.commit()
+
+
+LOADERS = {
+    'insert': insert_data,
+    'copy': insert_data_copy,
+}
+
+
+def _load_and_log(load, load_mode, committer, sampler, metrics, memory, quarantine, path, result):
+    load_start = time.perf_counter()
+    load(result)
+    load_seconds = time.perf_counter() - load_start
+    if quarantine is not None and 'quarantine' in result.attrs:
+        rejected, checked = result.attrs['quarantine']
+        quarantine.add(rejected, path, checked)
+    if committer is not None:
+        committer.mark_done(result.attrs['range'][0], len(result))
+    if metrics is not None:
+        start, end = result.attrs.get('range', (0, 0))
+        metrics.add_timings(result.attrs.get('timings', {}), len(result), path, nbytes=end - start)
+        metrics.add('db_write', load_seconds, len(result), path=path)
+    if memory is not None and 'memory' in result.attrs:
+        memory.add(*result.attrs['memory'])
+    rows_per_sec = len(result) / max(load_seconds, 1e-9)
+    logging.info(f"Loaded {len(result)} rows with '{load_mode}' in {load_seconds:.3f}s ({rows_per_sec:,.0f} rows/sec)",
+                 extra={'fields': {'event': 'chunk_loaded', 'rows': len(result), 'load_mode': load_mode,
+                                   'seconds': round(load_seconds, 6), 'rows_per_sec': round(rows_per_sec, 1)}})
+    for row in sampler.sample(result).to_dict('records'):
+        logging.info(f"Processed and inserted row: {row}", extra={'fields': {'event': 'row_sample', 'row': row}})
+
+
+def process_csv_in_chunks(path, delimiter, chunk_size=1000, load_mode='insert', writers=2, queue_size=4,
+                          reader='chunks', range_size=16 * 1024 * 1024, checkpoints=None, sampler=None,
+                          metrics=None, optimize_dtypes=False, checks=None, quarantine=None):
+    import pandas as pd
+    from byte_ranges import read_header, split_ranges
+    from chunk_validation import infer_validation_schema
+    from dtype_optimizer import MemoryReport, infer_schema
+
+    try:
+        sampler = sampler or RowSampler()
+        committer = None
+        if checkpoints is not None:
+            # Checkpoints are byte offsets, so checkpointed loads always use the range reader
+            reader = 'ranges'
+            action, offset = checkpoints.plan(path, body_start=read_header(path)[1])
+            if action == 'skip':
+                logging.info(f"Skipping {path}: unchanged since its last completed load")
+                return
+            logging.info(f"Checkpoint plan for {path}: {action} from byte {offset}")
+            checkpoints.start(path, offset, reset=action == 'full')
+            ranges = split_ranges(path, range_size, start=offset)
+            committer = RangeCommitter(checkpoints, path, ranges)
+        elif reader == 'ranges':
+            ranges = split_ranges(path, range_size)
+
+        schema = memory = None
+        if quarantine is None:
+            checks = None  # Validation is off
+        elif checks is None:
+            # No declared schema: infer one from the head of the file
+            sample = pd.read_csv(path, delimiter=delimiter, names=COLUMNS, header=0, nrows=max(chunk_size, 10000))
+            checks = infer_validation_schema(sample)
+            logging.info(f"Inferred validation schema for {path}: {checks}")
+        if optimize_dtypes:
+            # One schema for every worker, inferred from transformed sample rows
+            sample = pd.read_csv(path, delimiter=delimiter, names=COLUMNS, header=0, nrows=max(chunk_size, 10000))
+            schema = infer_schema(process_chunk(sample, checks=checks))
+            memory = MemoryReport()
+        load = partial(_load_and_log, LOADERS[load_mode], load_mode, committer, sampler, metrics, memory, quarantine,
+                       path)
+        if reader == 'ranges':
+            # Workers read newline-aligned byte ranges themselves instead of receiving pickled chunks
+            chunks = [(path, start, end, delimiter) for start, end in ranges]
+            transform = partial(process_range, schema=schema, checks=checks)
+        else:
+            chunks = pd.read_csv(path, delimiter=delimiter, chunksize=chunk_size, names=COLUMNS, header=0)
+            transform = partial(process_chunk, schema=schema, checks=checks)
+        stats = run_pipeline(chunks, transform, load, workers=cpu_count(), writers=writers, queue_size=queue_size)
+        log_stats(stats)
+        if memory is not None:
+            for line in memory.lines(schema):
+                logging.info(line)
+        if quarantine is not None:
+            for line in quarantine.summary_lines():
+                logging.info(line)
+        if metrics is not None:
+            if reader == 'chunks':
+                # The chunk reader parses in this process; ranges are parsed by the workers instead
+                metrics.add('read', stats['read']['seconds'], stats['read']['rows'], path=path,
+                            chunks=stats['read']['chunks'])
+            metrics.add_file(path, os.path.getsize(path))
+            metrics.extra.setdefault('pipeline', {})[path] = stats
+        total_rows = stats['load']['rows']
+        elapsed = stats['wall_seconds']
+        logging.info(f"Loaded {total_rows} rows from {path} in {elapsed:.3f}s "
+                     f"({total_rows / max(elapsed, 1e-9):,.0f} rows/sec)")
+        if checkpoints is not None:
+            checkpoints.complete(path)
+    except FileNotFoundError:
+        logging.error(f"File not found: {path}")
+    except Exception as e:
+        logging.error(f"An error occurred while processing CSV: {e}")
+
+# Process TXT files
+def process_txt(path, sampler=None, metrics=None):
+    from text_engine import line_stats
+
+    # Stats mode: lines are counted and sampled over memory-mapped blocks, never read one by one
+    sampler = sampler or RowSampler()
+    try:
+        stats = line_stats(path, sampler=sampler, log_line=logging.info)
+        if metrics is not None:
+            metrics.add('read', stats['seconds'], stats['lines'], stats['bytes'], path)
+            metrics.add_file(path, stats['bytes'])
+        logging.info(f"Read {stats['lines']} lines from {path}",
+                     extra={'fields': {'event': 'file_read', **stats}})
+    except FileNotFoundError:
+        logging.error(f"File not found: {path}")
+    except Exception as e:
+        logging.error(f"An error occurred while processing TXT: {e}")
+
+
+def main(file_type, load_mode='insert', writers=2, queue_size=4, reader='chunks', range_size_mb=16,
+         checkpoint_db=None, sampler=None, metrics=None, optimize_dtypes=False, quarantine_path='quarantine.jsonl'):
+    if file_type in source_config.FILES:
+        config = source_config.FILES[file_type]
+        path = config["path"]
+        if file_type == "csv":
+            from chunk_validation import QuarantineSink
+
+            delimiter = config["delimiter"]
+            quarantine = QuarantineSink(quarantine_path) if quarantine_path else None
+            db_pool.init_pool(writers)  # One pooled connection per writer thread
+            create_table()  # Ensure the table exists before processing
+            checkpoints = CheckpointStore(checkpoint_db) if checkpoint_db else None
+            process_csv_in_chunks(path, delimiter, load_mode=load_mode, writers=writers, queue_size=queue_size,
+                                  reader=reader, range_size=range_size_mb * 1024 * 1024, checkpoints=checkpoints,
+                                  sampler=sampler, metrics=metrics, optimize_dtypes=optimize_dtypes,
+                                  checks=source_config.VALIDATION_SCHEMAS.get(file_type), quarantine=quarantine)
+            logging.info(f"Connection pool metrics: {db_pool.pool_metrics()}")
+        elif file_type == "txt":
+            process_txt(path, sampler, metrics)
+    else:
+        logging.error(f"Unsupported file type: {file_type}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Process CSV or TXT files.')
+    parser.add_argument('--type', required=True, choices=['csv', 'txt'], help='Type of the source file to process')
+    parser.add_argument('--load-mode', choices=sorted(LOADERS), default='insert',
+                        help="How CSV chunks are written: row-by-row 'insert' or bulk 'copy' through a staging table")
+    parser.add_argument('--writers', type=int, default=2, help='Number of concurrent database writer threads')
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help='Transformed chunks allowed to wait for a writer before parsing is throttled')
+    parser.add_argument('--reader', choices=['chunks', 'ranges'], default='chunks',
+                        help="'chunks' parses in this process; 'ranges' lets each worker parse its own byte range")
+    parser.add_argument('--range-size-mb', type=int, default=16, help='Byte range size for --reader ranges')
+    parser.add_argument('--checkpoint-db', nargs='?', const='.etl_checkpoints.sqlite',
+                        help='SQLite file for resumable, incremental loads (implies --reader ranges)')
+    parser.add_argument('--quarantine', default='quarantine.jsonl',
+                        help='JSON lines file receiving rows that fail validation, with their reason codes')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Skip the per-chunk validation pass (a bad value then fails the whole file)')
+    parser.add_argument('--optimize-dtypes', action='store_true',
+                        help='Convert chunks to compact dtypes (categoricals, downcast ints, Arrow strings, datetimes)')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+
+    setup_logging(json_format=args.log_json)
+    with instrumented_run('process_file', report=logging.info, **metrics_options(args)) as metrics:
+        main(args.type, args.load_mode, args.writers, args.queue_size, args.reader, args.range_size_mb,
+             args.checkpoint_db, RowSampler(args.log_sample_every, args.log_rate_limit), metrics,
+             args.optimize_dtypes, None if args.no_validate else args.quarantine)
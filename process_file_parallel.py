@@ -1,88 +1,300 @@
-import json
-import logging
-import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import pandas as pd
-from source_config import FILES
-
-# Configure logging
-logging.basicConfig(filename='file_processor.log', level=logging.INFO,
-                    format='%(asctime)s:%(levelname)s:%(message)s')
-
-
-def load_config(config_path):
-    try:
-        with open(config_path, 'r') as file:
-            config = json.load(file)
-            logging.info("Configuration file loaded successfully.")
-            return config
-    except Exception as e:
-        logging.error(f"Error loading configuration file: {e}")
-        raise
-
-def process_csv(file_path, delimiter, chunk_size=1000):
-    try:
-        chunk_list = []
-        for chunk in pd.read_csv(file_path, delimiter=delimiter, chunksize=chunk_size):
-            chunk_list.append(chunk)
-            logging.info(f"Processed chunk of CSV file {file_path} with shape {chunk.shape}")
-        df = pd.concat(chunk_list, ignore_index=True)
-        logging.info(f"CSV file {file_path} read successfully with delimiter '{delimiter}'. Final shape: {df.shape}")
-        return df
-    except Exception as e:
-        logging.error(f"Error reading CSV file {file_path}: {e}")
-        raise
-
-
-def process_txt(file_path, delimiter, chunk_size=1000):
-    try:
-        chunk_list = []
-        for chunk in pd.read_csv(file_path, delimiter=delimiter, chunksize=chunk_size):
-            chunk_list.append(chunk)
-            logging.info(f"Processed chunk of TXT file {file_path} with shape {chunk.shape}")
-        df = pd.concat(chunk_list, ignore_index=True)
-        logging.info(f"TXT file {file_path} read successfully with delimiter '{delimiter}'. Final shape: {df.shape}")
-        return df
-    except Exception as e:
-        logging.error(f"Error reading TXT file {file_path}: {e}")
-        raise
-
-
-def main():
-    files_config = FILES
-
-    if not files_config:
-        logging.error("No files configuration found in the config file.")
-        return
-
-    tasks = []
-    with ThreadPoolExecutor() as executor:
-        # Process CSV file
-        csv_config = files_config.get('csv')
-        if csv_config:
-            if 'path' in csv_config and 'delimiter' in csv_config:
-                tasks.append(executor.submit(process_csv, csv_config['path'], csv_config['delimiter']))
-            else:
-                logging.error("CSV configuration is missing 'path' or 'delimiter'.")
-
-        # Process TXT file
-        txt_config = files_config.get('txt')
-        if txt_config:
-            path = txt_config.get('path')
-            delimiter = txt_config.get('delimiter', '\t')  # Default to tab delimiter if not specified
-            if path:
-                tasks.append(executor.submit(process_txt, path, delimiter))
-            else:
-                logging.error("TXT configuration is missing 'path'.")
-
-        for future in as_completed(tasks):
-            try:
-                result = future.result()
-                # Log the result if needed (for large data, consider logging just a summary)
-                logging.info(f"Processed file with result: {type(result).__name__}, shape: {result.shape}")
-            except Exception as e:
-                logging.error(f"Error in task: {e}")
-
-
-if __name__ == "__main__":
-    main()
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from source_config import FILES
+from etl_logging import add_logging_arguments, setup_logging
+from etl_metrics import add_metrics_arguments, instrumented_run, metrics_options
+
+
+def load_config(config_path):
+    try:
+        with open(config_path, 'r') as file:
+            config = json.load(file)
+            logging.info("Configuration file loaded successfully.")
+            return config
+    except Exception as e:
+        logging.error(f"Error loading configuration file: {e}")
+        raise
+
+_END = object()
+
+
+def stream_chunks(chunks, sink, max_in_flight=2):
+    """
+    Feed chunks to a sink while a background thread reads ahead.
+
+    The read-ahead queue holds at most max_in_flight chunks, so memory stays bounded by a
+    few chunks no matter how large the file is.
+
+    :param chunks: Iterable of DataFrame chunks.
+    :param sink: Callable invoked with each chunk, in order.
+    :param max_in_flight: Number of chunks the reader may get ahead of the sink.
+    :return: Tuple of (rows, chunks) streamed.
+    """
+    buffer = queue.Queue(maxsize=max_in_flight)
+    stop = threading.Event()
+
+    def put(item):
+        # Give up once the consumer has stopped so the reader never blocks forever
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+            put(_END)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    rows = count = 0
+    try:
+        while True:
+            chunk = buffer.get()
+            if chunk is _END:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            sink(chunk)
+            rows += len(chunk)
+            count += 1
+    finally:
+        stop.set()
+        thread.join()
+    return rows, count
+
+
+def _read_chunks(file_path, delimiter, chunk_size, kind):
+    import pandas as pd
+
+    for chunk in pd.read_csv(file_path, delimiter=delimiter, chunksize=chunk_size):
+        logging.info(f"Processed chunk of {kind} file {file_path} with shape {chunk.shape}")
+        yield chunk
+
+
+def _process_delimited(file_path, delimiter, chunk_size, kind, sink, collect, max_in_flight):
+    import pandas as pd
+
+    chunks = _read_chunks(file_path, delimiter, chunk_size, kind)
+    if collect:
+        df = pd.concat(list(chunks), ignore_index=True)
+        logging.info(f"{kind} file {file_path} read successfully with delimiter '{delimiter}'. Final shape: {df.shape}")
+        return df
+    rows, count = stream_chunks(chunks, sink or (lambda chunk: None), max_in_flight)
+    logging.info(f"{kind} file {file_path} streamed successfully with delimiter '{delimiter}'. "
+                 f"Rows: {rows}, chunks: {count}")
+    return {'path': file_path, 'rows': rows, 'chunks': count}
+
+
+def process_csv(file_path, delimiter, chunk_size=1000, sink=None, collect=False, max_in_flight=2):
+    """
+    Stream a CSV file to a sink chunk by chunk.
+
+    :param sink: Callable receiving each DataFrame chunk; chunks are discarded when omitted.
+    :param collect: Return the whole file as one DataFrame instead of streaming (needs ~2x file size in memory).
+    :return: The DataFrame when collect is set, otherwise a summary dict with rows and chunks.
+    """
+    try:
+        return _process_delimited(file_path, delimiter, chunk_size, 'CSV', sink, collect, max_in_flight)
+    except Exception as e:
+        logging.error(f"Error reading CSV file {file_path}: {e}")
+        raise
+
+
+def process_txt(file_path, delimiter, chunk_size=1000, sink=None, collect=False, max_in_flight=2):
+    """
+    Stream a delimited TXT file to a sink chunk by chunk; see process_csv.
+    """
+    try:
+        return _process_delimited(file_path, delimiter, chunk_size, 'TXT', sink, collect, max_in_flight)
+    except Exception as e:
+        logging.error(f"Error reading TXT file {file_path}: {e}")
+        raise
+
+
+DEFAULT_DELIMITERS = {'.csv': ',', '.txt': '\t'}
+
+
+def discover_files(paths=None, manifest=None):
+    """
+    Resolve the files to process as a list of (path, delimiter) pairs.
+
+    :param paths: Files, directories or glob patterns; directories contribute their .csv/.txt files.
+    :param manifest: JSON manifest, either a list of paths or a list of {"path", "delimiter"} entries.
+    :return: Files from the arguments, or the entries in source_config.FILES when none are given.
+    """
+    files = []
+    if manifest:
+        for entry in load_config(manifest):
+            if isinstance(entry, str):
+                entry = {'path': entry}
+            files.append((entry['path'], entry.get('delimiter')))
+    for pattern in paths or []:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in sorted(os.listdir(pattern))
+                       if os.path.splitext(name)[1] in DEFAULT_DELIMITERS]
+        else:
+            matches = sorted(glob.glob(pattern))
+        if not matches:
+            logging.error(f"No files matched {pattern}")
+        files.extend((path, None) for path in matches)
+
+    if not files:
+        csv_config = FILES.get('csv')
+        if csv_config:
+            if 'path' in csv_config and 'delimiter' in csv_config:
+                files.append((csv_config['path'], csv_config['delimiter']))
+            else:
+                logging.error("CSV configuration is missing 'path' or 'delimiter'.")
+        txt_config = FILES.get('txt')
+        if txt_config:
+            if txt_config.get('path'):
+                # Default to tab delimiter if not specified
+                files.append((txt_config['path'], txt_config.get('delimiter', '\t')))
+            else:
+                logging.error("TXT configuration is missing 'path'.")
+
+    return [(path, delimiter or DEFAULT_DELIMITERS.get(os.path.splitext(path)[1], ','))
+            for path, delimiter in files]
+
+
+def plan_tasks(files, split_size):
+    """
+    Turn files into tasks, splitting files larger than split_size into byte ranges.
+
+    Tasks are ordered largest first so the longest pieces start early and the run ends evenly.
+    Missing files become zero-size tasks that fail in the worker and are reported.
+    """
+    import pandas as pd
+    from byte_ranges import split_ranges
+
+    tasks = []
+    for path, delimiter in files:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size <= split_size:
+            tasks.append({'path': path, 'delimiter': delimiter, 'range': None, 'bytes': size})
+            continue
+        names = list(pd.read_csv(path, delimiter=delimiter, nrows=0).columns)
+        for start, end in split_ranges(path, split_size):
+            tasks.append({'path': path, 'delimiter': delimiter, 'range': (start, end),
+                          'names': names, 'bytes': end - start})
+    return sorted(tasks, key=lambda task: task['bytes'], reverse=True)
+
+
+def run_task(task):
+    from byte_ranges import read_range
+
+    start = time.perf_counter()
+    if task['range'] is None:
+        if os.path.splitext(task['path'])[1] == '.txt':
+            rows = process_txt(task['path'], task['delimiter'])['rows']
+        else:
+            rows = process_csv(task['path'], task['delimiter'])['rows']
+    else:
+        rows = len(read_range(task['path'], *task['range'], task['delimiter'], task['names']))
+    return {'path': task['path'], 'rows': rows, 'bytes': task['bytes'], 'seconds': time.perf_counter() - start}
+
+
+def run_batch(tasks, workers=None, metrics=None):
+    """
+    Run tasks on a process pool and aggregate results per file.
+
+    :param metrics: Optional etl_metrics.RunMetrics; each task is recorded as a parse stage.
+
+    :return: Tuple of (per-file stats dict, list of (path, error) failures, wall seconds).
+    """
+    # Loaded once before the pool forks, so workers inherit pandas instead of each importing it
+    import pandas  # noqa: F401
+
+    per_file = {}
+    failures = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_task, task): task for task in tasks}
+        for future in as_completed(futures):
+            task = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Error in task for {task['path']}: {e}")
+                failures.append((task['path'], str(e)))
+                continue
+            if metrics is not None:
+                metrics.add('parse', result['seconds'], result['rows'], result['bytes'], result['path'])
+            stats = per_file.setdefault(result['path'], {'rows': 0, 'bytes': 0, 'seconds': 0.0, 'parts': 0})
+            stats['rows'] += result['rows']
+            stats['bytes'] += result['bytes']
+            stats['seconds'] += result['seconds']
+            stats['parts'] += 1
+    return per_file, failures, time.perf_counter() - start
+
+
+def print_summary(per_file, failures, wall_seconds):
+    for path, stats in sorted(per_file.items()):
+        busy = max(stats['seconds'], 1e-9)
+        line = (f"{path}: {stats['rows']} rows, {stats['bytes'] / 1e6:.1f} MB in {stats['parts']} part(s), "
+                f"{stats['rows'] / busy:,.0f} rows/sec, {stats['bytes'] / 1e6 / busy:.1f} MB/sec")
+        logging.info(line)
+        print(line)
+    total_rows = sum(stats['rows'] for stats in per_file.values())
+    total_bytes = sum(stats['bytes'] for stats in per_file.values())
+    wall = max(wall_seconds, 1e-9)
+    line = (f"Total: {len(per_file)} file(s), {total_rows} rows, {total_bytes / 1e6:.1f} MB in {wall_seconds:.2f}s, "
+            f"{total_rows / wall:,.0f} rows/sec, {total_bytes / 1e6 / wall:.1f} MB/sec")
+    logging.info(line)
+    print(line)
+    failed_paths = sorted(set(path for path, _ in failures))
+    for path in failed_paths:
+        errors = [error for failed, error in failures if failed == path]
+        logging.error(f"FAILED {path}: {errors[0]}")
+        print(f"FAILED {path}: {errors[0]}")
+    if failed_paths:
+        print(f"{len(failed_paths)} file(s) failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse many CSV/TXT files on a process pool.')
+    parser.add_argument('paths', nargs='*', help='Files, directories or glob patterns (default: source_config.FILES)')
+    parser.add_argument('--manifest', help='JSON list of paths or {"path", "delimiter"} entries')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--split-size-mb', type=int, default=256,
+                        help='Files larger than this are split into byte ranges of this size')
+    add_logging_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args()
+    setup_logging(filename='file_processor.log', fmt='%(asctime)s:%(levelname)s:%(message)s',
+                  json_format=args.log_json)
+
+    files = discover_files(args.paths, args.manifest)
+    if not files:
+        logging.error("No files to process.")
+        sys.exit(1)
+
+    with instrumented_run('process_file_parallel', report=logging.info, **metrics_options(args)) as metrics:
+        tasks = plan_tasks(files, args.split_size_mb * 1024 * 1024)
+        for path, _ in files:
+            if os.path.exists(path):
+                metrics.add_file(path, os.path.getsize(path))
+        per_file, failures, wall_seconds = run_batch(tasks, args.workers, metrics)
+        print_summary(per_file, failures, wall_seconds)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
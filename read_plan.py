@@ -0,0 +1,92 @@
+# read_plan.py
+
+import csv
+
+import pandas as pd
+
+
+def csv_header(path, delimiter, **read_csv_args):
+    """Return the column names of a delimited file without reading any rows."""
+    return list(pd.read_csv(path, sep=delimiter, nrows=0, **read_csv_args).columns)
+
+
+def _names(names, limit=20):
+    shown = ', '.join(names[:limit]) or '-'
+    return shown + (f", ... ({len(names) - limit} more)" if len(names) > limit else '')
+
+
+class ReadPlan:
+    """
+    Column projection and declared dtypes pushed down into the readers.
+
+    Instead of parsing every column as object dtype and dropping most of them afterwards,
+    the plan tells read_csv which columns to parse (usecols) and how (dtype), and tells the
+    XML reader which fields to extract, so unused columns are never materialised.
+
+    :param columns: Columns the transform keeps; None keeps every column.
+    :param dtypes: Optional mapping of column name to a pandas dtype (e.g. "int64", "string").
+    """
+
+    def __init__(self, columns=None, dtypes=None):
+        self.columns = set(columns) if columns is not None else None
+        self.dtypes = dict(dtypes or {})
+
+    def select(self, available):
+        """Columns of available that the plan keeps, in file order."""
+        return [name for name in available if self.columns is None or name in self.columns]
+
+    def csv_options(self, header):
+        """
+        read_csv keyword arguments for a file with the given header.
+
+        :param header: Column names as they appear in the file.
+        :return: Dict with usecols and, when any kept column has a declared type, dtype.
+        """
+        kept = self.select(header)
+        options = {'usecols': kept}
+        dtype = {name: kind for name, kind in self.dtypes.items() if name in kept}
+        if dtype:
+            options['dtype'] = dtype
+        return options
+
+    def text_options(self, header):
+        """
+        Like csv_options for plain delimited text: no quoting and no NA detection.
+
+        Undeclared columns stay strings, as when the lines were split by hand.
+        """
+        options = self.csv_options(header)
+        options['dtype'] = {name: options.get('dtype', {}).get(name, str) for name in options['usecols']}
+        options.update(quoting=csv.QUOTE_NONE, keep_default_na=False)
+        return options
+
+    def xml_fields(self, fields):
+        """Drop field mappings the plan does not keep, so their values are never extracted."""
+        kept = self.select(fields)
+        return {name: field for name, field in fields.items() if name in kept}
+
+    def explain(self, source, available, options=None):
+        """
+        Describe the plan for one input.
+
+        :param source: Input name shown in the first line.
+        :param available: Every column (or XML field) the input offers.
+        :param options: Reader options the plan produced, shown verbatim.
+        :return: List of lines.
+        """
+        kept = self.select(available)
+        pruned = [name for name in available if name not in kept]
+        missing = sorted(self.columns - set(available)) if self.columns is not None else []
+        lines = [
+            f"Read plan for {source}",
+            f"  keep   {len(kept)}/{len(available)} columns: {_names(kept)}",
+            f"  prune  {len(pruned)} columns: {_names(pruned)}",
+        ]
+        declared = {name: kind for name, kind in self.dtypes.items() if name in kept}
+        if declared:
+            lines.append(f"  dtypes {', '.join(f'{name}={kind}' for name, kind in declared.items())}")
+        if missing:
+            lines.append(f"  absent {', '.join(missing)} (required but not in the input)")
+        for name, value in (options or {}).items():
+            lines.append(f"  {name} = {value!r}")
+        return lines
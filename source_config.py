@@ -1,11 +1,45 @@
-# source_config.py
-
-FILES = {
-    "csv": {
-        "path": "test_data.csv",
-        "delimiter": ","
-    },
-    "txt": {
-        "path": "path/to/your/txtfile.txt",
-    }
-}
+# source_config.py
+
+FILES = {
+    "csv": {
+        "path": "test_data.csv",
+        "delimiter": ","
+    },
+    "txt": {
+        "path": "path/to/your/txtfile.txt",
+    }
+}
+
+# Column rules applied to every CSV chunk by process_file.process_chunk
+TRANSFORM_RULES = [
+    {"column": "date", "rule": "date_format", "input_format": "%Y-%m-%d", "output_format": "%Y-%m-%d"},
+    {"column": "amount", "rule": "scale", "factor": 1.1},  # Add 10% to the amount
+]
+
+# Per-chunk checks of chunk_validation.validate_chunk; failing rows go to the quarantine file.
+# Sources without an entry get a schema inferred from their first rows.
+VALIDATION_SCHEMAS = {
+    "csv": {
+        "id": {"type": "int", "required": True, "min": 0},
+        "name": {"type": "str", "max_length": 255},
+        "date": {"type": "date", "format": "%Y-%m-%d", "required": True},
+        "amount": {"type": "float"}
+    },
+    "record": {
+        "name": {"type": "str", "required": True},
+        "age": {"type": "int", "min": 0, "max": 150},
+        "amount": {"type": "float"}
+    }
+}
+
+# Record layouts for xml_stream.iter_records: record element path plus column -> field mapping
+XML_LAYOUTS = {
+    "record": {
+        "record_path": "record",
+        "fields": {
+            "name": {"path": "name", "type": "str"},
+            "age": {"path": "age", "type": "int"},
+            "amount": {"path": "amount", "type": "float"}
+        }
+    }
+}
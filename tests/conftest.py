@@ -0,0 +1,9 @@
+# conftest.py
+
+import os
+import sys
+
+# The ETL modules live in the repository root and in RealProject, like the scripts import them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'RealProject'))
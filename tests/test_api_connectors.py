@@ -0,0 +1,185 @@
+# test_api_connectors.py
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from api_connectors import ApiError, ApiStats, read_chunks, write_chunks  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Hands every request to the server's respond(method, path, query, body) -> (status, body, headers)."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, method):
+        url = urlparse(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length)) if length else None
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.calls.append((method, url.path, query, body))
+            status, reply, headers = self.server.respond(method, url.path, query, body)
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(respond):
+        server = StubServer(('127.0.0.1', 0), StubHandler)
+        server.respond = respond
+        server.calls = []
+        server.lock = threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _config(base_url, **options):
+    return {'name': 'stub', 'type': 'rest', 'base_url': base_url, 'read_path': 'records', 'write_path': 'records',
+            **options}
+
+
+def _frame(rows):
+    return pd.DataFrame({'id': range(rows), 'name': [f"name_{index}" for index in range(rows)]})
+
+
+def test_write_batches_records(stub):
+    server, base_url = stub(lambda method, path, query, body: (200, {'accepted': len(body['records'])}, None))
+    stats = write_chunks(_config(base_url), [_frame(1050)], batch_size=200, concurrency=4)
+    sizes = sorted(len(body['records']) for _, _, _, body in server.calls)
+    assert sizes == [50, 200, 200, 200, 200, 200]
+    assert sorted(record['id'] for _, _, _, body in server.calls for record in body['records']) == list(range(1050))
+    assert (stats.records, stats.requests, stats.retries) == (1050, 6, 0)
+
+
+def test_salesforce_batches_are_capped_and_rejections_counted(stub):
+    def respond(method, path, query, body):
+        assert path.endswith('/composite/sobjects') and body['allOrNone'] is False
+        assert all(record['attributes'] == {'type': 'Contact'} for record in body['records'])
+        return 200, [{'success': index != 0} for index in range(len(body['records']))], None
+
+    server, base_url = stub(respond)
+    config = {'name': 'sf', 'type': 'salesforce', 'base_url': f"{base_url}/services/data/v59.0",
+              'sobject': 'Contact', 'query': 'SELECT Id FROM Contact'}
+    stats = write_chunks(config, [_frame(450)], batch_size=1000)
+    assert sorted(len(body['records']) for _, _, _, body in server.calls) == [50, 200, 200]
+    assert (stats.records, stats.failed_records) == (447, 3)
+
+
+def test_retries_throttling_and_server_errors(stub):
+    replies = iter([(429, {}, {'Retry-After': '1'}), (503, {}, None), (502, {}, None)])
+
+    def respond(method, path, query, body):
+        return next(replies, (200, {'accepted': len(body['records'])}, None))
+
+    server, base_url = stub(respond)
+    start = time.perf_counter()
+    stats = write_chunks(_config(base_url), [_frame(10)], concurrency=1, backoff=0.05)
+    elapsed = time.perf_counter() - start
+    assert (stats.records, stats.requests, stats.retries) == (10, 4, 3)
+    # Retry-After wins over the short backoff; the two 5xx retries back off 0.05 * 2**attempt (+-50%)
+    assert elapsed >= 1.0 + 0.5 * (0.1 + 0.2)
+
+
+def test_backoff_doubles_per_attempt(stub):
+    server, base_url = stub(lambda method, path, query, body: (503, {}, None))
+    start = time.perf_counter()
+    with pytest.raises(ApiError, match='503'):
+        write_chunks(_config(base_url), [_frame(10)], retries=3, backoff=0.1)
+    elapsed = time.perf_counter() - start
+    assert len(server.calls) == 4
+    assert 0.5 * (0.1 + 0.2 + 0.4) <= elapsed < 5
+
+
+def test_client_errors_are_not_retried(stub):
+    server, base_url = stub(lambda method, path, query, body: (400, {'error': 'bad payload'}, None))
+    with pytest.raises(ApiError, match='400'):
+        write_chunks(_config(base_url), [_frame(10)], backoff=0.01)
+    assert len(server.calls) == 1
+
+
+@pytest.mark.parametrize('total', [25, 30, 0])
+def test_page_reads_stop_at_a_short_page(stub, total):
+    records = [{'id': index} for index in range(total)]
+
+    def respond(method, path, query, body):
+        start = (int(query['page']) - 1) * int(query['page_size'])
+        return 200, {'records': records[start:start + int(query['page_size'])]}, None
+
+    server, base_url = stub(respond)
+    stats = ApiStats()
+    pages = list(read_chunks(_config(base_url, pagination='page'), page_size=10, concurrency=2, stats=stats))
+    assert [len(page) for page in pages] == [10] * (total // 10) + ([total % 10] if total % 10 else [])
+    assert (pd.concat(pages)['id'].tolist() if pages else []) == list(range(total))
+    # Pages are requested a window of `concurrency` at a time, never past the window holding the end
+    assert max(int(query['page']) for _, _, query, _ in server.calls) <= total // 10 + 2
+    assert stats.records == total
+
+
+def test_cursor_reads_follow_next_until_absent(stub):
+    pages = {None: ([1, 2], '/records?cursor=b'), 'b': ([3], '/records?cursor=c'), 'c': ([4, 5], None)}
+
+    def respond(method, path, query, body):
+        ids, next_url = pages[query.get('cursor')]
+        reply = {'records': [{'id': value} for value in ids]}
+        if next_url:
+            reply['next'] = next_url
+        return 200, reply, None
+
+    server, base_url = stub(respond)
+    frames = list(read_chunks(_config(base_url, pagination='next'), page_size=2))
+    assert [frame['id'].tolist() for frame in frames] == [[1, 2], [3], [4, 5]]
+    assert [query.get('cursor') for _, _, query, _ in server.calls] == [None, 'b', 'c']
+    assert server.calls[0][2] == {'limit': '2'}
+
+
+def test_read_retries_then_raises(stub):
+    replies = iter([(500, {}, None)])
+
+    def respond(method, path, query, body):
+        return next(replies, (200, {'records': [{'id': 1}]}, None))
+
+    server, base_url = stub(respond)
+    stats = ApiStats()
+    frames = list(read_chunks(_config(base_url, pagination='next'), stats=stats, backoff=0.01))
+    assert [frame['id'].tolist() for frame in frames] == [[1]]
+    assert stats.retries == 1
+    server, base_url = stub(lambda method, path, query, body: (503, {}, None))
+    with pytest.raises(ApiError, match='503'):
+        list(read_chunks(_config(base_url, pagination='next'), retries=1, backoff=0.01))
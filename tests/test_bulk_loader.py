@@ -0,0 +1,42 @@
+# test_bulk_loader.py
+
+import pandas as pd
+
+from bulk_loader import copy_upsert
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+        self.copied = None
+
+    def execute(self, statement):
+        self.statements.append(statement)
+
+    def copy_expert(self, statement, buffer):
+        self.copied = buffer.read()
+
+    def close(self):
+        pass
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.cursor_ = RecordingCursor()
+
+    def cursor(self):
+        return self.cursor_
+
+
+def test_float_keys_are_copied_as_integers():
+    # read_csv returns ids as float64 once one of them is missing
+    frame = pd.DataFrame({'id': [5.0, None, 7.0], 'name': ['a', 'b', 'c']})
+    conn = RecordingConnection()
+    assert copy_upsert(conn, frame, 'data', ['id', 'name'], 'id') == 3
+    assert conn.cursor_.copied.splitlines() == ['5,a', ',b', '7,c']
+
+
+def test_sequence_is_set_past_the_largest_key():
+    conn = RecordingConnection()
+    copy_upsert(conn, pd.DataFrame({'id': [1], 'name': ['a']}), 'data', ['id', 'name'], 'id')
+    assert "COALESCE(MAX(id), 0) + 1, false" in conn.cursor_.statements[-1]
@@ -0,0 +1,38 @@
+# test_chunk_validation.py
+
+import pandas as pd
+
+from chunk_validation import infer_validation_schema, validate_chunk
+
+
+def test_whole_valued_floats_are_not_inferred_as_int():
+    sample = pd.DataFrame({'id': [1, 2, 3], 'amount': [100.0, 250.0, 3.0], 'text_amount': ['100.00', '7.00', '1.00'],
+                           'count': ['4', '5', '6']})
+    schema = infer_validation_schema(sample)
+    assert schema['id'] == {'type': 'int'}
+    assert schema['amount'] == {'type': 'float'}
+    assert schema['text_amount'] == {'type': 'float'}
+    assert schema['count'] == {'type': 'int'}
+    # Later rows with real decimals pass instead of going to quarantine as bad_int
+    good, rejected = validate_chunk(pd.DataFrame({'id': [4], 'amount': [12.5], 'text_amount': ['0.99'],
+                                                  'count': ['7']}), schema)
+    assert len(good) == 1 and len(rejected) == 0
+
+
+def test_rejected_rows_carry_reason_codes():
+    chunk = pd.DataFrame({'id': ['1', 'x', '-3'], 'date': ['2024-01-01', '2024-01-02', 'bad']})
+    schema = {'id': {'type': 'int', 'min': 0}, 'date': {'type': 'date', 'required': True}}
+    good, rejected = validate_chunk(chunk, schema)
+    assert good['id'].tolist() == [1]
+    assert rejected['reasons'].tolist() == ['bad_int:id', 'below_min:id;bad_date:date']
+
+
+def test_typed_columns_are_checked_without_conversion():
+    chunk = pd.DataFrame({'id': [1, 2, -3], 'price': [1.5, None, 2.0],
+                          'joined': pd.to_datetime(['2024-01-01', None, '2024-03-01']), 'note': ['a', ' ', 'c']})
+    schema = {'id': {'type': 'int', 'min': 0}, 'price': {'type': 'float'},
+              'joined': {'type': 'date', 'required': True}, 'note': {'type': 'str', 'required': True}}
+    good, rejected = validate_chunk(chunk, schema)
+    assert good['id'].tolist() == [1]
+    assert good['joined'].dtype == chunk['joined'].dtype
+    assert rejected['reasons'].tolist() == ['missing:joined;missing:note', 'below_min:id']
@@ -0,0 +1,31 @@
+# test_data_process_xml.py
+
+import json
+import logging
+
+from chunk_validation import QuarantineSink
+from data_process_xml import extract_batches, extract_data
+
+RECORDS = ('<records><record><name>a</name><age>30</age><amount>1.5</amount></record>'
+           '<record><name>b</name><age>abc</age><amount>2</amount></record>'
+           '<record><name></name><age>40</age><amount>3</amount></record></records>')
+
+
+def test_dropped_records_are_logged_without_a_sink(tmp_path, caplog):
+    path = tmp_path / 'records.xml'
+    path.write_text(RECORDS)
+    with caplog.at_level(logging.WARNING):
+        data = extract_data(str(path))
+    assert [record['name'] for record in data] == ['a']
+    assert '2/3 rows dropped' in caplog.text
+    assert 'bad_int:age: 1' in caplog.text and 'missing:name: 1' in caplog.text
+
+
+def test_rejected_records_go_to_the_sink(tmp_path):
+    path = tmp_path / 'records.xml'
+    path.write_text(RECORDS)
+    sink = QuarantineSink(str(tmp_path / 'quarantine.jsonl'))
+    rows = sum(len(batch) for batch in extract_batches(str(path), sink=sink))
+    assert (rows, sink.rows, sink.checked) == (1, 2, 3)
+    with open(sink.path) as file:
+        assert [json.loads(line)['reasons'] for line in file] == [['bad_int:age'], ['missing:name']]
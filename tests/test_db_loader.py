@@ -0,0 +1,41 @@
+# test_db_loader.py
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from db_loader import DIALECTS, SqlServerDialect, SqliteDialect, StreamingLoader
+
+
+def _column_types(conn, table):
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_types_come_from_every_sampled_chunk():
+    # note is empty in the first chunk, amount is int until a decimal and a NaN arrive
+    chunks = [pd.DataFrame({'id': [1, 2], 'note': [None, None], 'amount': [10, 20], 'blank': [None, None]}),
+              pd.DataFrame({'id': [3, 4], 'note': ['a', None], 'amount': [1.5, np.nan], 'blank': [None, None]})]
+    conn = sqlite3.connect(':memory:')
+    loader = StreamingLoader(conn, SqliteDialect(), 'people', batch_size=1)
+    assert [loader.load(chunk) for chunk in chunks] == [0, 0]
+    loader.close()
+    assert _column_types(conn, 'people') == {'id': 'INTEGER', 'note': 'TEXT', 'amount': 'REAL', 'blank': 'TEXT'}
+    assert conn.execute("SELECT note, amount FROM people ORDER BY id").fetchall() == \
+        [(None, 10.0), (None, 20.0), ('a', 1.5), (None, None)]
+    assert loader.rows == 4 and loader.created
+
+
+def test_chunks_after_the_sample_are_inserted_directly():
+    conn = sqlite3.connect(':memory:')
+    loader = StreamingLoader(conn, SqliteDialect(), 'numbers', sample_rows=3)
+    assert loader.load(pd.DataFrame({'n': [1, 2]})) == 0
+    assert loader.load(pd.DataFrame({'n': [3, 4]})) == 4
+    assert loader.load(pd.DataFrame({'n': [5]})) == 1
+    loader.close()
+    assert conn.execute("SELECT COUNT(*) FROM numbers").fetchone()[0] == 5
+
+
+def test_sql_server_type_names():
+    assert DIALECTS['sqlserver'] is SqlServerDialect
+    assert DIALECTS['sql'] is SqlServerDialect
@@ -0,0 +1,38 @@
+# test_excel_cache.py
+
+import pandas as pd
+from openpyxl import Workbook
+
+from excel_cache import xlsx_to_parquet
+
+
+def _workbook(path, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_sparse_columns_widen_instead_of_looping(tmp_path):
+    # note and score are empty in the first chunk, then hold text and numbers
+    source = tmp_path / 'sparse.xlsx'
+    _workbook(source, [('id', 'note', 'score'), (1, None, None), (2, None, None), (3, 'hello', 5),
+                       (4, None, 2.5), (5, 'x', 'text')])
+    target = tmp_path / 'sparse.parquet'
+    assert xlsx_to_parquet(str(source), str(target), chunk_size=2) == 5
+    frame = pd.read_parquet(target)
+    assert frame['id'].tolist() == [1, 2, 3, 4, 5]
+    assert frame['note'].iloc[[2, 4]].tolist() == ['hello', 'x']
+    assert frame['note'].isna().sum() == 3
+    assert frame['score'].iloc[-1] == 'text'
+
+
+def test_empty_first_chunk_then_numbers_becomes_float(tmp_path):
+    source = tmp_path / 'numbers.xlsx'
+    _workbook(source, [('id', 'amount'), (1, None), (2, None), (3, 7), (4, 2.5)])
+    target = tmp_path / 'numbers.parquet'
+    assert xlsx_to_parquet(str(source), str(target), chunk_size=2) == 4
+    frame = pd.read_parquet(target)
+    assert frame['amount'].dtype == float
+    assert frame['amount'].tolist()[2:] == [7.0, 2.5]
@@ -0,0 +1,22 @@
+# test_load_pipeline.py
+
+import threading
+
+import load_pipeline
+from load_pipeline import run_pipeline
+
+
+def test_workers_are_forked_before_writer_threads_start(monkeypatch):
+    threads_at_fork = []
+    real_pool = load_pipeline.Pool
+
+    def recording_pool(*args, **kwargs):
+        threads_at_fork.extend(thread.name for thread in threading.enumerate())
+        return real_pool(*args, **kwargs)
+
+    monkeypatch.setattr(load_pipeline, 'Pool', recording_pool)
+    loaded = []
+    stats = run_pipeline([[1, 2], [3], [4, 5, 6]], list, loaded.append, workers=2, writers=2)
+    assert not [name for name in threads_at_fork if name.startswith('writer-')]
+    assert sorted(value for chunk in loaded for value in chunk) == [1, 2, 3, 4, 5, 6]
+    assert stats['load']['rows'] == 6
@@ -0,0 +1,41 @@
+# test_lookup_index.py
+
+import pandas as pd
+
+from lookup_index import KeyIndex, enrich
+
+
+def _index(tmp_path, reference):
+    path = tmp_path / 'reference.csv'
+    reference.to_csv(path, index=False)
+    return KeyIndex.open_or_build(str(path), 'id', 'name', str(tmp_path / 'index'))
+
+
+def test_float_reference_keys_match_integer_lookups(tmp_path):
+    # A gap in the ids makes read_csv return them as float64
+    index = _index(tmp_path, pd.DataFrame({'id': [1, 2, None, 4], 'name': ['a', 'b', 'c', 'd']}))
+    target = pd.DataFrame({'key': [4, 1, 3, 2]})
+    frame, matched = enrich(target, index, 'key', 'name', default='NO MATCH')
+    assert matched == 3
+    assert frame['name'].tolist() == ['d', 'a', 'NO MATCH', 'b']
+
+
+def test_nullable_and_float_lookup_keys(tmp_path):
+    index = _index(tmp_path, pd.DataFrame({'id': [1, 2, 3], 'name': ['a', 'b', 'c']}))
+    target = pd.DataFrame({'key': pd.array([3, None, 1], dtype='Int64')})
+    frame, matched = enrich(target, index, 'key', 'name', default='NO MATCH')
+    assert matched == 2
+    assert frame['name'].tolist() == ['c', 'NO MATCH', 'a']
+    frame, matched = enrich(pd.DataFrame({'key': [2.0, None, 2.5]}), index, 'key', 'name', default='NO MATCH')
+    assert matched == 1
+    assert frame['name'].tolist() == ['b', 'NO MATCH', 'NO MATCH']
+
+
+def test_text_keys_match_whole_floats(tmp_path):
+    # Mixed ids force the hashed index; 7.0 on the lookup side must still find "7"
+    index = _index(tmp_path, pd.DataFrame({'id': ['x1', '7', None, 'y2'], 'name': ['a', 'b', 'c', 'd']}))
+    assert index.hashed
+    target = pd.DataFrame({'key': pd.Series([7.0, None, 'y2', 'z'], dtype=object)})
+    frame, matched = enrich(target, index, 'key', 'name', default='NO MATCH')
+    assert matched == 2
+    assert frame['name'].tolist() == ['b', 'NO MATCH', 'd', 'NO MATCH']
@@ -0,0 +1,47 @@
+# test_output_writers.py
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from output_writers import open_writer, write_chunks
+
+
+def _read_arrow(path):
+    with pa.OSFile(str(path), 'rb') as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+READERS = {'parquet': pd.read_parquet, 'arrow': _read_arrow}
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'arrow'])
+def test_sparse_first_chunk_widens_schema(tmp_path, output_format):
+    # note is all null in the first chunk, amount is int until a decimal and a NaN arrive
+    chunks = [pd.DataFrame({'id': [1, 2], 'note': [None, None], 'amount': [10, 20]}),
+              pd.DataFrame({'id': [3, 4], 'note': ['a', None], 'amount': [1.5, np.nan]}),
+              pd.DataFrame({'id': [5, 6], 'note': [None, 'b'], 'amount': [7, 8]})]
+    path = tmp_path / f"out.{output_format}"
+    assert write_chunks(chunks, str(path), output_format) == 6
+    frame = READERS[output_format](path)
+    assert frame['id'].tolist() == [1, 2, 3, 4, 5, 6]
+    assert frame['note'].iloc[[2, 5]].tolist() == ['a', 'b']
+    assert frame['note'].isna().sum() == 4
+    assert frame['amount'].dtype == float
+    assert frame['amount'].iloc[[0, 1, 2, 4, 5]].tolist() == [10.0, 20.0, 1.5, 7.0, 8.0]
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'arrow'])
+def test_mixed_types_fall_back_to_string(tmp_path, output_format):
+    chunks = [pd.DataFrame({'code': [1, 2]}), pd.DataFrame({'code': ['A7', 'B8']})]
+    path = tmp_path / f"out.{output_format}"
+    write_chunks(chunks, str(path), output_format)
+    assert READERS[output_format](path)['code'].tolist() == ['1', '2', 'A7', 'B8']
+
+
+def test_delimited_header_without_chunks(tmp_path):
+    path = tmp_path / 'empty.csv'
+    with open_writer(str(path), 'csv', columns=['id', 'name']):
+        pass
+    assert path.read_text().splitlines() == ['id,name']
@@ -0,0 +1,36 @@
+# test_result_cache.py
+
+import os
+
+from result_cache import ResultCache
+
+
+def _cache_with_output(tmp_path, content, max_bytes=1 << 20):
+    source = tmp_path / 'source.csv'
+    source.write_text('id\n1\n')
+    output = tmp_path / 'out.csv'
+    output.write_text(content)
+    cache = ResultCache(str(tmp_path / 'cache'), max_bytes)
+    return cache, cache.key(str(source), {}, 'csv'), output
+
+
+def test_put_leaves_output_writable_and_separate(tmp_path):
+    cache, key, output = _cache_with_output(tmp_path, 'id\n1\n')
+    artifact = cache.put(key, str(output))
+    assert os.access(output, os.W_OK)
+    output.write_text('changed\n')
+    assert open(artifact).read() == 'id\n1\n'
+    target = tmp_path / 'again.csv'
+    cache.materialize(cache.get(key), str(target))
+    target.write_text('changed too\n')
+    assert open(artifact).read() == 'id\n1\n'
+    cache.close()
+
+
+def test_put_skips_outputs_over_budget(tmp_path):
+    cache, key, output = _cache_with_output(tmp_path, 'x' * 100, max_bytes=10)
+    assert cache.put(key, str(output)) is None
+    assert cache.get(key) is None
+    assert cache.stats()['skipped'] == 1
+    assert output.read_text() == 'x' * 100
+    cache.close()
@@ -0,0 +1,130 @@
+# text_engine.py
+
+import argparse
+import io
+import json
+import mmap
+import os
+import time
+
+import numpy as np
+
+# Bytes handed to the parser at a time; a block always ends on a line boundary
+DEFAULT_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def iter_blocks(path, block_size=DEFAULT_BLOCK_SIZE, start=0):
+    """
+    Yield newline-aligned blocks of a file from a memory map.
+
+    A block is extended to the end of the line it stops in, so no line is ever split
+    across blocks; only one block is copied out of the map at a time.
+
+    :param start: Offset to start from, e.g. just past a header line.
+    :return: Generator of bytes objects.
+    """
+    size = os.path.getsize(path)
+    if start >= size:
+        return
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        while start < size:
+            end = min(start + max(block_size, 1), size)
+            if end < size:
+                newline = view.find(b'\n', end - 1)
+                end = size if newline == -1 else newline + 1
+            yield view[start:end]
+            start = end
+
+
+def header_names(path, delimiter, encoding='utf-8'):
+    """Return (column names, offset of the first data line) of a delimited text file."""
+    with open(path, 'rb') as file:
+        line = file.readline()
+        return line.decode(encoding).rstrip('\r\n').split(delimiter), file.tell()
+
+
+def iter_delimited(path, delimiter, block_size=DEFAULT_BLOCK_SIZE, chunk_size=None, **read_csv_args):
+    """
+    Parse a delimited text file block by block with pandas' C parser.
+
+    Each memory-mapped block is parsed in one read_csv call with the header's names, so the
+    per-line work happens in C, never in a Python loop.
+
+    :param delimiter: Field separator, e.g. "\\t" for input.txt.
+    :param block_size: Approximate bytes parsed per call.
+    :param chunk_size: Also cap the rows of a yielded DataFrame.
+    :param read_csv_args: Options such as usecols, dtype, quoting or keep_default_na
+        (ReadPlan.text_options produces these).
+    :return: Generator of DataFrames.
+    """
+    import pandas as pd
+
+    names, offset = header_names(path, delimiter)
+    for block in iter_blocks(path, block_size, offset):
+        frames = pd.read_csv(io.BytesIO(block), sep=delimiter, header=None, names=names, chunksize=chunk_size,
+                             **read_csv_args)
+        if chunk_size is None:
+            yield frames
+        else:
+            yield from frames
+
+
+def _line_bounds(data):
+    """Start and end (exclusive, without the line terminator) of each line in a block."""
+    newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord('\n'))
+    ends = newlines
+    if len(data) and data[-1:] != b'\n':
+        ends = np.append(newlines, len(data))  # Last line of the file without a terminator
+    starts = np.concatenate(([0], newlines + 1))[:len(ends)]
+    terminators = np.frombuffer(data, dtype=np.uint8)[np.maximum(ends - 1, 0)]
+    # Drop the \r of \r\n line endings from the lengths
+    content_ends = np.where((ends > starts) & (terminators == ord('\r')), ends - 1, ends)
+    return starts, content_ends
+
+
+def line_stats(path, block_size=DEFAULT_BLOCK_SIZE, sampler=None, log_line=None, encoding='utf-8'):
+    """
+    Stream a text file and return line statistics without materialising its lines.
+
+    Line boundaries are found with NumPy over each memory-mapped block, so a multi-GB log
+    costs a scan of its bytes rather than a Python loop over its lines.
+
+    :param sampler: Optional etl_logging.RowSampler choosing lines to pass to log_line.
+    :param log_line: Callable receiving each sampled line as text.
+    :return: Dict with lines, bytes, empty_lines, max_line_length, mean_line_length and seconds.
+    """
+    start = time.perf_counter()
+    lines = empty = longest = total_length = 0
+    for block in iter_blocks(path, block_size):
+        starts, ends = _line_bounds(block)
+        lengths = ends - starts
+        lines += len(lengths)
+        empty += int(np.count_nonzero(lengths == 0))
+        total_length += int(lengths.sum())
+        if len(lengths):
+            longest = max(longest, int(lengths.max()))
+        if sampler is not None and log_line is not None:
+            for position in sampler.sample_positions(len(lengths)):
+                log_line(block[starts[position]:ends[position]].decode(encoding, errors='replace'))
+    return {
+        'lines': lines,
+        'bytes': os.path.getsize(path),
+        'empty_lines': empty,
+        'max_line_length': longest,
+        'mean_line_length': round(total_length / lines, 1) if lines else 0,
+        'seconds': round(time.perf_counter() - start, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Line statistics of a large text file.')
+    parser.add_argument('path', help='Text file to scan')
+    parser.add_argument('--block-size-mb', type=int, default=DEFAULT_BLOCK_SIZE // (1024 * 1024),
+                        help='Bytes scanned per block, in MB')
+    args = parser.parse_args()
+
+    print(json.dumps(line_stats(args.path, args.block_size_mb * 1024 * 1024), indent=2))
+
+
+if __name__ == "__main__":
+    main()
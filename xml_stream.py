@@ -0,0 +1,79 @@
+# xml_stream.py
+
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+# Column converters applied per batch, keyed by the "type" in a field mapping
+CONVERTERS = {
+    'str': lambda values: values,
+    'int': lambda values: pd.to_numeric(values),
+    'float': lambda values: pd.to_numeric(values).astype(float),
+}
+
+
+def _field_value(record, path):
+    """
+    Read one field from a record element.
+
+    "name" reads child text, "a/b" a nested child, "@id" an attribute of the record and
+    "a/@id" an attribute of a child. Missing fields come back as None.
+    """
+    element_path, _, attribute = path.partition('@')
+    element_path = element_path.rstrip('/')
+    element = record.find(element_path) if element_path else record
+    if element is None:
+        return None
+    return element.get(attribute) if attribute else element.text
+
+
+def _is_record(ancestors, element, record_tags):
+    if element.tag != record_tags[-1] or len(ancestors) < len(record_tags) - 1:
+        return False
+    parents = ancestors[len(ancestors) - len(record_tags) + 1:]
+    return [parent.tag for parent in parents] == record_tags[:-1]
+
+
+def iter_records(path, record_path, fields, batch_size=1000):
+    """
+    Stream records out of an XML file as DataFrame batches using iterparse.
+
+    Each record element is dropped from the tree as soon as its fields are read, so memory
+    holds one batch of column values rather than the whole document.
+
+    :param path: XML file to read.
+    :param record_path: Slash separated tag path of the record element, matched against the
+        end of the element's path (e.g. "book" or "records/record").
+    :param fields: Mapping of column name to {"path": ..., "type": "str"|"int"|"float"}.
+    :param batch_size: Records per yielded DataFrame.
+    :return: Generator of DataFrames with one column per field.
+    """
+    record_tags = record_path.strip('/').split('/')
+    columns = {name: [] for name in fields}
+    stack = []
+
+    def flush():
+        batch = pd.DataFrame(columns)
+        for name, field in fields.items():
+            batch[name] = CONVERTERS[field.get('type', 'str')](batch[name])
+        for values in columns.values():
+            values.clear()
+        return batch
+
+    for event, element in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+        stack.pop()
+        if not _is_record(stack, element, record_tags):
+            continue
+        for name, field in fields.items():
+            columns[name].append(_field_value(element, field['path']))
+        element.clear()
+        if stack:
+            stack[-1].remove(element)
+        if len(columns[next(iter(fields))]) >= batch_size:
+            yield flush()
+
+    if fields and columns[next(iter(fields))]:
+        yield flush()